@@ -66,14 +66,18 @@ class MacroRegionConfig(APISettings, ParserSettings, StorageSettings, RegionSett
     TEMPLATES_FILENAME_BASE = '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}'
 
     TEMPLATES_FILENAME = {'Google': '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}',
+                          'GoogleAPI': '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}',
                           'Tavily': '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}',
                           'Yandex': '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}',
-                          'Telegram': '{AVAILABLE_CATEGORIES}_BASE_{PERIOD}_{DATE_FROM}_{DATE_TO}'}
+                          'Telegram': '{AVAILABLE_CATEGORIES}_BASE_{PERIOD}_{DATE_FROM}_{DATE_TO}',
+                          'Feeds': '{AVAILABLE_CATEGORIES}_{AVAILABLE_REGIONS}_{PERIOD}_{DATE_FROM}_{DATE_TO}'}
 
     TEMPLATES_PARSE = {'Google': '({SUBCATEGORIES}) {AVAILABLE_REGIONS} {PERIOD} after:{DATE_FROM} before:{DATE_TO}',
+                       'GoogleAPI': '({SUBCATEGORIES}) {AVAILABLE_REGIONS} {PERIOD} after:{DATE_FROM} before:{DATE_TO}',
                        'Tavily': '({SUBCATEGORIES}) {AVAILABLE_REGIONS} {PERIOD}',
                        'Yandex': '({SUBCATEGORIES}) {AVAILABLE_REGIONS} {PERIOD}',
-                       'Telegram': 'https://t.me/s/{CHANNEL_NAME}'}
+                       'Telegram': 'https://t.me/s/{CHANNEL_NAME}',
+                       'Feeds': '{DOMAIN}'}
 
     POST_PROCESSING = [
         filter_raw_data_by_region,
@@ -297,7 +301,14 @@ class MacroRegionConfig(APISettings, ParserSettings, StorageSettings, RegionSett
                             # to_parse[source] = [self.TEMPLATES_PARSE[source].format(CHANNEL_NAME=channel) for channel in channels]
                             to_parse[source] = subqueries
 
-                    elif source == 'Google':
+                    elif source == 'Feeds':
+                        # Запрос — доверенный домен: его ленты опрашиваются и фильтруются парсером
+                        to_parse[source] = [{
+                            'query': self.TEMPLATES_PARSE[source].format(DOMAIN=domain),
+                            'search_limit': self.SEARCH_LIMIT_FEEDS
+                        } for domain in self.TRUSTED_SOURCES_DOMAINS]
+
+                    elif source in ('Google', 'GoogleAPI'):
                         filter_categories = []
                         subqueries = []
 
@@ -432,9 +443,20 @@ class MacroRegionConfig(APISettings, ParserSettings, StorageSettings, RegionSett
                                                'SUBCATEGORIES',
                                                'OUTPUT',
                                                'REGION_KEYS',
+                                               'REGIONS_KEYWORDS',
                                                'PROXY',
                                                'SCRAPERAPI_KEY',
-                                               'SCRAPERAPI_COUNTRY']),
+                                               'SCRAPERAPI_COUNTRY',
+                                               'BROWSER_ENGINE',
+                                               'EXTRACTION',
+                                               'PAGE_CACHE',
+                                               'SEARCH_CACHE',
+                                               'YANDEX',
+                                               'TAVILY',
+                                               'TELEGRAM',
+                                               'GOOGLE_SERP',
+                                               'GOOGLE_API',
+                                               'FEEDS']),
 
                 save_to=self.SAVE_TO
             )
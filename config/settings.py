@@ -20,12 +20,13 @@ class APISettings:
     AUTHENTICATION = {
         'GIGACHAT_API_AUTH': get_env_var("GIGACHAT_API_AUTH"),
         'TAVILY_API_KEY': get_env_var("TAVILY_API_KEY", required=True),
-        'TELEGRAM_API_ID': get_env_var("TELEGRAM_API_ID", required=True),
-        'TELEGRAM_API_HASH': get_env_var("TELEGRAM_API_HASH", required=True),
+        'TELEGRAM_API_ID': get_env_var("TELEGRAM_API_ID"),
+        'TELEGRAM_API_HASH': get_env_var("TELEGRAM_API_HASH"),
         'PHONE_NUM': get_env_var("PHONE_NUM"),
         'OPENROUTER_AI_MODEL': get_env_var("OPENROUTER_AI_MODEL"),
         'TOGETHER_API_KEY': get_env_var("TOGETHER_API_KEY"),
         'GOOGLE_CLOUD_API_KEY': get_env_var("GOOGLE_CLOUD_API_KEY"),
+        'GOOGLE_CSE_ID': get_env_var("GOOGLE_CSE_ID"),
         'GMAIL': get_env_var("GMAIL"),
         'PASS_GMAIL': get_env_var("PASS_GMAIL"),
         'MAIL_SBER': get_env_var("MAIL_SBER"),
@@ -130,6 +131,106 @@ class ParserSettings:
     SEARCH_LIMIT_YANDEX = 4
     SEARCH_LIMIT_TAVILY = 4
     SEARCH_LIMIT_TELEGRAM = 999_999
+    SEARCH_LIMIT_FEEDS = 50
+
+    # Yandex: пакетный режим (все отложенные операции запросов сразу и общий опрос),
+    # период опроса операций в секундах и максимум страниц выдачи на запрос
+    YANDEX_BATCH_MODE = True
+    YANDEX_POLL_INTERVAL = 1.0
+    YANDEX_MAX_PAGES = 5
+
+    # Tavily: общий на процесс лимит запросов в секунду и число параллельных потоков
+    TAVILY_REQUESTS_PER_SECOND = 2.0
+    TAVILY_MAX_WORKERS = 4
+    # Запрашивать у Tavily полный текст страниц (False, True, 'text' или 'markdown'): такие результаты
+    # сохраняются с full_text=True, и страницы не загружаются браузером на этапе RAW
+    TAVILY_INCLUDE_RAW_CONTENT = False
+
+    # Telegram: число каналов, загружаемых одновременно через общую сессию,
+    # и максимальное ожидание FloodWait в секундах (при большем канал пропускается)
+    TELEGRAM_MAX_CONCURRENT = 4
+    TELEGRAM_MAX_FLOOD_WAIT = 300
+    # Локальное хранилище сообщений каналов (в папке кэша): докачиваются только новые сообщения
+    TELEGRAM_USE_STORE = True
+    # Бэкенд загрузки каналов: 'telethon' (вход по API ID, API hash и телефону) или 'web' — публичный
+    # веб-предпросмотр t.me/s без входа (для узлов без сессии; без TELEGRAM_API_ID выбирается сам).
+    # Для 'web': адрес предпросмотра и число каналов, загружаемых одновременно
+    TELEGRAM_BACKEND = 'telethon'
+    TELEGRAM_WEB_URL = 'https://t.me'
+    TELEGRAM_WEB_MAX_CONCURRENT = 8
+
+    # Google: число параллельных сессий выдачи (у каждой свой профиль Chrome), прокси сессий
+    # (раздаются по кругу, например 'http://host:port') и запуск браузеров без окна
+    GOOGLE_SERP_SESSIONS = 2
+    GOOGLE_SERP_PROXIES = []
+    GOOGLE_SERP_HEADLESS = False
+    # Режим выдачи: 'url' — страницы открываются по адресу (q, start, num, hl, tbs с периодом),
+    # 'typing' — ввод запроса на главной странице и пагинация кнопками
+    GOOGLE_SERP_MODE = 'url'
+    GOOGLE_SERP_RESULTS_PER_PAGE = 10
+    GOOGLE_SERP_LANGUAGE = 'ru'
+    # Результаты с датой из выдачи вне периода DATE_FROM..DATE_TO отбрасываются до загрузки страниц
+    GOOGLE_SERP_DROP_OUT_OF_RANGE = True
+    # Сниппет не короче этого числа символов сохраняется как текст и страница не загружается (0 — всегда загружать)
+    GOOGLE_SERP_SNIPPET_MIN_CHARS = 0
+
+    # GoogleAPI (Custom Search JSON API): адрес API (None — googleapis.com), общий лимит запросов в секунду,
+    # число параллельных потоков и ограничение языка результатов (параметр lr)
+    GOOGLE_API_URL = None
+    GOOGLE_API_REQUESTS_PER_SECOND = 5.0
+    GOOGLE_API_MAX_WORKERS = 4
+    GOOGLE_API_LANGUAGE = 'lang_ru'
+
+    # Feeds: ленты RSS/Atom и новостные карты сайтов доверенных доменов. Для доменов без FEEDS_URLS ленты
+    # ищутся автоматически (robots.txt, типовые адреса). Новости региональных доменов (FEEDS_DOMAIN_REGIONS)
+    # относятся к их региону без проверки ключевых слов; категория сопоставляется по FEEDS_CATEGORY_KEYWORDS
+    FEEDS_URLS = {
+        'ria.ru': ['https://ria.ru/export/rss2/archive/index.xml'],
+        'tass.ru': ['https://tass.ru/rss/v2.xml'],
+        'rbc.ru': ['https://rssexport.rbc.ru/rbcnews/news/30/full.rss'],
+        'vedomosti.ru': ['https://www.vedomosti.ru/rss/news'],
+        'kommersant.ru': ['https://www.kommersant.ru/RSS/news.xml'],
+        'rg.ru': ['https://rg.ru/xml/index.xml'],
+    }
+    FEEDS_DOMAIN_REGIONS = {
+        'gipernn.ru': 'Нижегородская область',
+        'pravda-nn.ru': 'Нижегородская область',
+        'vremyan.ru': 'Нижегородская область',
+        'government-nnov.ru': 'Нижегородская область',
+        'nn.rbc.ru': 'Нижегородская область',
+        'domostroynn.ru': 'Нижегородская область',
+    }
+    FEEDS_CATEGORY_KEYWORDS = {
+        'Тренды на рынке недвижимости': ['недвижим', 'ипотек', 'жиль', 'жилищн', 'новострой', 'застройщ', 'квартир'],
+        'Цены на недвижимость': ['недвижим', 'жиль', 'квартир', 'квадратн', 'новострой'],
+        'Первичное жильё': ['новострой', 'застройщ', 'первичн', 'долев', 'эскроу'],
+        'Вторичное жильё': ['вторичн', 'квартир', 'жиль'],
+        'Доступность недвижимости': ['ипотек', 'жиль', 'субсид', 'льготн'],
+        'Бизнес': ['бизнес', 'компани', 'предприят', 'предпринимат', 'инвест'],
+        'Фонд оплаты труда': ['зарплат', 'заработн', 'фонд оплаты', 'доходы населения'],
+        'Сельское хозяйство': ['сельск', 'агро', 'урожа', 'фермер', 'животновод', 'растениевод', 'зерн'],
+        'Неплатежи': ['неплатеж', 'задолженност', 'банкрот', 'безработ', 'сокращени'],
+        'Туризм': ['туриз', 'турист', 'отел', 'гостиниц', 'курорт'],
+        'Потребительская активность': ['потребител', 'розничн', 'продаж', 'спрос'],
+        'Валовая заработная плата': ['зарплат', 'заработн'],
+        'Инфляция с учетом сезонных колебаний': ['инфляц', 'подорож', 'дефляц', 'потребительских цен'],
+        'Доля безналичных платежей': ['безналичн', 'платеж', 'сбп', 'эквайринг'],
+    }
+    FEEDS_MAX_WORKERS = 8
+    # Сколько вложенных карт сайтов из индекса (не старше периода) опрашивается на ленту
+    FEEDS_MAX_SITEMAPS = 5
+
+    # Движок браузерного уровня загрузки страниц: 'selenium' или 'playwright'
+    BROWSER_ENGINE = 'selenium'
+
+    # Пакетное извлечение текста страниц внешними провайдерами перед браузером, в порядке опроса:
+    # 'tavily' (Tavily Extract, TAVILY_API_KEY) и 'local' (сервис по адресу EXTRACTION_LOCAL_URL); [] — выключено.
+    # Текст принимается, если в нём не меньше EXTRACTION_MIN_CHARS символов
+    EXTRACTION_PROVIDERS = []
+    EXTRACTION_BATCH_SIZE = 20
+    EXTRACTION_MIN_CHARS = 500
+    EXTRACTION_TAVILY_DEPTH = 'basic'
+    EXTRACTION_LOCAL_URL = None
 
     DATE_FROM = str(date.today().replace(day=1))
     DATE_TO = str(date.today().replace(day=1) + relativedelta(months=1, days=-1))
@@ -148,6 +249,8 @@ class ParserSettings:
                               "realty_rbc",
                               ]
 
+    # 'GoogleAPI' — выдача Google через Custom Search JSON API (вместо браузерного 'Google'),
+    # 'Feeds' — ленты RSS/Atom и карты сайтов доверенных доменов TRUSTED_SOURCES_DOMAINS
     AVAILABLE_SOURCES = ['Telegram', 'Google', 'Tavily', 'Yandex']
     AVAILABLE_CATEGORIES = [
         'Тренды на рынке недвижимости', 'Цены на недвижимость', 'Первичное жильё', 'Вторичное жильё', 'Доступность недвижимости',
@@ -186,6 +289,15 @@ class StorageSettings:
     OUTPUT_DIR_RAW = OUTPUT_DIR_PATH / "raw"
     OUTPUT_DIR_POST_PROCESSING = OUTPUT_DIR_PATH / "post_processing"
     OUTPUT_DIR_EVENTS = OUTPUT_DIR_PATH / "events"
+    OUTPUT_DIR_CACHE = OUTPUT_DIR_PATH / "cache"
+    OUTPUT_DIR_TELEMETRY = OUTPUT_DIR_PATH / "telemetry"
+
+    # Кэш загруженных страниц: срок жизни записи и максимальный размер на диске
+    PAGE_CACHE_TTL_HOURS = 24 * 30
+    PAGE_CACHE_MAX_SIZE_MB = 2048
+    # Кэш ответов поисковых API (Tavily, Yandex, выдача Google); 0 часов — кэш отключён
+    SEARCH_CACHE_TTL_HOURS = 24 * 7
+    SEARCH_CACHE_MAX_SIZE_MB = 256
     # OUTPUT_DIR_TOPICS = OUTPUT_DIR_PATH / "topics"
     # OUTPUT_DIR_CLUSTERS = OUTPUT_DIR_PATH / "clusters"
 
@@ -5,8 +5,21 @@ from datetime import datetime, timezone, date
 import warnings
 
 from config import MacroRegionConfig
+from parsers.extraction_providers import create_extraction_chain
+from parsers.google_serp_pool import GoogleSerpPool
+from parsers.page_fetcher import PageFetcher, create_browser
+from parsers.tavily_parser import TavilyParser
+from parsers.telegram_session import TelegramSession
+from parsers.telegram_web_session import TelegramWebSession
+from parsers.yandex_parser import YandexParser
+from parsers.wait_profiles import WaitProfiles
+from tools.async_runner import run_async, close_event_loop
+from tools.page_cache import PageCache
+from tools.search_cache import get_search_cache
 from tools.archiver import create_archives
 from tools.email_sender import send_archives_via_gmail
+from tools.fetch_planner import FetchPlanner
+from tools.fetch_telemetry import FetchTelemetry
 
 # Отключаем предупреждения о fork для gRPC
 warnings.filterwarnings("ignore", message="fork")
@@ -21,11 +34,14 @@ if __name__ == "__main__":
     parser_settings = {
         'AVAILABLE_SOURCES': [
                             'Google',
+                            # 'GoogleAPI',
+                            # 'Feeds',
                             'Tavily',
                             'Yandex',
                             # 'Telegram'
                             ],
         'AVAILABLE_REGIONS': mr_conf.AVAILABLE_REGIONS[1:],
+        'BROWSER_ENGINE': 'selenium',
         'AVAILABLE_CATEGORIES': [
             'Тренды на рынке недвижимости',
             'Доступность недвижимости',
@@ -52,6 +68,35 @@ if __name__ == "__main__":
     mr_conf.set_parser_settings(parser_settings)
     tasks_to_parse += mr_conf.generate_config_to_parse()
 
+    # Общий загрузчик страниц на весь запуск: дисковый кэш, затем HTTP, при необходимости — браузер
+    # (пул драйверов Selenium или Playwright), который не перезапускается для каждой ссылки и контейнера.
+    # Профили ожидания готовности страниц по доменам сохраняются между запусками рядом с кэшем.
+    # Перед браузером страницы пачками отправляются провайдерам извлечения (EXTRACTION_PROVIDERS).
+    # Замеры по каждому URL пишутся в журнал: python -m tools.fetch_telemetry report --last
+    page_fetcher = PageFetcher(browser=create_browser(engine=mr_conf.BROWSER_ENGINE,
+                                                      size=20,
+                                                      page_load_timeout=8000,
+                                                      show_browser=False,
+                                                      wait_profiles=WaitProfiles(
+                                                          path=mr_conf.OUTPUT_DIR_CACHE / 'wait_profiles.json')),
+                               cache=PageCache(directory=mr_conf.OUTPUT_DIR_CACHE,
+                                               ttl_hours=mr_conf.PAGE_CACHE_TTL_HOURS,
+                                               max_size_mb=mr_conf.PAGE_CACHE_MAX_SIZE_MB),
+                               telemetry=FetchTelemetry(mr_conf.OUTPUT_DIR_TELEMETRY / 'fetch_log.jsonl'),
+                               extraction=create_extraction_chain(mr_conf.get_variables(['AUTHENTICATION',
+                                                                                          'EXTRACTION',
+                                                                                          'TAVILY'])))
+
+    def print_elapsed(start_time: float):
+        total_seconds = time.time() - start_time
+        minutes = int(total_seconds // 60)
+        seconds = round(total_seconds % 60)
+        print(f'Время выполнения: {minutes} мин. {seconds} сек.')
+
+    # 1. Поисковая выдача по всем контейнерам (запросы Tavily и первые страницы Yandex всех контейнеров
+    # уходят сразу, операции Yandex опрашиваются вместе)
+    TavilyParser.prefetch(tasks_to_parse)
+    YandexParser.prefetch(tasks_to_parse)
     for task in tasks_to_parse:
         start_time = time.time()
 
@@ -61,19 +106,27 @@ if __name__ == "__main__":
 
         task.parse_processed_data()
 
-        task.parse_raw_data(max_threads=20,
-                            page_load_timeout=8000,
-                            show_browser=False
-                            )
+        print_elapsed(start_time)
 
-        task.parse_post_processing()
+    # Сессия Telegram и пул сессий выдачи Google общие для всех контейнеров этапа 1
+    run_async(TelegramSession.close_all())
+    run_async(TelegramWebSession.close_all())
+    GoogleSerpPool.close_all()
+    get_search_cache(mr_conf.OUTPUT_DIR_CACHE,
+                     ttl_hours=mr_conf.SEARCH_CACHE_TTL_HOURS,
+                     max_size_mb=mr_conf.SEARCH_CACHE_MAX_SIZE_MB).print_statistics()
 
+    # 2. Единая загрузка страниц всех контейнеров: каждая ссылка загружается один раз
+    start_time = time.time()
+    FetchPlanner(page_fetcher=page_fetcher, max_concurrent=20).parse_raw_data(tasks_to_parse)
+    print_elapsed(start_time)
 
-        end_time = time.time()
-        total_seconds = end_time - start_time
-        minutes = int(total_seconds // 60)
-        seconds = round(total_seconds % 60)
-        print(f'Время выполнения: {minutes} мин. {seconds} сек.')
+    # 3. Постобработка
+    for task in tasks_to_parse:
+        task.parse_post_processing()
+
+    run_async(page_fetcher.close())
+    close_event_loop()
 
     # Архивация всех файлов
     create_archives(
@@ -5,14 +5,20 @@ from dataclasses import dataclass, field
 import hashlib
 import json
 import glob
-from typing import List, Dict, Any
-from tqdm.asyncio import tqdm_asyncio
+from typing import List, Dict, Any, Optional
 
+from parsers.google_api_parser import GoogleAPIParser
+from parsers.extraction_providers import create_extraction_chain
+from parsers.feed_parser import FeedParser
 from parsers.google_parser import GoogleParser
+from parsers.page_fetcher import PageFetcher, create_browser
+from parsers.wait_profiles import WaitProfiles
 from parsers.tavily_parser import TavilyParser
 from parsers.telegram_parser import TelegramParser
-from parsers.website_parser import WebsiteParser
 from parsers.yandex_parser import YandexParser
+from tools.async_runner import run_async
+from tools.fetch_telemetry import FetchTelemetry
+from tools.page_cache import PageCache
 
 
 @dataclass
@@ -54,9 +60,11 @@ class ContainerNewsItem:
         # Маппинг названий источников из to_parse в классы парсеров
         parser_map = {
             'Google': GoogleParser,
+            'GoogleAPI': GoogleAPIParser,
             'Tavily': TavilyParser,
             'Telegram': TelegramParser,
             'Yandex': YandexParser,
+            'Feeds': FeedParser,
         }
 
         for source, queries_or_urls in self.to_parse.items():
@@ -115,8 +123,8 @@ class ContainerNewsItem:
     ) -> List[Dict[str, Any]]:
         seen = {}
         distinct_data = []
-        # В первую очередь берем те ссылки, у которых есть данные
-        data = sorted(data, key=lambda item: item.get('raw_data'), reverse=True)
+        # В первую очередь берем записи с полным текстом страницы, затем те, у которых есть данные
+        data = sorted(data, key=lambda item: (bool(item.get('full_text')), item.get('raw_data') or ''), reverse=True)
         for item in data:
             try:
                 key = tuple(item[field] for field in unique_fields)
@@ -143,7 +151,8 @@ class ContainerNewsItem:
         return distinct_data
 
     async def fill_raw_data_by_parse_websites_async(self, data: List[Dict[str, Any]], max_concurrent: int = 5,
-                                                    process_timeout: int = 15000, show_browser: bool = False) -> List[
+                                                    process_timeout: int = 15000, show_browser: bool = False,
+                                                    page_fetcher: Optional[PageFetcher] = None) -> List[
         Dict[str, Any]]:
         print(f"Общее количество записей: {len(data)}")
 
@@ -155,36 +164,67 @@ class ContainerNewsItem:
             print("Все записи уже заполнены, парсинг не требуется.")
             return data
 
-        semaphore = asyncio.Semaphore(max_concurrent)
+        # Если общий загрузчик не передан, создаём свой на время обработки контейнера
+        own_fetcher = page_fetcher is None
+        if own_fetcher:
+            page_fetcher = PageFetcher(browser=create_browser(engine=self.parameters.get('BROWSER_ENGINE', 'selenium'),
+                                                              size=max_concurrent,
+                                                              page_load_timeout=process_timeout,
+                                                              show_browser=show_browser,
+                                                              wait_profiles=self.create_wait_profiles()),
+                                       cache=self.create_page_cache(),
+                                       telemetry=self.create_fetch_telemetry(),
+                                       extraction=create_extraction_chain(self.parameters))
 
-        async def parse_item(item: Dict[str, Any]):
-            async with semaphore:
-                try:
-                    async with WebsiteParser(page_load_timeout=process_timeout,
-                                                  show_browser=show_browser) as parser:
-                        result = await parser.parse(item['url'])
-                        item['raw_data'] = result if result else ''
-                except Exception as e:
-                    print(f"Ошибка парсинга {item['url']}: {e}")
-                    item['raw_data'] = ''
+        try:
+            results = await page_fetcher.fetch_many([item['url'] for item in to_parse],
+                                                    max_concurrent=max_concurrent)
+            for item in to_parse:
+                item['raw_data'] = results[item['url']]['text'] or ''
+                item['full_text'] = bool(item['raw_data'])
+        finally:
+            if own_fetcher:
+                await page_fetcher.close()
 
-        tasks = [parse_item(item) for item in to_parse]
-        await tqdm_asyncio.gather(*tasks, desc="Парсинг сайтов")
+        page_fetcher.print_statistics()
 
         # Объединяем обратно списки
         combined = already_filled + to_parse
         return combined
 
+    def create_page_cache(self) -> Optional[PageCache]:
+        """Дисковый кэш страниц по настройкам контейнера (None, если папка кэша не задана)"""
+        cache_dir = self.parameters.get('OUTPUT_DIR_CACHE')
+        if not cache_dir:
+            return None
+        return PageCache(directory=cache_dir,
+                         ttl_hours=self.parameters.get('PAGE_CACHE_TTL_HOURS', 24 * 30),
+                         max_size_mb=self.parameters.get('PAGE_CACHE_MAX_SIZE_MB', 2048))
+
+    def create_fetch_telemetry(self) -> Optional[FetchTelemetry]:
+        """Журнал замеров загрузки страниц (None, если папка телеметрии не задана)"""
+        telemetry_dir = self.parameters.get('OUTPUT_DIR_TELEMETRY')
+        if not telemetry_dir:
+            return None
+        return FetchTelemetry(os.path.join(telemetry_dir, 'fetch_log.jsonl'))
+
+    def create_wait_profiles(self) -> WaitProfiles:
+        """Профили ожидания страниц по доменам, сохраняемые рядом с кэшем страниц (если он задан)"""
+        cache_dir = self.parameters.get('OUTPUT_DIR_CACHE')
+        return WaitProfiles(path=os.path.join(cache_dir, 'wait_profiles.json') if cache_dir else None)
+
     def fill_raw_data_by_parse_websites(self, full_data: List[Dict[str, Any]],
                                         max_threads: int,
                                         page_load_timeout: int = 15000,
-                                        show_browser: bool = True) -> List[Dict[str, Any]]:
-        # Используем нашу асинхронную реализацию
-        return asyncio.run(self.fill_raw_data_by_parse_websites_async(
+                                        show_browser: bool = True,
+                                        page_fetcher: Optional[PageFetcher] = None) -> List[Dict[str, Any]]:
+        # Используем нашу асинхронную реализацию в общем цикле, чтобы загрузчик жил между контейнерами
+        return run_async(self.fill_raw_data_by_parse_websites_async(
             data=full_data,
             max_concurrent=max_threads,
             process_timeout=page_load_timeout,
-            show_browser=show_browser
+            show_browser=show_browser,
+            page_fetcher=page_fetcher
         ))
     # async def fill_raw_data_by_parse_websites_async(self, data: List[Dict[str, Any]], max_concurrent: int = 5,
     #                                                 process_timeout: int = 15000, show_browser: bool = False) -> List[Dict[str, Any]]:
@@ -235,12 +275,34 @@ class ContainerNewsItem:
     def parse_raw_data(self,
                        max_threads: int,
                        page_load_timeout: int = 15000,
-                       show_browser: bool = True):
+                       show_browser: bool = True,
+                       page_fetcher: Optional[PageFetcher] = None):
         print('\n**** PARSING RAW DATA FROM JSON FILES ****\n')
+        full_data = self.load_processed_data()
+        if full_data is None:
+            return []
+
+        # Заполнение данных из сайтов
+        full_data = self.fill_raw_data_by_parse_websites(full_data=full_data,
+                                                         max_threads=max_threads,
+                                                         page_load_timeout=page_load_timeout,
+                                                         show_browser=show_browser,
+                                                         page_fetcher=page_fetcher)
+
+        # Сохранение в json
+        self.to_json(full_data, 'RAW')
+
+        return full_data
+
+    def load_processed_data(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Собирает обработанные данные всех источников контейнера (без дубликатов и с исправленными
+        метаданными) для этапа RAW. Возвращает None, если RAW-файл уже есть или папка не найдена.
+        """
         folder = self.parameters.get('OUTPUT_DIR_RAW', '')
         if not folder or not os.path.isdir(folder):
             print(f"Папка для обработанных данных не найдена: {folder}")
-            return []
+            return None
 
         full_data = []
         filename_template = f"RAW_{self.parameters.get('TEMPLATES_FILENAME_BASE').format(**self.metadata)}.json"
@@ -249,7 +311,7 @@ class ContainerNewsItem:
         raw_file_path = os.path.join(folder, filename_template)
         if os.path.isfile(raw_file_path):
             print(f"     >> SKIPPING {filename_template}, because files already exist!")
-            return []
+            return None
 
         print(f'Using data from: {list(self.to_parse.keys())}')
         for source in self.to_parse.keys():
@@ -272,6 +334,18 @@ class ContainerNewsItem:
                     print(f"Файлы для {source} с шаблоном {pattern} не найдены.")
                     continue
 
+                # Telegram собирается один раз на категорию: сообщения региона берутся из списков
+                # регионов хранилища, а не из всей выгрузки каналов (если хранилище синхронизировано
+                # не раньше, чем была записана выгрузка)
+                if source == 'Telegram':
+                    region_data = TelegramParser.load_region_data(self.parameters, self.metadata,
+                                                                  self.to_parse[source],
+                                                                  synced_after=min(map(os.path.getmtime, files)) - 3600)
+                    if region_data is not None:
+                        print(f"Telegram: сообщений региона из хранилища: {len(region_data)}")
+                        full_data.extend(region_data)
+                        continue
+
                 for filepath in files:
                     try:
                         with open(filepath, 'r', encoding='utf-8') as f:
@@ -289,15 +363,6 @@ class ContainerNewsItem:
         # Исправление метаданных после сборки (например тг собирается только один раз, поэтому надо исправить регион)
         full_data = self.fix_metadata(full_data)
 
-        # Заполнение данных из сайтов
-        full_data = self.fill_raw_data_by_parse_websites(full_data=full_data,
-                                                         max_threads=max_threads,
-                                                         page_load_timeout=page_load_timeout,
-                                                         show_browser=show_browser)
-
-        # Сохранение в json
-        self.to_json(full_data, 'RAW')
-
         return full_data
 
     def parse_post_processing(self):
@@ -9,7 +9,8 @@ class NewsItem:
             source: str,
             metadata: Dict[str, Any],
             approved: bool,
-            raw_data: str = ''
+            raw_data: str = '',
+            full_text: bool = False
     ):
         self.source = source
         self.metadata = metadata
@@ -17,10 +18,13 @@ class NewsItem:
         self.title = title
         self.raw_data = raw_data
         self.approved = approved
+        # raw_data содержит полный текст страницы (а не сниппет) — страницу не нужно загружать повторно
+        self.full_text = full_text
 
     def __repr__(self):
         return (f"NewsItem(source={self.source!r}, metadata={self.metadata!r}, url={self.url!r}, "
-                f"title={self.title!r}, raw_data={self.raw_data!r}, approved={self.approved!r})")
+                f"title={self.title!r}, raw_data={self.raw_data!r}, approved={self.approved!r}, "
+                f"full_text={self.full_text!r})")
 
     def get_full_data_dict(self) -> dict:
         return {
@@ -30,4 +34,5 @@ class NewsItem:
             "title": self.title,
             "raw_data": self.raw_data,
             "approved": self.approved,
+            "full_text": self.full_text,
         }
@@ -2,10 +2,12 @@ import json
 import os
 from datetime import datetime
 from abc import ABC, abstractmethod
+from typing import Optional
 
 import pandas as pd
 
 from news.news_item import NewsItem
+from tools.search_cache import SearchCache, get_search_cache
 
 
 class BaseParser(ABC):
@@ -88,6 +90,20 @@ class BaseParser(ABC):
             # raise
             print('ERROR FOR PARSING SOURCE!!!')
 
+    def get_search_cache(self) -> Optional[SearchCache]:
+        """Общий кэш ответов поисковых API (None, если папка кэша не задана или SEARCH_CACHE_TTL_HOURS <= 0)"""
+        cache_dir = self.parameters.get('OUTPUT_DIR_CACHE')
+        ttl_hours = self.parameters.get('SEARCH_CACHE_TTL_HOURS', 24 * 7)
+        if not cache_dir or ttl_hours <= 0:
+            return None
+        return get_search_cache(cache_dir, ttl_hours=ttl_hours,
+                                max_size_mb=self.parameters.get('SEARCH_CACHE_MAX_SIZE_MB', 256))
+
+    def search_cache_key(self, query: str, limit: int, format: str = '', page: int = 0) -> str:
+        """Ключ кэша поискового ответа: поисковик, запрос, период контейнера, лимит, формат и страница"""
+        return SearchCache.make_key(self.class_name, query, self.metadata.get('DATE_FROM', ''),
+                                    self.metadata.get('DATE_TO', ''), limit, format, page)
+
     def check_approved_source(self, source) -> bool:
         return (
                 any(domain in source.lower() for domain in self.parameters.get('TRUSTED_SOURCES_DOMAINS', []))
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, List
+
+from parsers.wait_profiles import WaitProfiles
+from parsers.website_parser import WebsiteParser
+from tools.fetch_telemetry import FetchTrace
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Пул «тёплых» браузеров для WebsiteParser.
+
+    Держит до size запущенных драйверов на весь запуск, выдаёт их в аренду вызовам parse()
+    и сбрасывает состояние браузера между арендами. Драйверы запускаются лениво, по мере спроса.
+    Один пул можно передавать во все контейнеры (ContainerNewsItem.parse_raw_data),
+    если они выполняются в общем событийном цикле (tools.async_runner.run_async).
+    Профили ожидания по доменам (WaitProfiles) общие для всех драйверов пула и сохраняются при close().
+    """
+
+    def __init__(self, size: int = 5, page_load_timeout: int = 10000, show_browser: bool = False,
+                 max_uses_per_driver: int = 200, wait_profiles: Optional[WaitProfiles] = None):
+        self.size = size
+        self.page_load_timeout = page_load_timeout
+        self.show_browser = show_browser
+        # После стольких страниц драйвер перезапускается (Chrome со временем разрастается по памяти)
+        self.max_uses_per_driver = max_uses_per_driver
+        self.wait_profiles = wait_profiles if wait_profiles is not None else WaitProfiles()
+
+        self._idle: List[WebsiteParser] = []
+        self._uses = {}
+        self._started = 0
+        self._loop = None
+        self._condition = None
+
+    def _ensure_loop(self):
+        """Примитивы asyncio привязаны к циклу, поэтому пересоздаём их при смене цикла"""
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+
+    async def _start_parser(self) -> WebsiteParser:
+        parser = WebsiteParser(page_load_timeout=self.page_load_timeout, show_browser=self.show_browser,
+                               wait_profiles=self.wait_profiles)
+        await parser.start()
+        self._uses[id(parser)] = 0
+        return parser
+
+    async def _discard(self, parser: WebsiteParser):
+        self._uses.pop(id(parser), None)
+        self._started -= 1
+        await parser.close()
+
+    async def acquire(self, trace: Optional[FetchTrace] = None) -> WebsiteParser:
+        """Берёт свободный драйвер из пула (или запускает новый, если лимит не исчерпан)"""
+        trace = trace or FetchTrace('')
+        self._ensure_loop()
+        wait_started = time.perf_counter()
+        async with self._condition:
+            while not self._idle and self._started >= self.size:
+                await self._condition.wait()
+            trace.add_phase('pool_wait', time.perf_counter() - wait_started)
+
+            if self._idle:
+                return self._idle.pop()
+
+            # Резервируем место под новый драйвер до его запуска
+            self._started += 1
+
+        try:
+            with trace.phase('driver_start'):
+                return await self._start_parser()
+        except BaseException:
+            async with self._condition:
+                self._started -= 1
+                self._condition.notify()
+            raise
+
+    async def release(self, parser: WebsiteParser, broken: bool = False):
+        """Возвращает драйвер в пул, предварительно сбросив его состояние"""
+        self._ensure_loop()
+        self._uses[id(parser)] = self._uses.get(id(parser), 0) + 1
+
+        if not broken and self._uses[id(parser)] < self.max_uses_per_driver:
+            try:
+                await parser.reset()
+            except Exception as e:
+                logger.warning(f"Не удалось сбросить состояние драйвера, перезапускаем: {e}")
+                broken = True
+        else:
+            broken = True
+
+        if broken:
+            await self._discard(parser)
+
+        async with self._condition:
+            if not broken:
+                self._idle.append(parser)
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def lease(self, trace: Optional[FetchTrace] = None):
+        """Контекстный менеджер аренды драйвера: async with pool.lease() as parser: ..."""
+        parser = await self.acquire(trace)
+        broken = False
+        try:
+            yield parser
+        except BaseException:
+            # В том числе CancelledError: поток исполнителя может ещё работать с драйвером,
+            # поэтому в пул он не возвращается, а перезапускается
+            broken = True
+            raise
+        finally:
+            await self.release(parser, broken=broken)
+
+    async def parse(self, url: str) -> Optional[str]:
+        """Парсинг URL на арендованном драйвере (тот же контракт, что у WebsiteParser.parse)"""
+        async with self.lease() as parser:
+            return await parser.parse(url)
+
+    async def parse_page(self, url: str, trace: Optional[FetchTrace] = None) -> Optional[dict]:
+        """Парсинг URL с исходным HTML на арендованном драйвере"""
+        async with self.lease(trace) as parser:
+            return await parser.parse_page(url, trace=trace)
+
+    async def close(self):
+        """Останавливает все простаивающие драйверы пула"""
+        idle, self._idle = self._idle, []
+        for parser in idle:
+            await self._discard(parser)
+        self.wait_profiles.save()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
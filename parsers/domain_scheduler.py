@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, List, Callable, Awaitable
+from urllib.parse import urlsplit
+
+from tqdm import tqdm
+
+
+class HostState:
+    """Состояние одного хоста: очередь ссылок, текущий лимит параллельности и интервал между запросами"""
+
+    def __init__(self, host: str, limit: float, interval: float):
+        self.host = host
+        self.pending = deque()
+        self.active = 0
+        self.limit = limit
+        self.interval = interval
+        self.next_start = 0.0
+
+        self.done = 0
+        self.backoffs = 0
+
+    def can_start(self, now: float) -> bool:
+        return bool(self.pending) and self.active < int(self.limit) and now >= self.next_start
+
+
+class DomainScheduler:
+    """
+    Планировщик загрузки страниц с вежливостью по доменам.
+
+    Вместо одного глобального семафора у каждого хоста свой лимит одновременных запросов
+    и минимальный интервал между их запусками, а свободные слоты раздаются хостам по кругу,
+    поэтому один крупный домен не занимает все потоки, пока остальные простаивают.
+
+    Лимиты подстраиваются по ответам (AIMD):
+    - 429, 5xx и таймауты — лимит хоста уменьшается вдвое, интервал удваивается (или берётся Retry-After);
+    - быстрые успешные ответы — лимит плавно растёт до max_per_host, интервал сокращается до min_interval.
+
+    Ссылка, на которую хост ответил 429 или 5xx (результат fetch с throttled=True), возвращается
+    в конец очереди хоста и повторяется после отката. fetch(url, retries_left) получает число
+    оставшихся повторов: на последней попытке загрузчик уже не откладывает ссылку, а эскалирует её.
+    """
+
+    def __init__(self, max_concurrent: int = 20, per_host: int = 2, max_per_host: int = 6,
+                 min_interval: float = 0.25, max_interval: float = 30.0, fast_response: float = 3.0,
+                 max_retries: int = 2):
+        self.max_concurrent = max_concurrent
+        self.per_host = per_host
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Ответ быстрее этого (в секундах) считается признаком того, что хост справляется с нагрузкой
+        self.fast_response = fast_response
+        self.max_retries = max_retries
+
+        self.hosts: Dict[str, HostState] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        host = (urlsplit(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def _host_state(self, host: str) -> HostState:
+        if host not in self.hosts:
+            self.hosts[host] = HostState(host, limit=self.per_host, interval=self.min_interval)
+        return self.hosts[host]
+
+    @staticmethod
+    def is_overloaded(result: Dict[str, Any]) -> bool:
+        """Признаки того, что хост не справляется или ограничивает нас"""
+        status = result.get('status')
+        return status == 429 or (status is not None and status >= 500) or result.get('error') == 'timeout'
+
+    @staticmethod
+    def is_throttled(result: Dict[str, Any]) -> bool:
+        """
+        Хост отказал ответом 429 или 5xx без текста и это не заглушка защиты от ботов —
+        ссылку стоит повторить позже
+        """
+        status = result.get('status')
+        return ((status == 429 or (status is not None and status >= 500))
+                and not result.get('text') and not result.get('challenge'))
+
+    def feedback(self, state: HostState, result: Dict[str, Any], elapsed: float):
+        """Корректирует лимит и интервал хоста по результату запроса"""
+        if self.is_overloaded(result):
+            state.backoffs += 1
+            state.limit = max(1.0, state.limit / 2)
+            state.interval = min(self.max_interval, max(state.interval * 2, self.min_interval * 4))
+            retry_after = result.get('retry_after')
+            if retry_after:
+                state.interval = min(self.max_interval, max(state.interval, retry_after))
+            state.next_start = max(state.next_start, time.monotonic() + state.interval)
+        elif result.get('text') and elapsed < self.fast_response:
+            state.limit = min(float(self.max_per_host), state.limit + 1 / state.limit)
+            state.interval = max(self.min_interval, state.interval * 0.8)
+
+    async def run(self, urls: List[str], fetch: Callable[[str, int], Awaitable[Dict[str, Any]]],
+                  desc: str = "Парсинг сайтов") -> Dict[str, Dict[str, Any]]:
+        """Загружает все URL функцией fetch с учётом лимитов хостов, возвращает {url: результат}"""
+        for url in urls:
+            self._host_state(self.get_host(url)).pending.append(url)
+
+        ring = deque(state for state in self.hosts.values() if state.pending)
+        results = {}
+        retries: Dict[str, int] = {}
+        running = set()
+        progress = tqdm(total=len(urls), desc=desc)
+
+        async def fetch_one(state: HostState, url: str):
+            started = time.monotonic()
+            try:
+                result = await fetch(url, self.max_retries - retries.get(url, 0))
+            except Exception as e:
+                print(f"Ошибка парсинга {url}: {e}")
+                result = {'url': url, 'text': '', 'engine': None, 'status': None,
+                          'error': e.__class__.__name__}
+            # Результаты из кэша не нагружают хост и ничего не говорят о его состоянии
+            if result.get('engine') != 'cache':
+                self.feedback(state, result, time.monotonic() - started)
+            state.active -= 1
+            if result.get('throttled') and retries.get(url, 0) < self.max_retries:
+                # Повтор после отката хоста: ссылка встаёт в конец его очереди
+                retries[url] = retries.get(url, 0) + 1
+                state.pending.append(url)
+                if state not in ring:
+                    ring.append(state)
+                return
+            state.done += 1
+            results[url] = result
+            progress.update(1)
+
+        try:
+            while ring or running:
+                now = time.monotonic()
+
+                # Раздаём свободные слоты хостам по кругу, по одной ссылке за проход
+                started_any = True
+                while started_any and len(running) < self.max_concurrent:
+                    started_any = False
+                    for _ in range(len(ring)):
+                        if len(running) >= self.max_concurrent:
+                            break
+                        state = ring[0]
+                        ring.rotate(-1)
+                        if not state.can_start(now):
+                            continue
+                        url = state.pending.popleft()
+                        state.active += 1
+                        state.next_start = now + state.interval
+                        running.add(asyncio.ensure_future(fetch_one(state, url)))
+                        started_any = True
+
+                    # Хосты без ссылок выбывают из круга
+                    for state in [s for s in ring if not s.pending]:
+                        ring.remove(state)
+
+                if not ring and not running:
+                    break
+
+                # Ждём завершения любого запроса или ближайшего разрешённого запуска
+                # (таймер нужен, только если есть свободный глобальный слот)
+                timeout = None
+                if len(running) < self.max_concurrent:
+                    waiting = [s.next_start for s in ring if s.pending and s.active < int(s.limit)]
+                    timeout = max(0.0, min(waiting) - time.monotonic()) if waiting else None
+                if running:
+                    done, running = await asyncio.wait(running, timeout=timeout,
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                elif timeout is not None:
+                    await asyncio.sleep(timeout)
+        finally:
+            for task in running:
+                task.cancel()
+            progress.close()
+
+        return results
+
+    def print_statistics(self, top: int = 5):
+        """Хосты с наибольшим числом загрузок и их итоговые лимиты"""
+        busiest = sorted(self.hosts.values(), key=lambda s: s.done, reverse=True)[:top]
+        if not busiest:
+            return
+        print("Хосты (загружено / лимит / интервал, с / откатов):")
+        for state in busiest:
+            print(f"  {state.host}: {state.done} / {int(state.limit)} / {state.interval:.2f} / {state.backoffs}")
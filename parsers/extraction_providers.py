@@ -0,0 +1,220 @@
+"""
+Пакетное извлечение текста страниц внешними сервисами — уровень PageFetcher перед браузером.
+
+Провайдер получает пачку URL и возвращает тексты тех, что удалось извлечь:
+- TavilyExtractProvider — Tavily Extract (клиент tavily и TAVILY_API_KEY, общий лимитер запросов Tavily);
+- HttpExtractProvider — любой сервис с тем же форматом ответа по HTTP, например локальная
+  замена tools.local_fixtures.ExtractServer.
+
+ExtractionChain собирает одиночные запросы PageFetcher в пачки (batch_size или пауза linger)
+и опрашивает провайдеров по порядку: текст URL берётся у первого, кто вернул не меньше min_chars
+символов, остальные URL переходят к следующему провайдеру, а после всех — в браузер.
+"""
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from tavily import TavilyClient
+
+from tools.rate_limiter import get_rate_limiter
+
+EXTRACTION_PROVIDERS = ['tavily', 'local']
+
+
+class ExtractionProvider(ABC):
+    """Провайдер пакетного извлечения: extract(urls) -> {url: текст} (вызывается в отдельном потоке)"""
+
+    name = ''
+
+    def __init__(self, batch_size: int = 20):
+        self.batch_size = batch_size
+
+    @abstractmethod
+    def extract(self, urls: List[str]) -> Dict[str, str]:
+        """Тексты извлечённых URL; URL без текста в ответ не входят"""
+
+    def close(self):
+        pass
+
+
+class TavilyExtractProvider(ExtractionProvider):
+    """Tavily Extract: до 20 URL за запрос, запросы идут под общим лимитером Tavily"""
+
+    name = 'tavily'
+
+    def __init__(self, api_key: str, batch_size: int = 20, extract_depth: str = 'basic',
+                 requests_per_second: float = 2.0, timeout: float = 60):
+        super().__init__(batch_size=min(batch_size, 20))
+        self.api_key = api_key
+        self.extract_depth = extract_depth
+        self.timeout = timeout
+        self.limiter = get_rate_limiter('tavily', rate=requests_per_second)
+        self._local = threading.local()
+
+    def _get_client(self) -> TavilyClient:
+        """TavilyClient текущего потока (requests.Session не рассчитана на общий доступ из потоков)"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = TavilyClient(api_key=self.api_key)
+            self._local.client = client
+        return client
+
+    def extract(self, urls: List[str]) -> Dict[str, str]:
+        self.limiter.acquire()
+        response = self._get_client().extract(urls=urls, extract_depth=self.extract_depth, format='text',
+                                              timeout=self.timeout)
+        return {result['url']: result.get('raw_content') or ''
+                for result in response.get('results', []) if result.get('url')}
+
+
+class HttpExtractProvider(ExtractionProvider):
+    """
+    Сервис извлечения по HTTP: POST {endpoint} с JSON {'urls': [...]},
+    ответ в формате Tavily Extract {'results': [{'url', 'raw_content'}], 'failed_results': [...]}
+    """
+
+    name = 'local'
+
+    def __init__(self, endpoint: str, batch_size: int = 20, timeout: float = 60):
+        super().__init__(batch_size=batch_size)
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def extract(self, urls: List[str]) -> Dict[str, str]:
+        response = requests.post(self.endpoint, json={'urls': urls}, timeout=self.timeout)
+        response.raise_for_status()
+        return {result['url']: result.get('raw_content') or ''
+                for result in response.json().get('results', []) if result.get('url')}
+
+
+class ExtractionChain:
+    """
+    Цепочка провайдеров с накоплением пачек для PageFetcher.
+
+    extract(url) ставит URL в пачку первого провайдера; пачка отправляется, когда набрано batch_size
+    URL или прошло linger секунд. URL без пригодного текста переходят к следующему провайдеру.
+    Провайдер, давший max_errors ошибок подряд (например, исчерпана квота), до конца запуска отключается.
+    Очереди и таймеры привязаны к событийному циклу и создаются заново при его смене.
+    """
+
+    def __init__(self, providers: List[ExtractionProvider], min_chars: int = 500, linger: float = 0.3,
+                 max_errors: int = 3):
+        self.providers = providers
+        self.min_chars = min_chars
+        self.linger = linger
+        self.max_errors = max_errors
+
+        self.stats = {provider.name: {'batches': 0, 'urls': 0, 'extracted': 0, 'seconds': 0.0, 'errors': 0}
+                      for provider in providers}
+        self._errors_in_row = [0] * len(providers)
+
+        self._loop = None
+        self._queues: List[List[Tuple[str, asyncio.Future]]] = []
+        self._timers = []
+
+    def _ensure_loop(self):
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queues = [[] for _ in self.providers]
+            self._timers = [None] * len(self.providers)
+
+    def is_enabled(self, index: int) -> bool:
+        return self._errors_in_row[index] < self.max_errors
+
+    async def extract(self, url: str) -> Optional[Tuple[str, str]]:
+        """(имя провайдера, текст) от первого провайдера с пригодным текстом или None"""
+        self._ensure_loop()
+        for index, provider in enumerate(self.providers):
+            if not self.is_enabled(index):
+                continue
+            text = await self._submit(index, url)
+            if text and len(text) >= self.min_chars:
+                self.stats[provider.name]['extracted'] += 1
+                return provider.name, text
+        return None
+
+    def _submit(self, index: int, url: str) -> asyncio.Future:
+        future = self._loop.create_future()
+        self._queues[index].append((url, future))
+        if len(self._queues[index]) >= self.providers[index].batch_size:
+            self._flush(index)
+        elif self._timers[index] is None:
+            self._timers[index] = self._loop.call_later(self.linger, self._flush, index)
+        return future
+
+    def _flush(self, index: int):
+        if self._timers[index] is not None:
+            self._timers[index].cancel()
+            self._timers[index] = None
+        batch, self._queues[index] = self._queues[index], []
+        if batch:
+            self._loop.create_task(self._run_batch(index, batch))
+
+    async def _run_batch(self, index: int, batch: List[Tuple[str, asyncio.Future]]):
+        provider = self.providers[index]
+        stats = self.stats[provider.name]
+        urls = [url for url, _ in batch]
+        start_time = time.perf_counter()
+        try:
+            texts = await asyncio.to_thread(provider.extract, urls)
+            self._errors_in_row[index] = 0
+        except Exception as e:
+            texts = {}
+            stats['errors'] += 1
+            self._errors_in_row[index] += 1
+            print(f"⚠ Извлечение ({provider.name}): ошибка пачки из {len(urls)} URL: {e}")
+            if not self.is_enabled(index):
+                print(f"⚠ Извлечение ({provider.name}): провайдер отключён до конца запуска")
+        finally:
+            stats['batches'] += 1
+            stats['urls'] += len(urls)
+            stats['seconds'] += time.perf_counter() - start_time
+
+        for url, future in batch:
+            if not future.done():
+                future.set_result(texts.get(url, ''))
+
+    def print_statistics(self, browser_seconds_per_page: float):
+        """Пропускная способность провайдеров и оценка сэкономленного времени браузера"""
+        extracted_total = 0
+        for name, stats in self.stats.items():
+            throughput = stats['urls'] / stats['seconds'] if stats['seconds'] else 0.0
+            print(f"Извлечение ({name}): пачек {stats['batches']}, URL {stats['urls']}, "
+                  f"с текстом {stats['extracted']}, ошибок {stats['errors']}, {throughput:.1f} URL/с")
+            extracted_total += stats['extracted']
+        saved_minutes = extracted_total * browser_seconds_per_page / 60
+        print(f"📊 Без браузера извлечено {extracted_total} страниц, "
+              f"сэкономлено ≈ {saved_minutes:.1f} браузер-мин ({browser_seconds_per_page:.1f} с на страницу)")
+
+    def close(self):
+        for provider in self.providers:
+            provider.close()
+
+
+def create_extraction_chain(parameters: dict) -> Optional[ExtractionChain]:
+    """
+    Цепочка по настройкам EXTRACTION_PROVIDERS (порядок опроса, например ['tavily'] или ['local', 'tavily']);
+    None, если провайдеры не заданы
+    """
+    names = parameters.get('EXTRACTION_PROVIDERS') or []
+    batch_size = parameters.get('EXTRACTION_BATCH_SIZE', 20)
+    providers = []
+    for name in names:
+        if name == 'tavily':
+            providers.append(TavilyExtractProvider(
+                parameters['AUTHENTICATION']['TAVILY_API_KEY'],
+                batch_size=batch_size,
+                extract_depth=parameters.get('EXTRACTION_TAVILY_DEPTH', 'basic'),
+                requests_per_second=parameters.get('TAVILY_REQUESTS_PER_SECOND', 2.0)))
+        elif name == 'local':
+            providers.append(HttpExtractProvider(parameters['EXTRACTION_LOCAL_URL'], batch_size=batch_size))
+        else:
+            raise ValueError(f"Неизвестный провайдер извлечения '{name}', доступны: {EXTRACTION_PROVIDERS}")
+    if not providers:
+        return None
+    return ExtractionChain(providers, min_chars=parameters.get('EXTRACTION_MIN_CHARS', 500),
+                           linger=parameters.get('EXTRACTION_LINGER', 0.3))
@@ -0,0 +1,371 @@
+import html
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from dateutil import parser as date_parser
+from lxml import etree
+
+from parsers.base_parser import BaseParser
+from news.news_item import NewsItem
+from tools.feed_store import FeedStore, get_feed_store
+
+
+class FeedParser(BaseParser):
+    """
+    Новости доверенных доменов (TRUSTED_SOURCES_DOMAINS) из их лент RSS/Atom и новостных карт сайтов
+    (источник 'Feeds') — без поисковиков и браузера.
+
+    Запрос — домен. Ленты домена берутся из FEEDS_URLS, иначе ищутся один раз в неделю (Sitemap: из
+    robots.txt и типовые адреса лент). Каждая лента опрашивается один раз за запуск условным GET
+    (на 304 Not Modified ничего не скачивается), новые записи сохраняются в FeedStore по GUID.
+    Из хранилища выбираются записи за DATE_FROM..DATE_TO (по дате публикации из ленты), в заголовке
+    или описании которых есть ключевые слова категории и региона. Для региональных доменов
+    (FEEDS_DOMAIN_REGIONS) регион считается совпавшим. Если лента содержит полный текст
+    (yandex:full-text, content:encoded), он сохраняется как raw_data с full_text=True.
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (compatible; hot-news-feeds/1.0)'
+    FEED_PATHS = ['/rss', '/rss.xml', '/feed', '/export/rss2/index.xml']
+    DISCOVERY_MAX_AGE = 7 * 24 * 3600
+    # Слова подкатегорий, не помогающие отличить категорию (для ключевых слов по умолчанию)
+    STOP_WORDS = {'новости', 'анализ', 'динамика', 'почему', 'изменилась', 'изменения', 'факторы', 'тенденции',
+                  'обзор', 'прогноз', 'сравнение', 'региональные', 'различия', 'государственная', 'поддержка'}
+
+    def __init__(self, requests_to_parse: list[str], parameters: dict, metadata: dict, save_to: dict):
+        super().__init__()
+        self.class_name = 'Feeds'
+        self.requests_to_parse = requests_to_parse
+        self.metadata = metadata
+        self.parameters = parameters
+        self.save_to = save_to
+        self.stats = {'feeds': 0, 'not_modified': 0, 'new_items': 0, 'errors': 0}
+        self._local = threading.local()
+
+        self.raw_data = [i for i in list(set(self.parse()))]
+
+        if save_to.get('TO_EXCEL', False):
+            self.to_excel()
+        if save_to.get('TO_JSON', False):
+            self.to_json()
+
+        self.print_statistics()
+
+    @property
+    def class_name(self) -> str:
+        return self._class_name
+
+    @class_name.setter
+    def class_name(self, value: str):
+        self._class_name = value
+
+    @property
+    def raw_data(self) -> list:
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: list):
+        self._raw_data = value
+
+    @property
+    def requests_to_parse(self) -> list[str]:
+        return self._requests_to_parse
+
+    @requests_to_parse.setter
+    def requests_to_parse(self, value: list[str]):
+        self._requests_to_parse = value
+
+    @property
+    def metadata(self) -> dict:
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: dict):
+        self._metadata = value
+
+    @property
+    def parameters(self) -> dict:
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, value: dict):
+        self._parameters = value
+
+    # ---- Разбор лент ----
+
+    @staticmethod
+    def parse_date(value: Optional[str]) -> Optional[float]:
+        """Timestamp даты RFC 822 (RSS) или ISO 8601 (Atom, карты сайтов); дата без зоны считается UTC"""
+        if not value or not value.strip():
+            return None
+        value = value.strip()
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            try:
+                parsed = date_parser.parse(value)
+            except (ValueError, OverflowError):
+                return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+    @staticmethod
+    def clean_text(value: Optional[str]) -> str:
+        """Текст без HTML-тегов, сущностей и лишних пробелов"""
+        if not value:
+            return ''
+        return ' '.join(html.unescape(re.sub(r'<[^>]+>', ' ', value)).split())
+
+    @staticmethod
+    def _child_text(element, *names: str) -> str:
+        """Текст первого дочернего элемента с одним из локальных имён (без учёта пространства имён)"""
+        for child in element:
+            if isinstance(child.tag, str) and etree.QName(child).localname in names and child.text:
+                return child.text
+        return ''
+
+    @classmethod
+    def parse_feed(cls, content: bytes) -> Tuple[List[Dict], List[Tuple[str, Optional[float]]]]:
+        """
+        Записи ленты RSS/Atom или карты сайта [{'guid', 'url', 'title', 'description', 'full_text', 'published'}]
+        и вложенные карты сайтов [(адрес, lastmod)] для индекса карт
+        """
+        parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+        try:
+            root = etree.fromstring(content, parser=parser)
+        except etree.XMLSyntaxError:
+            return [], []
+        if root is None:
+            return [], []
+
+        items, sitemaps = [], []
+        kind = etree.QName(root).localname
+        if kind in ('rss', 'RDF'):
+            for element in root.iter('{*}item'):
+                url = cls._child_text(element, 'link').strip()
+                full_text = cls.clean_text(cls._child_text(element, 'full-text', 'encoded'))
+                items.append({
+                    'guid': cls._child_text(element, 'guid').strip() or url,
+                    'url': url,
+                    'title': cls.clean_text(cls._child_text(element, 'title')),
+                    'description': full_text or cls.clean_text(cls._child_text(element, 'description')),
+                    'full_text': bool(full_text),
+                    'published': cls.parse_date(cls._child_text(element, 'pubDate', 'date')),
+                })
+        elif kind == 'feed':
+            for element in root.iter('{*}entry'):
+                url = ''
+                for link in element.iter('{*}link'):
+                    if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+                        url = link.get('href').strip()
+                        break
+                items.append({
+                    'guid': cls._child_text(element, 'id').strip() or url,
+                    'url': url,
+                    'title': cls.clean_text(cls._child_text(element, 'title')),
+                    'description': cls.clean_text(cls._child_text(element, 'summary', 'content')),
+                    'full_text': False,
+                    'published': cls.parse_date(cls._child_text(element, 'published', 'updated')),
+                })
+        elif kind == 'urlset':
+            # Новостная карта сайта: заголовок и дата — в news:news
+            for element in root.iter('{*}url'):
+                url = cls._child_text(element, 'loc').strip()
+                news = next((child for child in element
+                             if isinstance(child.tag, str) and etree.QName(child).localname == 'news'), None)
+                title = cls._child_text(news, 'title') if news is not None else ''
+                published = cls._child_text(news, 'publication_date') if news is not None else ''
+                items.append({
+                    'guid': url,
+                    'url': url,
+                    'title': cls.clean_text(title),
+                    'description': cls.clean_text(cls._child_text(news, 'keywords')) if news is not None else '',
+                    'full_text': False,
+                    'published': cls.parse_date(published or cls._child_text(element, 'lastmod')),
+                })
+        elif kind == 'sitemapindex':
+            for element in root.iter('{*}sitemap'):
+                loc = cls._child_text(element, 'loc').strip()
+                if loc:
+                    sitemaps.append((loc, cls.parse_date(cls._child_text(element, 'lastmod'))))
+
+        # Без адреса, заголовка или даты запись нельзя ни отфильтровать по периоду, ни сопоставить с категорией
+        items = [item for item in items if item['url'] and item['title'] and item['published'] is not None]
+        return items, sitemaps
+
+    # ---- Опрос лент ----
+
+    def get_store(self) -> FeedStore:
+        return get_feed_store(self.parameters['OUTPUT_DIR_CACHE'])
+
+    def _get_session(self) -> requests.Session:
+        """HTTP-сессия текущего потока"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = self.USER_AGENT
+            self._local.session = session
+        return session
+
+    def _get(self, url: str, headers: Optional[Dict] = None) -> Optional[requests.Response]:
+        try:
+            return self._get_session().get(url, headers=headers or {}, timeout=15)
+        except requests.RequestException as e:
+            print(f"⚠ Feeds: {url}: {e}")
+            return None
+
+    def discover_feeds(self, domain: str) -> List[str]:
+        """Ленты домена: новостные карты сайтов из robots.txt и первая найденная лента по типовым адресам"""
+        feeds = []
+        response = self._get(f'https://{domain}/robots.txt')
+        if response is not None and response.status_code == 200:
+            sitemaps = [line.split(':', 1)[1].strip() for line in response.text.splitlines()
+                        if line.lower().startswith('sitemap:')]
+            feeds += [sitemap for sitemap in sitemaps if 'news' in sitemap.lower()][:3]
+
+        for path in self.FEED_PATHS:
+            response = self._get(f'https://{domain}{path}')
+            if response is not None and response.status_code == 200 and self.parse_feed(response.content)[0]:
+                feeds.append(response.url)
+                break
+        print(f"🔍 Feeds: {domain} — найдено лент: {len(feeds)}")
+        return feeds
+
+    def get_domain_feeds(self, domain: str) -> List[str]:
+        configured = self.parameters.get('FEEDS_URLS', {}).get(domain)
+        if configured:
+            return configured
+        store = self.get_store()
+        feeds = store.get_domain_feeds(domain, self.DISCOVERY_MAX_AGE)
+        if feeds is None:
+            feeds = self.discover_feeds(domain)
+            store.set_domain_feeds(domain, feeds)
+        return feeds
+
+    def poll_feed(self, domain: str, url: str, from_ts: float, nested: bool = False):
+        """Условный GET ленты и сохранение новых записей; из индекса карт — вложенные карты не старше периода"""
+        store = self.get_store()
+        if url in store.polled:
+            return
+        store.polled.add(url)
+
+        validators = store.get_validators(url)
+        headers = {}
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self._get(url, headers)
+        self.stats['feeds'] += 1
+        if response is None or response.status_code not in (200, 304):
+            self.stats['errors'] += 1
+            return
+        if response.status_code == 304:
+            self.stats['not_modified'] += 1
+            return
+
+        items, sitemaps = self.parse_feed(response.content)
+        self.stats['new_items'] += store.add_items(domain, items)
+        store.set_validators(url, domain, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+        if not nested:
+            recent = [loc for loc, lastmod in sitemaps if lastmod is None or lastmod >= from_ts]
+            for loc in recent[:self.parameters.get('FEEDS_MAX_SITEMAPS', 5)]:
+                self.poll_feed(domain, loc, from_ts, nested=True)
+
+    def poll_domain(self, domain: str, from_ts: float):
+        for url in self.get_domain_feeds(domain):
+            self.poll_feed(domain, url, from_ts)
+
+    # ---- Выборка ----
+
+    def get_period(self) -> Tuple[float, float]:
+        date_from = datetime.strptime(self.metadata['DATE_FROM'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        date_to = datetime.strptime(self.metadata['DATE_TO'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        return date_from.timestamp(), date_to.timestamp() + 24 * 3600 - 1
+
+    def get_category_keywords(self) -> List[str]:
+        """Ключевые слова категории из FEEDS_CATEGORY_KEYWORDS, иначе основы слов её подкатегорий"""
+        category = self.metadata.get('AVAILABLE_CATEGORIES', '')
+        keywords = self.parameters.get('FEEDS_CATEGORY_KEYWORDS', {}).get(category)
+        if keywords:
+            return keywords
+        words = {word for subcategory in self.parameters.get('SUBCATEGORIES', [])
+                 for word in re.findall(r'[а-яёa-z]+', subcategory.lower())}
+        return sorted({word[:6] for word in words if len(word) >= 5 and word not in self.STOP_WORDS})
+
+    @staticmethod
+    def build_pattern(keywords: List[str]) -> Optional[re.Pattern]:
+        keywords = [keyword.lower() for keyword in keywords if keyword]
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+    def parse(self) -> list[NewsItem]:
+        """Опрос лент доменов (параллельно) и выборка записей периода по категории и региону"""
+        print(f'\nFEEDS SCRAPING {self.metadata}')
+        if not self.parameters.get('OUTPUT_DIR_CACHE'):
+            print("❌ Feeds: не задана папка кэша OUTPUT_DIR_CACHE, источник пропущен")
+            return []
+
+        limits = {}
+        for request in self.requests_to_parse:
+            domain = request['query'] if isinstance(request, dict) else request
+            domain = urlparse(domain).netloc or domain
+            limits[domain.lower().removeprefix('www.')] = (request.get('search_limit') if isinstance(request, dict)
+                                                           else None) or self.parameters.get('SEARCH_LIMIT_FEEDS', 50)
+        from_ts, to_ts = self.get_period()
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.parameters.get('FEEDS_MAX_WORKERS', 8),
+                                thread_name_prefix='feeds') as executor:
+            list(executor.map(lambda domain: self.poll_domain(domain, from_ts), limits))
+        print(f"    Лент опрошено: {self.stats['feeds']}, без изменений (304): {self.stats['not_modified']}, "
+              f"новых записей: {self.stats['new_items']}, ошибок: {self.stats['errors']}, "
+              f"время: {time.monotonic() - started:.1f} с")
+
+        category_pattern = self.build_pattern(self.get_category_keywords())
+        region_pattern = self.build_pattern(self.parameters.get('REGION_KEYS', []))
+        region = self.metadata.get('AVAILABLE_REGIONS')
+        domain_regions = self.parameters.get('FEEDS_DOMAIN_REGIONS', {})
+
+        news_items = []
+        counts = {domain: 0 for domain in limits}
+        seen_urls = set()
+        for item in self.get_store().get_items(list(limits), from_ts, to_ts):
+            domain = item['domain']
+            if counts[domain] >= limits[domain] or item['url'] in seen_urls:
+                continue
+            text = f"{item['title']} {item['description']}"
+            if category_pattern is not None and not category_pattern.search(text):
+                continue
+            if (region_pattern is not None and domain_regions.get(domain) != region
+                    and not region_pattern.search(text)):
+                continue
+
+            seen_urls.add(item['url'])
+            counts[domain] += 1
+            news_items.append(
+                NewsItem(
+                    source=self.class_name,
+                    metadata=self.metadata,
+                    url=item['url'],
+                    title=item['title'],
+                    raw_data=item['description'] if item['full_text'] else '',
+                    approved=True,
+                    full_text=bool(item['full_text']),
+                )
+            )
+
+        for domain, count in counts.items():
+            if count:
+                print(f"    {domain}: {count}")
+        return news_items
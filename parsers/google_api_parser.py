@@ -0,0 +1,245 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from parsers.base_parser import BaseParser
+from parsers.google_serp_pool import GoogleSerpSession
+from news.news_item import NewsItem
+from tools.rate_limiter import get_rate_limiter
+
+
+class GoogleAPIParser(BaseParser):
+    """
+    Выдача Google через Custom Search JSON API вместо браузера (источник 'GoogleAPI').
+
+    Запросы строятся по тому же шаблону, что и для Google: операторы after:/before: переносятся
+    в sort=date:r:ГГГГММДД:ГГГГММДД, страницы запрашиваются через start (по 10 результатов, не дальше
+    100-го) и только пока их требует search_limit. Страницы всех запросов выполняются параллельно
+    в пуле потоков под общим на процесс лимитом запросов в секунду; ответ 429 приостанавливает
+    лимитер для всех потоков. Ответы страниц сохраняются в кэше поисковых ответов.
+
+    Нужны ключ GOOGLE_CLOUD_API_KEY и идентификатор поисковой системы GOOGLE_CSE_ID;
+    адрес API можно заменить (GOOGLE_API_URL), например на локальный tools.local_fixtures.CustomSearchServer.
+    """
+
+    DEFAULT_API_URL = 'https://www.googleapis.com/customsearch/v1'
+    # API возвращает не больше 10 результатов на страницу и не дальше 100-го результата
+    PAGE_SIZE = 10
+    MAX_RESULTS = 100
+
+    def __init__(self, requests_to_parse: list[str], parameters: dict, metadata: dict, save_to: dict):
+        super().__init__()
+        self.class_name = 'GoogleAPI'
+        self.requests_to_parse = requests_to_parse
+        self.metadata = metadata
+        self.parameters = parameters
+        self.save_to = save_to
+
+        self.api_url = parameters.get('GOOGLE_API_URL') or self.DEFAULT_API_URL
+        self.api_key = parameters['AUTHENTICATION'].get('GOOGLE_CLOUD_API_KEY')
+        self.cse_id = parameters['AUTHENTICATION'].get('GOOGLE_CSE_ID')
+        self.max_retries = parameters.get('GOOGLE_API_MAX_RETRIES', 3)
+        self.limiter = get_rate_limiter('google_api', rate=parameters.get('GOOGLE_API_REQUESTS_PER_SECOND', 5.0),
+                                        burst=parameters.get('GOOGLE_API_MAX_WORKERS', 4))
+        self._local = threading.local()
+
+        if not (self.api_key and self.cse_id):
+            print("❌ GoogleAPI: не заданы GOOGLE_CLOUD_API_KEY и GOOGLE_CSE_ID, источник пропущен")
+            self.raw_data = []
+        else:
+            self.raw_data = [i for i in list(set(self.parse()))]
+
+        if save_to.get('TO_EXCEL', False):
+            self.to_excel()
+        if save_to.get('TO_JSON', False):
+            self.to_json()
+
+        self.print_statistics()
+
+    @property
+    def class_name(self) -> str:
+        return self._class_name
+
+    @class_name.setter
+    def class_name(self, value: str):
+        self._class_name = value
+
+    @property
+    def raw_data(self) -> list:
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: list):
+        self._raw_data = value
+
+    @property
+    def requests_to_parse(self) -> list[str]:
+        return self._requests_to_parse
+
+    @requests_to_parse.setter
+    def requests_to_parse(self, value: list[str]):
+        self._requests_to_parse = value
+
+    @property
+    def metadata(self) -> dict:
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: dict):
+        self._metadata = value
+
+    @property
+    def parameters(self) -> dict:
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, value: dict):
+        self._parameters = value
+
+    def build_params(self, query: str, max_results: int, page: int = 0) -> Dict:
+        """Параметры запроса страницы page (с 0): период из after:/before: — в sort=date:r"""
+        text, date_from, date_to = GoogleSerpSession.split_date_operators(query)
+        start = page * self.PAGE_SIZE + 1
+        params = {
+            'key': self.api_key,
+            'cx': self.cse_id,
+            'q': text,
+            'start': start,
+            'num': min(self.PAGE_SIZE, max_results - page * self.PAGE_SIZE, self.MAX_RESULTS - start + 1),
+        }
+        if date_from or date_to:
+            params['sort'] = (f"date:r:{date_from.strftime('%Y%m%d') if date_from else ''}:"
+                              f"{date_to.strftime('%Y%m%d') if date_to else ''}")
+        language = self.parameters.get('GOOGLE_API_LANGUAGE')
+        if language:
+            params['lr'] = language
+        return params
+
+    def _get_session(self) -> requests.Session:
+        """HTTP-сессия текущего потока"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def fetch_page(self, params: Dict) -> Optional[Dict]:
+        """Ответ API для одной страницы или None (ошибка, исчерпана квота)"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self._get_session().get(self.api_url, params=params, timeout=15)
+            except requests.RequestException as e:
+                print(f"⚠ GoogleAPI: ошибка запроса '{params['q']}': {e}")
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                try:
+                    retry_after = float(response.headers.get('Retry-After', ''))
+                except ValueError:
+                    retry_after = 2.0 ** attempt
+                print(f"⚠ GoogleAPI: {response.status_code}, пауза {retry_after:.0f} с")
+                self.limiter.pause(retry_after)
+                continue
+            if response.status_code != 200:
+                print(f"❌ GoogleAPI: {response.status_code} для '{params['q']}': {response.text[:200]}")
+                return None
+            try:
+                return response.json()
+            except ValueError:
+                return None
+        return None
+
+    def search_pages(self, searches: List[Tuple[str, int]]) -> List[Optional[List[Dict]]]:
+        """
+        Результаты запросов [(запрос, лимит), ...] в порядке запросов (None — первая страница не получена).
+        Страницы запрашиваются волнами: следующая — только у запросов, которым не хватило результатов.
+        """
+        cache = self.get_search_cache()
+        results: List[Optional[List[Dict]]] = [None] * len(searches)
+        pending = [(i, 0) for i, (_, max_results) in enumerate(searches) if max_results > 0]
+        self.stats = {'requests': 0, 'cached': 0}
+
+        with ThreadPoolExecutor(max_workers=self.parameters.get('GOOGLE_API_MAX_WORKERS', 4),
+                                thread_name_prefix='google_api') as executor:
+            while pending:
+                keys, responses, to_fetch = [], [], []
+                for i, page in pending:
+                    query, max_results = searches[i]
+                    key = self.search_cache_key(query, max_results, format='cse', page=page)
+                    keys.append(key)
+                    response = cache.get_json(key) if cache is not None else None
+                    responses.append(response)
+                    if response is None:
+                        to_fetch.append(len(responses) - 1)
+                    else:
+                        self.stats['cached'] += 1
+
+                fetched = executor.map(self.fetch_page, [self.build_params(*searches[pending[j][0]], page=pending[j][1])
+                                                         for j in to_fetch])
+                for j, response in zip(to_fetch, fetched):
+                    self.stats['requests'] += 1
+                    responses[j] = response
+                    if response is not None and cache is not None:
+                        cache.put_json(keys[j], response, engine=self.class_name, query=searches[pending[j][0]][0])
+
+                next_pending = []
+                for (i, page), response in zip(pending, responses):
+                    if response is None:
+                        continue
+                    items = response.get('items', [])
+                    results[i] = (results[i] or []) + items
+                    max_results = searches[i][1]
+                    next_start = (page + 1) * self.PAGE_SIZE + 1
+                    # Следующая страница нужна, если эта полная, лимит не набран и API её отдаст
+                    if (len(items) == self.PAGE_SIZE and len(results[i]) < max_results
+                            and next_start <= self.MAX_RESULTS):
+                        next_pending.append((i, page + 1))
+                pending = next_pending
+
+        return results
+
+    def parse(self) -> list[NewsItem]:
+        """Все запросы контейнера выполняются параллельно через Custom Search JSON API"""
+        print(f'\nGOOGLE API SCRAPING {self.metadata}')
+        started = time.monotonic()
+
+        searches = []
+        for request in self.requests_to_parse:
+            query = request['query'] if isinstance(request, dict) else request
+            max_results = request.get('search_limit') if isinstance(request, dict) else None
+            searches.append((query, min(max_results or self.parameters.get('SEARCH_LIMIT_GOOGLE', 10),
+                                        self.MAX_RESULTS)))
+
+        news_items = []
+        for (query, max_results), items in zip(searches, self.search_pages(searches)):
+            print(f'    QUERY: {query}, Лимит: {max_results}')
+            if items is None:
+                print(f"      ❌ Не удалось выполнить поиск")
+                continue
+
+            seen_urls = set()
+            for item in items:
+                url = item.get('link', '')
+                if not url or url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                news_items.append(
+                    NewsItem(
+                        source=self.class_name,
+                        metadata=self.metadata,
+                        url=url,
+                        title=item.get('title', ''),
+                        approved=self.check_approved_source(url),
+                    )
+                )
+                if len(seen_urls) >= max_results:
+                    break
+            print(f"      ✅ Результатов: {len(seen_urls)}")
+
+        print(f"    Запросов к API: {self.stats['requests']}, страниц из кэша: {self.stats['cached']}, "
+              f"время: {time.monotonic() - started:.1f} с")
+        return news_items
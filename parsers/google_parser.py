@@ -1,26 +1,14 @@
 import json
 import os
-import random
-import time
 from abc import ABC
-import asyncio
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from typing import List, Dict, Optional
 from parsers.base_parser import BaseParser
+from parsers.google_serp_pool import GoogleSerpPool
 from news.news_item import NewsItem
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
 from selenium.common.exceptions import WebDriverException
-from urllib.parse import urlparse, parse_qs
 
 
 class GoogleParser(BaseParser, ABC):
@@ -30,16 +18,12 @@ class GoogleParser(BaseParser, ABC):
         self.requests_to_parse = requests_to_parse
         self.metadata = metadata
         self.parameters = parameters
-        self.driver = None
-        self.setup_driver()
 
         try:
             self.raw_data = [i for i in list(set(self.parse()))]
         except RetryError as e:
             print(f"Parsing failed after retries: {e}, продолжаем работу без результатов.")
             self.raw_data = []
-        finally:
-            self.close_driver()
 
         self.save_to = save_to
 
@@ -89,270 +73,19 @@ class GoogleParser(BaseParser, ABC):
     def parameters(self, value: dict):
         self._parameters = value
 
-    def setup_driver(self):
-        """Настройка драйвера Selenium"""
-        try:
-            chrome_options = Options()
-
-            # Stealth-опции
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-
-            # Дополнительные опции
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-
-            # User-Agent
-            chrome_options.add_argument(
-                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-
-            # Headless режим (можно вынести в параметры)
-            # chrome_options.add_argument("--headless=new")
-
-            # Установка драйвера
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-
-            # Скрываем WebDriver
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-            return True
-
-        except Exception as e:
-            print(f"❌ Ошибка настройки драйвера: {e}")
-            raise WebDriverException(f"Driver setup failed: {e}")
-
-    def close_driver(self):
-        """Закрытие драйвера"""
-        if self.driver:
-            self.driver.quit()
-            print("✅ Драйвер закрыт")
-
-    def random_sleep(self, min_time: float, max_time: float):
-        """Случайная задержка"""
-        sleep_time = random.uniform(min_time, max_time)
-        time.sleep(sleep_time)
-        return sleep_time
-
-    def accept_cookies(self):
-        """Принятие cookies"""
-        try:
-            cookie_selectors = [
-                "//button[contains(., 'Принять все')]",
-                "//button[contains(., 'Accept all')]",
-                "//button[contains(., 'I agree')]",
-            ]
-
-            for selector in cookie_selectors:
-                try:
-                    cookie_button = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    cookie_button.click()
-                    print("✓ Cookie приняты")
-                    return True
-                except:
-                    continue
-
-            return False
-
-        except Exception as e:
-            print(f"⚠️ Ошибка при обработке cookie: {e}")
-            return False
-
-    def perform_search(self, query: str, timings: Dict) -> bool:
-        """Выполнение поискового запроса"""
-        try:
-            print(f"🔍 Поиск: '{query}'")
-            print("🌐 Открываем Google...")
-
-            # Открываем Google
-            self.driver.get("https://www.google.com")
-            print("✓ Google загружен")
-
-            # self.random_sleep(2, 3)
-
-            # Принимаем cookies
-            # print("🍪 Проверяем cookies...")
-            # if self.accept_cookies():
-            #     print("✓ Cookies приняты")
-            # else:
-            #     print("⚠️ Cookies не найдены")
-
-            # Ищем поисковую строку
-            print("🔎 Ищем поисковую строку...")
-            search_box = WebDriverWait(self.driver, timings['element_wait']).until(
-                EC.presence_of_element_located((By.NAME, "q"))
-            )
-            print("✓ Поисковая строка найдена")
-
-            # Очищаем и вводим запрос
-            print("⌨️ Вводим запрос...")
-            search_box.clear()
-            for char in query:
-                search_box.send_keys(char)
-                self.random_sleep(
-                    timings['typing_delay_min'],
-                    timings['typing_delay_max']
-                )
-            print("✓ Заполнен поисковый запрос")
-
-            # Нажимаем Enter
-            print("⏎ Отправляем запрос...")
-            search_box.send_keys(Keys.RETURN)
-
-            # Ждем загрузки результатов
-            print("⏳ Ждем загрузки результатов...")
-            WebDriverWait(self.driver, timings['page_load']).until(
-                EC.presence_of_element_located((By.ID, "search"))
-            )
-            print("✓ Результаты поиска загружены")
-
-            # Задержка после поиска
-            pause = self.random_sleep(
-                timings['after_search_min'],
-                timings['after_search_max']
-            )
-            print(f"⏸️ Пауза после поиска: {pause:.1f} сек")
-
-            return True
-
-        except Exception as e:
-            print(f"❌ Ошибка при поиске '{query}': {e}")
-            return False
-
-    def navigate_to_page(self, page_number: int, timings: Dict) -> bool:
-        """Переход на указанную страницу пагинации"""
-        try:
-            if page_number == 1:
-                return True  # Первая страница уже загружена
-
-            print(f"📄 Переходим на страницу {page_number}...")
-
-            # Пробуем разные способы навигации по страницам
-            navigation_methods = [
-                self._navigate_via_pagination_buttons,
-                self._navigate_via_url_parameter
-            ]
-
-            for method in navigation_methods:
-                if method(page_number, timings):
-                    print(f"✓ Успешно перешли на страницу {page_number}")
-                    return True
-
-            print(f"❌ Не удалось перейти на страницу {page_number}")
-            return False
-
-        except Exception as e:
-            print(f"❌ Ошибка при переходе на страницу {page_number}: {e}")
-            return False
-
-    def _navigate_via_pagination_buttons(self, page_number: int, timings: Dict) -> bool:
-        """Навигация через кнопки пагинации"""
-        try:
-            # Ищем кнопки пагинации
-            pagination_selectors = [
-                f"//a[@aria-label='Page {page_number}']",
-                f"//a[contains(text(), '{page_number}')]",
-                "//td[@class='YyVfkd']/a",
-                "//a[@id='pnnext']",
-                "//a[contains(@href, 'start=')]"
-            ]
-
-            for selector in pagination_selectors:
-                try:
-                    page_buttons = WebDriverWait(self.driver, 3).until(
-                        EC.presence_of_all_elements_located((By.XPATH, selector))
-                    )
-
-                    for button in page_buttons:
-                        if str(page_number) in button.text or str(page_number) in button.get_attribute(
-                                'aria-label') or '':
-                            button.click()
-                            # Ждем загрузки новой страницы
-                            WebDriverWait(self.driver, timings['page_load']).until(
-                                EC.presence_of_element_located((By.ID, "search"))
-                            )
-                            self.random_sleep(1, 2)
-                            return True
-
-                except:
-                    continue
-
-            return False
-
-        except Exception as e:
-            print(f"Ошибка в навигации через кнопки: {e}")
-            return False
-
-    def _navigate_via_url_parameter(self, page_number: int, timings: Dict) -> bool:
-        """Навигация через параметр URL"""
-        try:
-            current_url = self.driver.current_url
-            parsed_url = urlparse(current_url)
-            query_params = parse_qs(parsed_url.query)
-
-            # Вычисляем start параметр для пагинации (10 результатов на страницу)
-            start = (page_number - 1) * 10
-
-            # Обновляем параметры URL
-            query_params['start'] = [str(start)]
-
-            # Собираем новый URL
-            new_query = '&'.join([f"{k}={v[0]}" for k, v in query_params.items()])
-            new_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{new_query}"
-
-            # Переходим по новому URL
-            self.driver.get(new_url)
-
-            # Ждем загрузки результатов
-            WebDriverWait(self.driver, timings['page_load']).until(
-                EC.presence_of_element_located((By.ID, "search"))
-            )
-
-            self.random_sleep(1, 2)
-            return True
-
-        except Exception as e:
-            print(f"Ошибка в навигации через URL: {e}")
-            return False
-
-    def extract_links(self) -> List[Dict]:
-        """Извлечение ссылок с результатов поиска"""
-        links = []
-        try:
-            # Используем BeautifulSoup для парсинга
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-
-            # Пробуем разные селекторы для результатов
-            selectors = ["div.g a", "div.tF2Cxc a", "div.MjjYud a", "h3 a"]
-
-            for selector in selectors:
-                results = soup.select(selector)
-                if results:
-                    for result in results:
-                        href = result.get('href', '')
-                        if (href and href.startswith('http') and
-                                'google.com' not in href and
-                                not href.startswith('/')):
-                            title = result.get_text(strip=True) or "No title"
-
-                            # Проверяем уникальность URL
-                            if not any(link['url'] == href for link in links):
-                                links.append({
-                                    'url': href,
-                                    'title': title[:200]  # Ограничиваем длину заголовка
-                                })
-                    break
-
-            return links
-
-        except Exception as e:
-            print(f"❌ Ошибка при извлечении ссылок: {e}")
-            return []
+    def get_pool(self) -> GoogleSerpPool:
+        """Общий на запуск пул сессий выдачи Google (профили сессий — в папке кэша)"""
+        cache_dir = self.parameters.get('OUTPUT_DIR_CACHE')
+        return GoogleSerpPool.get_shared(
+            profiles_dir=os.path.join(cache_dir, 'google_profiles') if cache_dir else None,
+            size=self.parameters.get('GOOGLE_SERP_SESSIONS', 2),
+            timings=self.get_timings(),
+            proxies=self.parameters.get('GOOGLE_SERP_PROXIES', []),
+            headless=self.parameters.get('GOOGLE_SERP_HEADLESS', False),
+            mode=self.parameters.get('GOOGLE_SERP_MODE', 'url'),
+            results_per_page=self.parameters.get('GOOGLE_SERP_RESULTS_PER_PAGE', 10),
+            language=self.parameters.get('GOOGLE_SERP_LANGUAGE', 'ru'),
+        )
 
     def get_timings(self) -> Dict:
         """Получение настроек таймингов"""
@@ -381,96 +114,87 @@ class GoogleParser(BaseParser, ABC):
         retry=retry_if_exception_type((WebDriverException, TimeoutException))
     )
     def parse(self) -> list[NewsItem]:
-        """Основной метод парсинга с использованием Selenium и пагинацией"""
+        """Основной метод парсинга: запросы выполняются параллельно сессиями общего пула GoogleSerpPool"""
 
         print(f'\nGOOGLE SCRAPING {self.metadata}')
 
-        if not self.driver:
-            raise WebDriverException("Драйвер не инициализирован")
-
         news_items = []
-        timings = self.get_timings()
-        total_queries = len(self.requests_to_parse)
+        cache = self.get_search_cache()
 
-        for i, request in enumerate(self.requests_to_parse, 1):
+        searches = []
+        for request in self.requests_to_parse:
             query = request['query'] if isinstance(request, dict) else request
 
-            # Определяем лимит результатов и количество страниц
+            # Определяем лимит результатов
             if isinstance(request, dict) and 'search_limit' in request:
                 max_results = request['search_limit']
             else:
                 max_results = self.parameters.get('SEARCH_LIMIT_GOOGLE', 10)
+            searches.append((query, max_results))
+
+        # Ответы из кэша поисковых ответов, остальные запросы — в общий пул сессий
+        cache_keys = [self.search_cache_key(query, max_results, format='serp') for query, max_results in searches]
+        results = [cache.get_json(key) if cache is not None else None for key in cache_keys]
+        missing = [i for i, links in enumerate(results) if links is None]
+        print(f'    Запросов: {len(searches)}, из кэша: {len(searches) - len(missing)}')
+
+        if missing:
+            fetched = self.get_pool().search_many([searches[i] for i in missing])
+            for i, links in zip(missing, fetched):
+                results[i] = links
+                if links and cache is not None:
+                    cache.put_json(cache_keys[i], links, engine=self.class_name, query=searches[i][0])
+
+        date_from = self.metadata.get('DATE_FROM', '')
+        date_to = self.metadata.get('DATE_TO', '')
+        drop_out_of_range = self.parameters.get('GOOGLE_SERP_DROP_OUT_OF_RANGE', True)
+        snippet_min_chars = self.parameters.get('GOOGLE_SERP_SNIPPET_MIN_CHARS', 0)
+        stats = {'out_of_range': 0, 'from_snippet': 0}
+
+        for i, ((query, max_results), all_links) in enumerate(zip(searches, results), 1):
+            print(f'    [{i}/{len(searches)}] QUERY: {query}, Лимит: {max_results}')
+            if all_links is None:
+                print(f"      ❌ Не удалось выполнить поиск")
+                continue
+
+            # Создаем NewsItem для каждой ссылки
+            for j, link in enumerate(all_links, 1):
+                # Дата из выдачи вне периода контейнера — страницу не загружаем
+                if drop_out_of_range and not self.is_date_in_range(link.get('date', ''), date_from, date_to):
+                    stats['out_of_range'] += 1
+                    continue
 
-            # Вычисляем количество страниц (10 результатов на страницу)
-            pages_to_scrape = (max_results + 9) // 10  # Округление вверх
-
-            print(f'    [{i}/{total_queries}] QUERY: {query}, Страниц: {pages_to_scrape}, Лимит: {max_results}')
-
-            try:
-                # Выполняем поиск
-                if self.perform_search(query, timings):
-                    all_links = []
-
-                    # Проходим по всем страницам пагинации
-                    for page in range(1, pages_to_scrape + 1):
-                        print(f"      📖 Страница {page}/{pages_to_scrape}")
-
-                        # Переходим на нужную страницу (для первой страницы переход не нужен)
-                        if page > 1:
-                            if not self.navigate_to_page(page, timings):
-                                print(f"      ⚠️ Не удалось перейти на страницу {page}, пропускаем")
-                                break
-
-                        # Извлекаем ссылки с текущей страницы
-                        page_links = self.extract_links()
-                        print(f"      📋 Найдено ссылок на странице: {len(page_links)}")
-
-                        # Добавляем уникальные ссылки
-                        for link in page_links:
-                            if not any(l['url'] == link['url'] for l in all_links):
-                                all_links.append(link)
-
-                        # Проверяем, достигли ли мы лимита
-                        if len(all_links) >= max_results:
-                            all_links = all_links[:max_results]
-                            print(f"      ✅ Достигнут лимит в {max_results} результатов")
-                            break
-
-                        # Пауза между страницами
-                        if page < pages_to_scrape:
-                            pause = self.random_sleep(
-                                timings['between_pages_min'],
-                                timings['between_pages_max']
-                            )
-                            print(f"      ⏳ Пауза между страницами: {pause:.1f} сек...")
-
-                    # Создаем NewsItem для каждой ссылки
-                    for j, link in enumerate(all_links, 1):
-                        news_items.append(
-                            NewsItem(
-                                source=self.class_name,
-                                metadata=self.metadata,
-                                url=link['url'],
-                                title=link['title'],
-                                approved=self.check_approved_source(link['url'])
-                            )
-                        )
-                        print(f"        {j}. {link['title']}")
-
-                    print(f"      ✅ Всего уникальных результатов: {len(all_links)}")
-                else:
-                    print(f"      ❌ Не удалось выполнить поиск")
-
-            except Exception as e:
-                print(f"Error processing query '{query}': {e}")
-                raise e
-
-            # Пауза между запросами
-            if i < total_queries:
-                pause = self.random_sleep(
-                    timings['between_queries_min'],
-                    timings['between_queries_max']
+                # Достаточно длинный сниппет заменяет текст страницы (WebsiteParser её не загружает)
+                snippet = link.get('snippet', '')
+                raw_data = snippet if snippet_min_chars and len(snippet) >= snippet_min_chars else ''
+                if raw_data:
+                    stats['from_snippet'] += 1
+
+                news_items.append(
+                    NewsItem(
+                        source=self.class_name,
+                        metadata=self.metadata,
+                        url=link['url'],
+                        title=link['title'],
+                        raw_data=raw_data,
+                        approved=self.check_approved_source(link['url'])
+                    )
                 )
-                print(f"      ⏳ Пауза между запросами: {pause:.1f} сек...")
+                print(f"        {link.get('rank', j)}. {link['title']}" + (f" ({link['date']})" if link.get('date') else ''))
+
+            print(f"      ✅ Всего уникальных результатов: {len(all_links)}")
 
+        print(f"    Отброшено по дате из выдачи: {stats['out_of_range']}, "
+              f"текст из сниппета (без загрузки страницы): {stats['from_snippet']}")
         return news_items
+
+    @staticmethod
+    def is_date_in_range(displayed_date: str, date_from: str, date_to: str) -> bool:
+        """Дата результата (ISO) в периоде DATE_FROM..DATE_TO; результаты без даты не отбрасываются"""
+        if not displayed_date:
+            return True
+        if date_from and displayed_date < date_from:
+            return False
+        if date_to and displayed_date > date_to:
+            return False
+        return True
@@ -0,0 +1,669 @@
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, urlencode
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from webdriver_manager.chrome import ChromeDriverManager
+from bs4 import BeautifulSoup
+
+
+# Месяцы в датах выдачи Google (русский и английский интерфейс, полные и сокращённые формы)
+SERP_MONTHS = {
+    'янв': 1, 'фев': 2, 'мар': 3, 'апр': 4, 'мая': 5, 'май': 5, 'июн': 6,
+    'июл': 7, 'авг': 8, 'сен': 9, 'окт': 10, 'ноя': 11, 'дек': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+SERP_DATE_PATTERNS = [
+    # 3 мая 2026 г. / 12 дек. 2025 г. / 3 May 2026
+    (re.compile(r'(\d{1,2})\s+([а-яёa-z]{3})[а-яёa-z]*\.?\s+(\d{4})', re.IGNORECASE), ('day', 'month', 'year')),
+    # May 3, 2026
+    (re.compile(r'([a-z]{3})[a-z]*\.?\s+(\d{1,2}),\s+(\d{4})', re.IGNORECASE), ('month', 'day', 'year')),
+    # 03.05.2026
+    (re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})'), ('day', 'month', 'year')),
+]
+SERP_RELATIVE_DATE_PATTERN = re.compile(
+    r'(\d+)\s+(мин|час|дн|день|нед|min|hour|day|week)[а-яёa-z]*\.?\s+(назад|ago)', re.IGNORECASE)
+SERP_RELATIVE_UNITS = {'мин': 0, 'min': 0, 'час': 0, 'hour': 0,
+                       'дн': 1, 'день': 1, 'day': 1, 'нед': 7, 'week': 7}
+
+
+def parse_serp_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """Дата из подписи результата выдачи («3 мая 2026 г.», «May 3, 2026», «2 дня назад») или None"""
+    if not text:
+        return None
+    today = today or date.today()
+
+    match = SERP_RELATIVE_DATE_PATTERN.search(text)
+    if match:
+        unit = match.group(2).lower()
+        days = SERP_RELATIVE_UNITS.get(unit, SERP_RELATIVE_UNITS.get(unit[:3], 1))
+        return today - timedelta(days=int(match.group(1)) * days)
+
+    for pattern, order in SERP_DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        parts = dict(zip(order, match.groups()))
+        month = parts['month']
+        month = int(month) if month.isdigit() else SERP_MONTHS.get(month[:3].lower())
+        if not month:
+            continue
+        try:
+            return date(int(parts['year']), month, int(parts['day']))
+        except ValueError:
+            continue
+    return None
+
+
+class GoogleSerpSession:
+    """
+    Один изолированный браузер для выдачи Google: свой профиль Chrome (user-data-dir),
+    свой прокси и свой темп запросов (пауза between_queries отсчитывается от предыдущего
+    запроса этой же сессии). Драйвер запускается при первом запросе и перезапускается после сбоя.
+
+    Режимы:
+    - 'url' — страницы выдачи открываются напрямую по адресу (q, start, num, hl, tbs с периодом
+      из операторов after:/before:), загружается ровно столько страниц, сколько нужно под лимит;
+      согласие на cookies принимается один раз и хранится в профиле сессии;
+    - 'typing' — прежний сценарий: главная страница, ввод запроса по символам, пагинация кнопками.
+    """
+
+    SEARCH_URL = 'https://www.google.com/search'
+    DATE_OPERATOR_PATTERN = re.compile(r'\s*\b(after|before):(\d{4}-\d{2}-\d{2})\b')
+
+    def __init__(self, index: int, timings: Dict, profile_dir: Optional[str] = None,
+                 proxy: Optional[str] = None, headless: bool = False, mode: str = 'url',
+                 results_per_page: int = 10, language: str = 'ru'):
+        self.index = index
+        self.timings = timings
+        self.profile_dir = profile_dir
+        self.proxy = proxy
+        self.headless = headless
+        self.mode = mode
+        self.results_per_page = max(1, min(100, results_per_page))
+        self.language = language
+        self.driver = None
+        self.next_query_at = 0.0
+        self.queries = 0
+
+    @classmethod
+    def split_date_operators(cls, query: str) -> Tuple[str, Optional[date], Optional[date]]:
+        """Запрос без операторов after:/before: и даты из них"""
+        dates = {}
+        for operator, value in cls.DATE_OPERATOR_PATTERN.findall(query):
+            try:
+                dates[operator] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                return query, None, None
+        return cls.DATE_OPERATOR_PATTERN.sub('', query).strip(), dates.get('after'), dates.get('before')
+
+    @classmethod
+    def build_search_url(cls, query: str, start: int = 0, num: int = 10, language: str = 'ru') -> str:
+        """Адрес страницы выдачи: период из after:/before: переносится в tbs=cdr (формат дат M/D/YYYY)"""
+        text, date_from, date_to = cls.split_date_operators(query)
+        params = {'q': text, 'hl': language, 'num': num}
+        if start:
+            params['start'] = start
+        if date_from or date_to:
+            tbs = ['cdr:1']
+            if date_from:
+                tbs.append(f'cd_min:{date_from.month}/{date_from.day}/{date_from.year}')
+            if date_to:
+                tbs.append(f'cd_max:{date_to.month}/{date_to.day}/{date_to.year}')
+            params['tbs'] = ','.join(tbs)
+        return f'{cls.SEARCH_URL}?{urlencode(params)}'
+
+    def open_serp_page(self, url: str) -> bool:
+        """Открывает страницу выдачи; при переадресации на согласие с cookies принимает его (один раз на профиль)"""
+        self.driver.get(url)
+        if 'consent.' in urlparse(self.driver.current_url).netloc:
+            if self.accept_cookies():
+                print(f"🍪 [G{self.index}] Согласие на cookies сохранено в профиле")
+            self.driver.get(url)
+        try:
+            WebDriverWait(self.driver, self.timings['page_load']).until(
+                EC.presence_of_element_located((By.ID, "search"))
+            )
+            return True
+        except TimeoutException:
+            # Нет блока результатов: пустая выдача, капча или ошибка загрузки
+            return False
+
+    def search_by_url(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """Выдача по прямым адресам страниц: не больше ceil(max_results / num) страниц"""
+        print(f"🔍 [G{self.index}] Поиск по адресу: '{query}'")
+        num = self.results_per_page
+        pages_to_scrape = (max_results + num - 1) // num
+
+        all_links = []
+        seen_urls = set()
+        for page in range(pages_to_scrape):
+            if page > 0:
+                self.random_sleep(self.timings['between_pages_min'], self.timings['between_pages_max'])
+            if not self.open_serp_page(self.build_search_url(query, page * num, num, self.language)):
+                if page == 0:
+                    return None
+                break
+
+            page_links = self.extract_links()
+            for link in page_links:
+                if link['url'] not in seen_urls:
+                    seen_urls.add(link['url'])
+                    link['rank'] = len(all_links) + 1
+                    all_links.append(link)
+
+            # Выдача закончилась или лимит набран
+            if not page_links or len(all_links) >= max_results:
+                break
+
+        return all_links[:max_results]
+
+    def search(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """Ссылки выдачи запроса (не больше max_results) или None, если поиск не удался"""
+        if not self.driver:
+            self.setup_driver()
+
+        # Темп сессии: пауза между запросами без блокировки остальных сессий пула
+        delay = self.next_query_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        try:
+            if self.mode == 'url':
+                return self.search_by_url(query, max_results)
+            pages_to_scrape = (max_results + 9) // 10  # Округление вверх
+            if not self.perform_search(query, self.timings):
+                return None
+            return self.collect_serp_links(max_results, pages_to_scrape, self.timings)
+        finally:
+            self.queries += 1
+            self.next_query_at = time.monotonic() + random.uniform(self.timings['between_queries_min'],
+                                                                   self.timings['between_queries_max'])
+
+    def setup_driver(self):
+        """Настройка драйвера Selenium"""
+        try:
+            chrome_options = Options()
+
+            # Stealth-опции
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+
+            # Дополнительные опции
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--window-size=1920,1080")
+
+            # User-Agent
+            chrome_options.add_argument(
+                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+            # Собственный профиль сессии (cookies и согласия сохраняются между запусками) и прокси
+            if self.profile_dir:
+                chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+            if self.proxy:
+                chrome_options.add_argument(f"--proxy-server={self.proxy}")
+
+            if self.headless:
+                chrome_options.add_argument("--headless=new")
+
+            # Установка драйвера
+            service = Service(ChromeDriverManager().install())
+            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+
+            # Скрываем WebDriver
+            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Ошибка настройки драйвера: {e}")
+            raise WebDriverException(f"Driver setup failed: {e}")
+
+    def close_driver(self):
+        """Закрытие драйвера"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"⚠️ Ошибка при закрытии драйвера сессии {self.index}: {e}")
+            self.driver = None
+            print(f"✅ Драйвер сессии {self.index} закрыт")
+
+    def random_sleep(self, min_time: float, max_time: float):
+        """Случайная задержка"""
+        sleep_time = random.uniform(min_time, max_time)
+        time.sleep(sleep_time)
+        return sleep_time
+
+    def accept_cookies(self):
+        """Принятие cookies"""
+        try:
+            cookie_selectors = [
+                "//button[contains(., 'Принять все')]",
+                "//button[contains(., 'Accept all')]",
+                "//button[contains(., 'I agree')]",
+            ]
+
+            for selector in cookie_selectors:
+                try:
+                    cookie_button = WebDriverWait(self.driver, 3).until(
+                        EC.element_to_be_clickable((By.XPATH, selector))
+                    )
+                    cookie_button.click()
+                    print("✓ Cookie приняты")
+                    return True
+                except:
+                    continue
+
+            return False
+
+        except Exception as e:
+            print(f"⚠️ Ошибка при обработке cookie: {e}")
+            return False
+
+    def perform_search(self, query: str, timings: Dict) -> bool:
+        """Выполнение поискового запроса"""
+        try:
+            print(f"🔍 [G{self.index}] Поиск: '{query}'")
+            print("🌐 Открываем Google...")
+
+            # Открываем Google
+            self.driver.get("https://www.google.com")
+            print("✓ Google загружен")
+
+            # self.random_sleep(2, 3)
+
+            # Принимаем cookies
+            # print("🍪 Проверяем cookies...")
+            # if self.accept_cookies():
+            #     print("✓ Cookies приняты")
+            # else:
+            #     print("⚠️ Cookies не найдены")
+
+            # Ищем поисковую строку
+            print("🔎 Ищем поисковую строку...")
+            search_box = WebDriverWait(self.driver, timings['element_wait']).until(
+                EC.presence_of_element_located((By.NAME, "q"))
+            )
+            print("✓ Поисковая строка найдена")
+
+            # Очищаем и вводим запрос
+            print("⌨️ Вводим запрос...")
+            search_box.clear()
+            for char in query:
+                search_box.send_keys(char)
+                self.random_sleep(
+                    timings['typing_delay_min'],
+                    timings['typing_delay_max']
+                )
+            print("✓ Заполнен поисковый запрос")
+
+            # Нажимаем Enter
+            print("⏎ Отправляем запрос...")
+            search_box.send_keys(Keys.RETURN)
+
+            # Ждем загрузки результатов
+            print("⏳ Ждем загрузки результатов...")
+            WebDriverWait(self.driver, timings['page_load']).until(
+                EC.presence_of_element_located((By.ID, "search"))
+            )
+            print("✓ Результаты поиска загружены")
+
+            # Задержка после поиска
+            pause = self.random_sleep(
+                timings['after_search_min'],
+                timings['after_search_max']
+            )
+            print(f"⏸️ Пауза после поиска: {pause:.1f} сек")
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Ошибка при поиске '{query}': {e}")
+            return False
+
+    def navigate_to_page(self, page_number: int, timings: Dict) -> bool:
+        """Переход на указанную страницу пагинации"""
+        try:
+            if page_number == 1:
+                return True  # Первая страница уже загружена
+
+            print(f"📄 Переходим на страницу {page_number}...")
+
+            # Пробуем разные способы навигации по страницам
+            navigation_methods = [
+                self._navigate_via_pagination_buttons,
+                self._navigate_via_url_parameter
+            ]
+
+            for method in navigation_methods:
+                if method(page_number, timings):
+                    print(f"✓ Успешно перешли на страницу {page_number}")
+                    return True
+
+            print(f"❌ Не удалось перейти на страницу {page_number}")
+            return False
+
+        except Exception as e:
+            print(f"❌ Ошибка при переходе на страницу {page_number}: {e}")
+            return False
+
+    def _navigate_via_pagination_buttons(self, page_number: int, timings: Dict) -> bool:
+        """Навигация через кнопки пагинации"""
+        try:
+            # Ищем кнопки пагинации
+            pagination_selectors = [
+                f"//a[@aria-label='Page {page_number}']",
+                f"//a[contains(text(), '{page_number}')]",
+                "//td[@class='YyVfkd']/a",
+                "//a[@id='pnnext']",
+                "//a[contains(@href, 'start=')]"
+            ]
+
+            for selector in pagination_selectors:
+                try:
+                    page_buttons = WebDriverWait(self.driver, 3).until(
+                        EC.presence_of_all_elements_located((By.XPATH, selector))
+                    )
+
+                    for button in page_buttons:
+                        if str(page_number) in button.text or str(page_number) in button.get_attribute(
+                                'aria-label') or '':
+                            button.click()
+                            # Ждем загрузки новой страницы
+                            WebDriverWait(self.driver, timings['page_load']).until(
+                                EC.presence_of_element_located((By.ID, "search"))
+                            )
+                            self.random_sleep(1, 2)
+                            return True
+
+                except:
+                    continue
+
+            return False
+
+        except Exception as e:
+            print(f"Ошибка в навигации через кнопки: {e}")
+            return False
+
+    def _navigate_via_url_parameter(self, page_number: int, timings: Dict) -> bool:
+        """Навигация через параметр URL"""
+        try:
+            current_url = self.driver.current_url
+            parsed_url = urlparse(current_url)
+            query_params = parse_qs(parsed_url.query)
+
+            # Вычисляем start параметр для пагинации (10 результатов на страницу)
+            start = (page_number - 1) * 10
+
+            # Обновляем параметры URL
+            query_params['start'] = [str(start)]
+
+            # Собираем новый URL
+            new_query = '&'.join([f"{k}={v[0]}" for k, v in query_params.items()])
+            new_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{new_query}"
+
+            # Переходим по новому URL
+            self.driver.get(new_url)
+
+            # Ждем загрузки результатов
+            WebDriverWait(self.driver, timings['page_load']).until(
+                EC.presence_of_element_located((By.ID, "search"))
+            )
+
+            self.random_sleep(1, 2)
+            return True
+
+        except Exception as e:
+            print(f"Ошибка в навигации через URL: {e}")
+            return False
+
+    # Блоки результатов выдачи и элементы сниппета/даты внутри них (разметка Google меняется, поэтому по несколько вариантов)
+    RESULT_BLOCK_CLASSES = ('tF2Cxc', 'g', 'MjjYud')
+    SNIPPET_SELECTORS = 'div.VwiC3b, div[data-sncf], div.IsZvec, span.aCOpRe'
+    DATE_SELECTORS = 'span.LEwnzc, span.MUxGbd.wuQ4Ob, span.f'
+    SNIPPET_DATE_PREFIX = re.compile(r'^\s*(.{1,40}?)\s+[—-]\s+')
+
+    @staticmethod
+    def is_result_url(href: str) -> bool:
+        return bool(href) and href.startswith('http') and 'google.com' not in href
+
+    def extract_result_record(self, anchor, rank: int) -> Dict:
+        """Запись результата: позиция, адрес, заголовок, сниппет и дата, показанная в выдаче (ISO или '')"""
+        title_element = anchor.find('h3')
+        title = (title_element or anchor).get_text(strip=True) or "No title"
+
+        block = anchor.find_parent(lambda tag: tag.name == 'div' and
+                                   any(c in self.RESULT_BLOCK_CLASSES for c in tag.get('class') or []))
+        snippet, date_text = '', ''
+        if block is not None:
+            snippet_element = block.select_one(self.SNIPPET_SELECTORS)
+            if snippet_element is not None:
+                snippet = ' '.join(snippet_element.get_text(' ', strip=True).split())
+            date_element = block.select_one(self.DATE_SELECTORS)
+            if date_element is not None:
+                date_text = ' '.join(date_element.get_text(' ', strip=True).split())
+                snippet = snippet.replace(date_text, '', 1)
+
+        # Дата часто стоит в начале сниппета: «3 мая 2026 г. — текст»
+        prefix = self.SNIPPET_DATE_PREFIX.match(snippet)
+        if prefix and parse_serp_date(prefix.group(1)) is not None:
+            date_text = date_text or prefix.group(1)
+            snippet = snippet[prefix.end():]
+        displayed_date = parse_serp_date(date_text)
+
+        return {
+            'rank': rank,
+            'url': anchor['href'],
+            'title': title[:200],  # Ограничиваем длину заголовка
+            'snippet': snippet.strip(' —-'),
+            'date': displayed_date.isoformat() if displayed_date else '',
+        }
+
+    def extract_links(self) -> List[Dict]:
+        """Записи результатов текущей страницы выдачи: rank, url, title, snippet, date"""
+        links = []
+        seen_urls = set()
+        try:
+            # Используем BeautifulSoup для парсинга
+            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+
+            # Основной вариант — ссылки с заголовком h3; иначе пробуем прежние селекторы
+            anchors = [h3.find_parent('a') for h3 in soup.select('a h3')]
+            if not anchors:
+                for selector in ["div.g a", "div.tF2Cxc a", "div.MjjYud a", "h3 a"]:
+                    anchors = soup.select(selector)
+                    if anchors:
+                        break
+
+            for anchor in anchors:
+                href = anchor.get('href', '') if anchor is not None else ''
+                if self.is_result_url(href) and href not in seen_urls:
+                    seen_urls.add(href)
+                    links.append(self.extract_result_record(anchor, len(links) + 1))
+
+            return links
+
+        except Exception as e:
+            print(f"❌ Ошибка при извлечении ссылок: {e}")
+            return []
+
+    def collect_serp_links(self, max_results: int, pages_to_scrape: int, timings: Dict) -> List[Dict]:
+        """Уникальные ссылки выдачи текущего запроса со всех страниц пагинации (не больше max_results)"""
+        all_links = []
+        seen_urls = set()
+
+        # Проходим по всем страницам пагинации
+        for page in range(1, pages_to_scrape + 1):
+            print(f"      📖 Страница {page}/{pages_to_scrape}")
+
+            # Переходим на нужную страницу (для первой страницы переход не нужен)
+            if page > 1:
+                if not self.navigate_to_page(page, timings):
+                    print(f"      ⚠️ Не удалось перейти на страницу {page}, пропускаем")
+                    break
+
+            # Извлекаем ссылки с текущей страницы
+            page_links = self.extract_links()
+            print(f"      📋 Найдено ссылок на странице: {len(page_links)}")
+
+            # Добавляем уникальные ссылки
+            for link in page_links:
+                if link['url'] not in seen_urls:
+                    seen_urls.add(link['url'])
+                    link['rank'] = len(all_links) + 1
+                    all_links.append(link)
+
+            # Проверяем, достигли ли мы лимита
+            if len(all_links) >= max_results:
+                all_links = all_links[:max_results]
+                print(f"      ✅ Достигнут лимит в {max_results} результатов")
+                break
+
+            # Пауза между страницами
+            if page < pages_to_scrape:
+                pause = self.random_sleep(
+                    timings['between_pages_min'],
+                    timings['between_pages_max']
+                )
+                print(f"      ⏳ Пауза между страницами: {pause:.1f} сек...")
+
+        return all_links
+
+
+class GoogleSerpPool:
+    """
+    Пул сессий выдачи Google, общий для всех контейнеров запуска.
+
+    Каждая сессия (GoogleSerpSession) работает в своём потоке и берёт запросы из общей очереди,
+    соблюдая собственный темп, поэтому сбор выдачи масштабируется числом сессий, а не графиком
+    пауз одного браузера. Профили сессий хранятся в profiles_dir/session_N, прокси раздаются
+    сессиям по кругу. Потоки и браузеры запускаются при первом запросе; закрытие — close_all().
+    """
+
+    _shared: Dict[str, 'GoogleSerpPool'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: int = 2, timings: Optional[Dict] = None, profiles_dir: Optional[str] = None,
+                 proxies: Optional[List[str]] = None, headless: bool = False, mode: str = 'url',
+                 results_per_page: int = 10, language: str = 'ru'):
+        self.size = max(1, size)
+        self.mode = mode
+        self.results_per_page = results_per_page
+        self.language = language
+        self.timings = timings or {}
+        self.profiles_dir = str(profiles_dir) if profiles_dir else None
+        self.proxies = list(proxies or [])
+        self.headless = headless
+
+        self._queue: 'queue.Queue[Optional[Tuple[str, int, Future]]]' = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self.stats = {'queries': 0, 'failed': 0}
+        # Статистику обновляют потоки всех сессий
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, profiles_dir: Optional[str] = None, **kwargs) -> 'GoogleSerpPool':
+        """Общий пул на папку профилей (настройки берутся при первом создании)"""
+        key = str(profiles_dir) if profiles_dir else ''
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(profiles_dir=profiles_dir, **kwargs)
+            return cls._shared[key]
+
+    @classmethod
+    def close_all(cls):
+        with cls._shared_lock:
+            pools = list(cls._shared.values())
+            cls._shared.clear()
+        for pool in pools:
+            pool.close()
+
+    def _create_session(self, index: int) -> GoogleSerpSession:
+        profile_dir = f"{self.profiles_dir}/session_{index}" if self.profiles_dir else None
+        proxy = self.proxies[index % len(self.proxies)] if self.proxies else None
+        return GoogleSerpSession(index, self.timings, profile_dir=profile_dir, proxy=proxy, headless=self.headless,
+                                 mode=self.mode, results_per_page=self.results_per_page, language=self.language)
+
+    def _worker(self, index: int):
+        session = self._create_session(index)
+        try:
+            while True:
+                task = self._queue.get()
+                if task is None:
+                    break
+                query, max_results, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(session.search(query, max_results))
+                    with self._stats_lock:
+                        self.stats['queries'] += 1
+                except Exception as e:
+                    with self._stats_lock:
+                        self.stats['failed'] += 1
+                    # Сломанный драйвер перезапускается при следующем запросе
+                    session.close_driver()
+                    future.set_exception(e)
+        finally:
+            session.close_driver()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self.size):
+                thread = threading.Thread(target=self._worker, args=(index,), name=f'google-serp-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, query: str, max_results: int) -> Future:
+        """Ставит запрос в общую очередь; результат — ссылки выдачи или None"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((query, max_results, future))
+        return future
+
+    def search_many(self, searches: List[Tuple[str, int]]) -> List[Optional[List[Dict]]]:
+        """
+        Выполняет запросы [(запрос, лимит), ...] всеми сессиями, результаты — в порядке запросов.
+        Ошибка одного запроса не прерывает остальные: она выводится, а вместо результата возвращается None
+        """
+        futures = [self.submit(query, max_results) for query, max_results in searches]
+        results = []
+        for (query, _), future in zip(searches, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"❌ Google: ошибка выдачи для '{query}': {e.__class__.__name__} {e}")
+                results.append(None)
+        return results
+
+    def close(self):
+        with self._start_lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+        if threads:
+            print(f"Google: запросов выдачи {self.stats['queries']}, ошибок {self.stats['failed']}, "
+                  f"сессий {len(threads)}")
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Optional, Dict, Any
+
+import aiohttp
+import chardet
+
+from parsers.website_parser import WebsiteParser
+from tools.fetch_telemetry import FetchTrace
+
+logger = logging.getLogger(__name__)
+
+
+class HttpFetcher:
+    """
+    Лёгкий асинхронный HTTP-загрузчик страниц.
+
+    Большинство новостных сайтов отдают текст статьи прямо в исходном HTML, поэтому страница
+    сначала скачивается обычным GET-запросом через общий пул keep-alive соединений и очищается
+    тем же WebsiteParser._clean_content. Если текста мало или странице нужен JavaScript,
+    в результате выставляется needs_browser=True и страница уходит в браузер.
+    """
+
+    # Заглушки защиты от ботов и пустые SPA-контейнеры: такие страницы всегда отправляем в браузер
+    CHALLENGE_PATTERNS = re.compile(
+        r'checking your browser|ddos-guard|cf-browser-verification|just a moment\.\.\.|challenge-platform|'
+        r'<div id="(?:root|app|__next)">\s*</div>',
+        re.IGNORECASE
+    )
+    # Просьба включить JavaScript часто стоит в <noscript> и на обычных страницах,
+    # поэтому учитываем её только вместе с небольшим объёмом текста
+    JS_REQUIRED_PATTERNS = re.compile(r'enable javascript|javascript is disabled|включите javascript',
+                                      re.IGNORECASE)
+    # Статусы, которыми заглушки защиты от ботов отвечают вместо страницы
+    CHALLENGE_STATUSES = (403, 503)
+    META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+    def __init__(self, timeout: float = 10, max_connections: int = 100, max_connections_per_host: int = 8,
+                 min_text_length: int = 500, max_bytes: int = 5 * 1024 * 1024):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.min_text_length = min_text_length
+        self.max_bytes = max_bytes
+        self.session = None
+        self._loop = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        """Создание HTTP-сессии с пулом keep-alive соединений"""
+        loop = asyncio.get_event_loop()
+        if self.session is not None and not self.session.closed and self._loop is loop:
+            return
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                         limit_per_host=self.max_connections_per_host,
+                                         keepalive_timeout=30,
+                                         ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={
+                'User-Agent': random.choice(WebsiteParser.USER_AGENTS),
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+            }
+        )
+        self._loop = loop
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            try:
+                await self.session.close()
+            except Exception as e:
+                logger.error(f"Ошибка при закрытии HTTP-сессии: {e}")
+        self.session = None
+
+    def _decode(self, body: bytes, header_charset: Optional[str]) -> str:
+        """Определение кодировки: заголовок Content-Type -> meta charset -> chardet"""
+        candidates = [header_charset]
+
+        meta = self.META_CHARSET_PATTERN.search(body[:4096])
+        if meta:
+            candidates.append(meta.group(1).decode('ascii', errors='ignore'))
+
+        for encoding in candidates:
+            if not encoding:
+                continue
+            try:
+                return body.decode(encoding)
+            except (LookupError, UnicodeDecodeError):
+                continue
+
+        detected = chardet.detect(body[:65536]).get('encoding') or 'utf-8'
+        return body.decode(detected, errors='replace')
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After в секундах (поддерживается только числовая форма заголовка)"""
+        try:
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Чтение тела ответа с ограничением по размеру"""
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                break
+        return b''.join(chunks)
+
+    async def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                    trace: Optional[FetchTrace] = None) -> Dict[str, Any]:
+        """
+        Загружает страницу и возвращает словарь:
+        url, status, html, text, needs_browser, error, retry_after, etag, last_modified, not_modified, challenge
+
+        Если переданы валидаторы сохранённой копии, запрос условный (If-None-Match / If-Modified-Since):
+        при ответе 304 тело не скачивается и выставляется not_modified=True.
+        У ответов 403 и 503 тело читается: заглушка защиты от ботов (Cloudflare, DDoS-Guard) отмечается
+        challenge=True — такую страницу сразу отдают браузеру, а не повторяют запрос.
+        В trace (если передан) пишутся фазы http и http_cleaning и объём ответа.
+        """
+        trace = trace or FetchTrace(url)
+        result = {'url': url, 'status': None, 'html': '', 'text': '', 'needs_browser': True, 'error': None,
+                  'retry_after': None, 'etag': None, 'last_modified': None, 'not_modified': False,
+                  'challenge': False}
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        await self.start()
+        request_started = time.perf_counter()
+        try:
+            async with self.session.get(url, allow_redirects=True, headers=headers) as response:
+                result['status'] = response.status
+                result['etag'] = response.headers.get('ETag')
+                result['last_modified'] = response.headers.get('Last-Modified')
+                content_type = response.headers.get('Content-Type', '').lower()
+
+                if response.status == 304 and headers:
+                    result['not_modified'] = True
+                    result['needs_browser'] = False
+                    return result
+                if response.status in self.CHALLENGE_STATUSES:
+                    body = await self._read_body(response)
+                    trace.update(bytes_in=len(body))
+                    result['challenge'] = bool(self.CHALLENGE_PATTERNS.search(self._decode(body, response.charset)))
+                if response.status != 200:
+                    if not result['challenge']:
+                        result['retry_after'] = self._parse_retry_after(response.headers.get('Retry-After'))
+                    return result
+                if content_type and 'html' not in content_type:
+                    result['error'] = f'unsupported content type: {content_type}'
+                    return result
+
+                body = await self._read_body(response)
+                trace.update(bytes_in=len(body))
+                html = self._decode(body, response.charset)
+        except asyncio.TimeoutError:
+            result['error'] = 'timeout'
+            return result
+        except aiohttp.ClientError as e:
+            result['error'] = e.__class__.__name__
+            return result
+        finally:
+            trace.add_phase('http', time.perf_counter() - request_started)
+
+        # Очистка — CPU-работа, выносим её из событийного цикла
+        loop = asyncio.get_event_loop()
+        result['html'] = html
+        with trace.phase('http_cleaning'):
+            result['text'] = await loop.run_in_executor(None, WebsiteParser._clean_content, html)
+
+        # Нужен браузер, если текста мало или страница явно требует JavaScript
+        text_length = len(result['text'])
+        result['needs_browser'] = (text_length < self.min_text_length
+                                   or bool(self.CHALLENGE_PATTERNS.search(html))
+                                   or (text_length < 3 * self.min_text_length
+                                       and bool(self.JS_REQUIRED_PATTERNS.search(html))))
+        return result
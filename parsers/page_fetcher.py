@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, List
+
+from parsers.browser_pool import BrowserPool
+from parsers.domain_scheduler import DomainScheduler
+from parsers.extraction_providers import ExtractionChain
+from parsers.http_fetcher import HttpFetcher
+from parsers.wait_profiles import WaitProfiles
+from tools.fetch_telemetry import FetchTelemetry, FetchTrace
+from tools.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+BROWSER_ENGINES = ['selenium', 'playwright']
+
+
+def create_browser(engine: str = 'selenium', size: int = 5, page_load_timeout: int = 10000,
+                   show_browser: bool = False, wait_profiles: Optional[WaitProfiles] = None):
+    """
+    Создаёт браузерный уровень загрузки страниц для выбранного движка:
+    - selenium: пул тёплых драйверов Chrome (BrowserPool);
+    - playwright: один браузер Playwright с лёгкими контекстами на каждую страницу.
+    wait_profiles — профили ожидания готовности страниц по доменам (по умолчанию только в памяти).
+    """
+    if engine == 'selenium':
+        return BrowserPool(size=size, page_load_timeout=page_load_timeout, show_browser=show_browser,
+                           wait_profiles=wait_profiles)
+    if engine == 'playwright':
+        # Импорт здесь, чтобы Playwright был нужен только при его выборе
+        from parsers.playwright_parser import PlaywrightWebsiteParser
+        return PlaywrightWebsiteParser(page_load_timeout=page_load_timeout, show_browser=show_browser,
+                                       max_contexts=size, wait_profiles=wait_profiles)
+    raise ValueError(f"Неизвестный браузерный движок '{engine}', доступны: {BROWSER_ENGINES}")
+
+
+class PageFetcher:
+    """
+    Цепочка получения текста страницы по URL.
+
+    0. Дисковый кэш (PageCache): если страница уже загружалась и запись не просрочена.
+       Просроченная запись с ETag / Last-Modified перепроверяется условным GET: на 304 Not Modified
+       берётся сохранённый текст — вместо полной загрузки и рендера только обмен заголовками.
+    1. HTTP-уровень (HttpFetcher): обычный GET и очистка HTML без браузера.
+    2. Внешнее извлечение (ExtractionChain, если задан extraction): URL, с которыми не справился
+       HTTP-уровень, пачками отправляются провайдерам (Tavily Extract, локальный сервис).
+    3. Браузер (BrowserPool или PlaywrightWebsiteParser, см. create_browser): только если
+       предыдущие уровни не справились (ошибка, мало текста или странице нужен JavaScript).
+
+    Если задан telemetry, по каждому URL в журнал JSONL пишется запись с уровнями, статусом,
+    объёмами и временем по фазам.
+
+    Пакетная загрузка (fetch_many) идёт через DomainScheduler: лимиты параллельности и интервалы
+    по хостам, подстраивающиеся под ответы сайтов, сохраняются между вызовами.
+
+    Один объект можно использовать для всех контейнеров запуска.
+    """
+
+    def __init__(self, browser, http_fetcher: Optional[HttpFetcher] = None, use_http: bool = True,
+                 cache: Optional[PageCache] = None, scheduler: Optional[DomainScheduler] = None,
+                 revalidate: bool = True, telemetry: Optional[FetchTelemetry] = None,
+                 extraction: Optional[ExtractionChain] = None):
+        # Любой объект с async parse_page(url) -> Optional[dict] и async close()
+        self.browser = browser
+        self.http_fetcher = http_fetcher if http_fetcher is not None else HttpFetcher()
+        self.use_http = use_http
+        self.cache = cache
+        self.scheduler = scheduler if scheduler is not None else DomainScheduler()
+        # Просроченные записи кэша с ETag / Last-Modified перепроверяются условным GET
+        self.revalidate = revalidate
+        # Журнал JSONL с замерами фаз по каждому URL (см. tools.fetch_telemetry)
+        self.telemetry = telemetry
+        # Провайдеры пакетного извлечения перед браузером (см. parsers.extraction_providers)
+        self.extraction = extraction
+
+        # Сколько страниц получено каждым уровнем
+        self.stats = {'cache': 0, 'revalidated': 0, 'http': 0, 'extract': 0, 'browser': 0, 'failed': 0,
+                      'throttled': 0}
+        # Обращения к браузеру и их суммарное время — для оценки экономии от внешнего извлечения
+        self.browser_calls = 0
+        self.browser_seconds = 0.0
+        # Трассы ссылок, отложенных планировщиком до повтора
+        self._deferred_traces: Dict[str, FetchTrace] = {}
+
+    async def fetch(self, url: str, retries_left: int = 0) -> Dict[str, Any]:
+        """
+        Возвращает словарь: url, text, engine ('cache' / 'revalidated' / 'http' / 'extract' / 'browser' / None),
+        status, error, retry_after, throttled.
+
+        Если хост ответил 429 / 5xx и у планировщика остались повторы (retries_left > 0), ссылка
+        не эскалируется: возвращается throttled=True, и планировщик повторит её после отката.
+        На последней попытке такая ссылка идёт дальше по уровням — во внешнее извлечение и браузер.
+        """
+        # Повтор после отказа хоста продолжает трассу первой попытки: одна запись на URL
+        trace = self._deferred_traces.pop(url, None)
+        if trace is None:
+            trace = FetchTrace(url)
+        else:
+            trace.retry()
+        result = await self._fetch(url, trace, retries_left)
+
+        if result['throttled']:
+            self._deferred_traces[url] = trace
+        elif self.telemetry is not None:
+            trace.update(engine=result['engine'], status=result['status'], error=result['error'],
+                         chars_out=len(result['text']),
+                         timed_out=trace.record['timed_out'] or result['error'] == 'timeout')
+            self.telemetry.write(trace)
+        return result
+
+    async def _fetch(self, url: str, trace: FetchTrace, retries_left: int = 0) -> Dict[str, Any]:
+        result = {'url': url, 'text': '', 'engine': None, 'status': None, 'error': None, 'retry_after': None,
+                  'throttled': False}
+
+        cached = None
+        if self.cache is not None:
+            # SQLite и чтение блобов — в пуле потоков, чтобы не блокировать общий цикл событий
+            with trace.phase('cache'):
+                cached = await asyncio.to_thread(self.cache.get, url,
+                                                 allow_expired=self.revalidate and self.use_http)
+            if cached is not None and cached['text'] and not cached['expired']:
+                result['text'] = cached['text']
+                result['engine'] = 'cache'
+                self.stats['cache'] += 1
+                return result
+
+        # Условный запрос имеет смысл только для просроченной записи с валидаторами
+        validators = {}
+        if cached is not None and cached['text'] and (cached['etag'] or cached['last_modified']):
+            validators = {'etag': cached['etag'], 'last_modified': cached['last_modified']}
+
+        http_result = None
+        if self.use_http:
+            trace.attempt('http')
+            try:
+                http_result = await self.http_fetcher.fetch(url, trace=trace, **validators)
+            except Exception as e:
+                logger.warning(f"HTTP-загрузка {url} завершилась ошибкой: {e}")
+
+        if http_result is not None and http_result['not_modified']:
+            # 304 Not Modified: страница не менялась, берём сохранённый текст и продлеваем запись
+            result['text'] = cached['text']
+            result['engine'] = 'revalidated'
+            result['status'] = http_result['status']
+            self.stats['revalidated'] += 1
+            await asyncio.to_thread(self.cache.touch, url, etag=http_result['etag'],
+                                    last_modified=http_result['last_modified'])
+            return result
+
+        if http_result is not None:
+            result['status'] = http_result['status']
+            result['error'] = http_result['error']
+            result['retry_after'] = http_result.get('retry_after')
+            if DomainScheduler.is_throttled(http_result):
+                self.stats['throttled'] += 1
+                if retries_left > 0:
+                    # Хост ограничивает нас (429 / 5xx): не эскалируем в извлечение и браузер,
+                    # планировщик выждет откат или Retry-After и повторит ссылку
+                    result['throttled'] = True
+                    return result
+            if not http_result['needs_browser']:
+                result['text'] = http_result['text']
+                result['engine'] = 'http'
+                self.stats['http'] += 1
+                print(f"✓ Спарсено (HTTP): {url} → {len(result['text'])} символов")
+                await self._save_to_cache(url, http_result['html'], result['text'], 'http', http_result)
+                return result
+
+        # Внешнее извлечение: URL ждёт своей пачки, текст берётся у первого провайдера, который его вернул
+        if self.extraction is not None:
+            trace.attempt('extract')
+            with trace.phase('extract'):
+                extracted = await self.extraction.extract(url)
+            if extracted is not None:
+                provider, result['text'] = extracted
+                result['engine'] = 'extract'
+                result['error'] = None
+                self.stats['extract'] += 1
+                print(f"✓ Спарсено ({provider}): {url} → {len(result['text'])} символов")
+                await self._save_to_cache(url, '', result['text'], f'extract:{provider}', http_result)
+                return result
+
+        # Эскалация в браузер
+        trace.attempt('browser')
+        start_time = time.perf_counter()
+        try:
+            page = await self.browser.parse_page(url, trace=trace)
+        except Exception as e:
+            result['error'] = e.__class__.__name__
+            page = None
+        self.browser_calls += 1
+        self.browser_seconds += time.perf_counter() - start_time
+
+        if page and page['text']:
+            result['text'] = page['text']
+            result['engine'] = 'browser'
+            result['error'] = None
+            self.stats['browser'] += 1
+            # Валидаторы берём из HTTP-ответа: если исходный HTML не изменится, повторный рендер не нужен
+            await self._save_to_cache(url, page['html'], result['text'], 'browser', http_result)
+        elif http_result is not None and http_result['text']:
+            # Браузер ничего не дал — оставляем хотя бы то, что получили по HTTP
+            result['text'] = http_result['text']
+            result['engine'] = 'http'
+            self.stats['http'] += 1
+            await self._save_to_cache(url, http_result['html'], result['text'], 'http', http_result)
+        else:
+            self.stats['failed'] += 1
+
+        return result
+
+    async def fetch_many(self, urls: List[str], max_concurrent: int = 5,
+                         desc: str = "Парсинг сайтов") -> Dict[str, Dict[str, Any]]:
+        """
+        Загружает список URL не более чем в max_concurrent потоков с учётом лимитов по хостам,
+        возвращает {url: результат fetch}
+        """
+        self.scheduler.max_concurrent = max_concurrent
+        return await self.scheduler.run(list(dict.fromkeys(urls)), self.fetch, desc=desc)
+
+    async def _save_to_cache(self, url: str, html: str, text: str, engine: str,
+                       http_result: Optional[Dict[str, Any]] = None):
+        if self.cache is None or not text:
+            return
+        # Валидаторы сохраняем только от успешного ответа
+        validators = {}
+        if http_result is not None and http_result['status'] == 200:
+            validators = {'etag': http_result['etag'], 'last_modified': http_result['last_modified']}
+        try:
+            await asyncio.to_thread(self.cache.put, url, html, text, engine=engine, **validators)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить {url} в кэш страниц: {e}")
+
+    # Оценка времени браузера на страницу, пока в запуске не было ни одного обращения к нему
+    DEFAULT_BROWSER_SECONDS_PER_PAGE = 10.0
+
+    def print_statistics(self):
+        print(f"Получено страниц: кэш — {self.stats['cache']}, подтверждено 304 — {self.stats['revalidated']}, "
+              f"HTTP — {self.stats['http']}, внешнее извлечение — {self.stats['extract']}, "
+              f"браузер — {self.stats['browser']}, ошибок — {self.stats['failed']}, "
+              f"отказов хоста (429 / 5xx) — {self.stats['throttled']}")
+        if self.extraction is not None:
+            browser_seconds_per_page = (self.browser_seconds / self.browser_calls if self.browser_calls
+                                        else self.DEFAULT_BROWSER_SECONDS_PER_PAGE)
+            self.extraction.print_statistics(browser_seconds_per_page)
+        self.scheduler.print_statistics()
+        if self.cache is not None:
+            self.cache.print_statistics()
+
+    async def close(self):
+        await self.http_fetcher.close()
+        await self.browser.close()
+        if self.extraction is not None:
+            self.extraction.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Route, Error as PlaywrightError, \
+    TimeoutError as PlaywrightTimeoutError
+
+from parsers.wait_profiles import WaitProfiles, READINESS_EXPRESSION
+from parsers.website_parser import WebsiteParser
+from tools.fetch_telemetry import FetchTrace
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightWebsiteParser:
+    """
+    Асинхронный парсер сайтов на Playwright с тем же контрактом parse(url), что у WebsiteParser.
+
+    Один браузер на весь запуск, на каждую страницу — отдельный лёгкий контекст (изолированные
+    cookies и хранилища). Загрузка нативно асинхронная: отмена задачи прерывает загрузку страницы.
+    Картинки, шрифты, медиа и известные трекеры отсекаются на уровне перехвата запросов.
+    После DOMContentLoaded готовность страницы определяется по профилю домена (WaitProfiles).
+    """
+
+    BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+    BLOCKED_DOMAINS = (
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+        'mc.yandex.ru', 'an.yandex.ru', 'yandex.ru/ads', 'top-fwz1.mail.ru', 'counter.yadro.ru',
+        'vk.com/rtrg', 'facebook.net', 'adfox.ru', 'adriver.ru', 'mediametrics.ru', 'smi2.ru',
+    )
+
+    def __init__(self, page_load_timeout: int = 10000, show_browser: bool = False, max_contexts: int = 10,
+                 wait_profiles: Optional[WaitProfiles] = None):
+        self.page_load_timeout = page_load_timeout
+        self.show_browser = show_browser
+        self.max_contexts = max_contexts
+        self.wait_profiles = wait_profiles if wait_profiles is not None else WaitProfiles()
+
+        self._playwright = None
+        self.browser = None
+        self._loop = None
+        self._semaphore = None
+        self._start_lock = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        """Запуск браузера (один раз на событийный цикл)"""
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            # Браузер и примитивы asyncio привязаны к циклу
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_contexts)
+            self._start_lock = asyncio.Lock()
+            self._playwright = None
+            self.browser = None
+
+        async with self._start_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return
+            try:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self.browser = await self._playwright.chromium.launch(
+                    headless=not self.show_browser,
+                    args=["--disable-blink-features=AutomationControlled", "--no-sandbox",
+                          "--disable-dev-shm-usage", "--disable-gpu"]
+                )
+            except Exception as e:
+                logger.error(f"Ошибка инициализации Playwright: {e}")
+                raise
+
+    async def close(self):
+        try:
+            if self.browser is not None:
+                await self.browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except Exception as e:
+            logger.error(f"Ошибка при закрытии Playwright: {e}")
+        finally:
+            self.browser = None
+            self._playwright = None
+            self.wait_profiles.save()
+
+    async def _route(self, route: Route):
+        """Отсекаем тяжёлые ресурсы и трекеры"""
+        request = route.request
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+
+        target = urlparse(request.url).netloc + urlparse(request.url).path
+        if any(domain in target for domain in self.BLOCKED_DOMAINS):
+            await route.abort()
+            return
+
+        await route.continue_()
+
+    async def _wait_until_ready(self, page, url: str, deadline: float) -> bool:
+        """Ожидание готовности страницы по профилю домена (аналог WebsiteParser._wait_until_ready)"""
+        readiness = self.wait_profiles.start(url)
+        while True:
+            try:
+                state = await page.evaluate(f"() => {READINESS_EXPRESSION}")
+            except PlaywrightError:
+                return False
+
+            if readiness.update(state):
+                readiness.finish()
+                return True
+            if time.monotonic() >= deadline:
+                readiness.finish(timed_out=True)
+                return False
+            await asyncio.sleep(WebsiteParser.READINESS_POLL_INTERVAL)
+
+    async def parse(self, url: str) -> Optional[str]:
+        """Асинхронный парсинг URL в отдельном контексте браузера"""
+        page = await self.parse_page(url)
+        return page['text'] if page else None
+
+    async def parse_page(self, url: str, trace: Optional[FetchTrace] = None) -> Optional[dict]:
+        """
+        Асинхронный парсинг URL с исходным HTML: {'html': ..., 'text': ...}.
+        В trace пишутся фазы driver_start, pool_wait, driver_get, ready_wait, page_source и cleaning.
+        """
+        trace = trace or FetchTrace(url)
+        with trace.phase('driver_start'):
+            await self.start()
+
+        wait_started = time.perf_counter()
+        async with self._semaphore:
+            trace.add_phase('pool_wait', time.perf_counter() - wait_started)
+            with trace.phase('driver_start'):
+                context = await self.browser.new_context(
+                    user_agent=random.choice(WebsiteParser.USER_AGENTS),
+                    viewport={'width': 1920, 'height': 1080},
+                    java_script_enabled=True,
+                )
+            try:
+                await context.route("**/*", self._route)
+                page = await context.new_page()
+                deadline = time.monotonic() + self.page_load_timeout / 1000
+
+                try:
+                    with trace.phase('driver_get'):
+                        await page.goto(url, wait_until='domcontentloaded', timeout=self.page_load_timeout)
+                    print(f"✓ Загружаем: {url}")
+                except PlaywrightTimeoutError:
+                    print(f"⚠ Страница {url} не полностью загружена, парсим что есть")
+                    trace.update(timed_out=True)
+                except PlaywrightError as e:
+                    print(f"✗ Ошибка загрузки {url}: {e}")
+                    trace.update(error=e.__class__.__name__)
+                    return None
+
+                with trace.phase('ready_wait'):
+                    ready = await self._wait_until_ready(page, url, deadline - 1)
+                if not ready:
+                    print(f"⚠ Страница {url} не стабилизировалась, парсим что есть")
+                    trace.update(timed_out=True)
+
+                with trace.phase('page_source'):
+                    html_content = await page.content()
+                trace.update(bytes_in=len(html_content.encode('utf-8')))
+
+                loop = asyncio.get_event_loop()
+                with trace.phase('cleaning'):
+                    cleaned_content = await loop.run_in_executor(None, WebsiteParser._clean_content, html_content)
+
+                if cleaned_content:
+                    print(f"✓ Спарсено: {url} → {len(cleaned_content)} символов")
+                else:
+                    print(f"✗ Не удалось спарсить: {url}")
+
+                return {'html': html_content, 'text': cleaned_content}
+
+            except PlaywrightError as e:
+                print(f"✗ Ошибка парсинга {url}: {e}")
+                return None
+            finally:
+                await context.close()
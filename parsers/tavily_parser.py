@@ -1,21 +1,111 @@
 import json
-import os
-import random
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List
+
 import requests
 import pandas as pd
 import datetime
 from tavily import TavilyClient
+from tavily.errors import UsageLimitExceededError
 
 from parsers.base_parser import BaseParser
 from news.news_item import NewsItem
+from tools.rate_limiter import get_rate_limiter
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
 
 
+class TavilyBatchExecutor:
+    """
+    Параллельное выполнение запросов Tavily под общим на процесс лимитом запросов в секунду.
+
+    Запросы выполняются в пуле потоков (у каждого потока свой TavilyClient и HTTP-сессия),
+    перед каждым запросом берётся токен из общего TokenBucket. Ответ 429 с Retry-After
+    приостанавливает выдачу токенов всем потокам (хук ответа на client.session), после чего
+    запрос повторяется. Результаты search_many возвращаются в порядке запросов.
+
+    Один экземпляр на API-ключ (get_shared): запросы разных контейнеров, отправленные заранее
+    через submit, переиспользуются, когда до них доходит TavilyParser.
+    """
+
+    _shared: Dict[str, 'TavilyBatchExecutor'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api_key: str, requests_per_second: float = 2.0, max_workers: int = 4,
+                 max_retries: int = 3, default_retry_after: float = 5.0):
+        self.api_key = api_key
+        self.max_retries = max_retries
+        # Пауза после 429 без заголовка Retry-After
+        self.default_retry_after = default_retry_after
+        self.limiter = get_rate_limiter('tavily', rate=requests_per_second, burst=max_workers)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tavily')
+        self._local = threading.local()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, api_key: str, **kwargs) -> 'TavilyBatchExecutor':
+        with cls._shared_lock:
+            if api_key not in cls._shared:
+                cls._shared[api_key] = cls(api_key, **kwargs)
+            return cls._shared[api_key]
+
+    def _get_client(self) -> TavilyClient:
+        """TavilyClient текущего потока (requests.Session не рассчитана на общий доступ из потоков)"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = TavilyClient(api_key=self.api_key)
+            client.session.hooks['response'].append(self._on_response)
+            self._local.client = client
+        return client
+
+    def _on_response(self, response: requests.Response, *args, **kwargs):
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                retry_after = self.default_retry_after
+            print(f"⚠ Tavily: 429, пауза {retry_after:.0f} с")
+            self.limiter.pause(retry_after)
+
+    def _search(self, search_kwargs: dict) -> dict:
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                return self._get_client().search(**search_kwargs)
+            except UsageLimitExceededError:
+                # Пауза уже выставлена хуком ответа, следующий acquire() её дождётся
+                if attempt == self.max_retries:
+                    raise
+
+    @staticmethod
+    def _key(search_kwargs: dict) -> str:
+        return json.dumps(search_kwargs, sort_keys=True, ensure_ascii=False)
+
+    def submit(self, search_kwargs: dict) -> Future:
+        """Ставит запрос в очередь (повторная отправка тех же параметров возвращает тот же Future)"""
+        key = self._key(search_kwargs)
+        with self._pending_lock:
+            if key not in self._pending:
+                self._pending[key] = self._executor.submit(self._search, search_kwargs)
+            return self._pending[key]
+
+    def search_many(self, searches: List[dict]) -> List[dict]:
+        """Выполняет запросы параллельно и возвращает ответы в порядке запросов"""
+        futures = [self.submit(search_kwargs) for search_kwargs in searches]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            with self._pending_lock:
+                for search_kwargs in searches:
+                    self._pending.pop(self._key(search_kwargs), None)
+
+
 class TavilyParser(BaseParser):
     def __init__(self, requests_to_parse: list[str], parameters: dict, metadata: dict, save_to: dict):
         super().__init__()
-        self.tavily_client = TavilyClient(api_key=parameters['AUTHENTICATION']['TAVILY_API_KEY'])
+        self.executor = self.get_executor(parameters)
         self.class_name = 'Tavily'
         self.requests_to_parse = requests_to_parse  # список поисковых запросов (может включать категории, регионы, периоды)
         self.metadata = metadata
@@ -93,53 +183,117 @@ class TavilyParser(BaseParser):
 
         return limit * coefficient
 
+    @staticmethod
+    def get_executor(parameters: dict) -> TavilyBatchExecutor:
+        return TavilyBatchExecutor.get_shared(
+            parameters['AUTHENTICATION']['TAVILY_API_KEY'],
+            requests_per_second=parameters.get('TAVILY_REQUESTS_PER_SECOND', 2.0),
+            max_workers=parameters.get('TAVILY_MAX_WORKERS', 4),
+        )
+
+    def build_search_kwargs(self, request: dict) -> dict:
+        """Параметры tavily_client.search для одного запроса"""
+        try:
+            search_limit = request["search_limit"]
+        except Exception as e:
+            search_limit = self.get_limit_search()
+        search_kwargs = {
+            'query': request["query"],
+            'search_depth': "advanced",
+            'include_answer': True,
+            'max_results': search_limit,
+            'start_date': self.metadata.get('DATE_FROM', ''),
+            'end_date': self.metadata.get('DATE_TO', ''),
+        }
+        include_raw_content = self.parameters.get('TAVILY_INCLUDE_RAW_CONTENT', False)
+        if include_raw_content:
+            search_kwargs['include_raw_content'] = include_raw_content
+        return search_kwargs
+
+    def build_cache_key(self, search_kwargs: dict) -> str:
+        """Ключ кэша поисковых ответов: формат — остальные параметры запроса (глубина поиска и т.п.)"""
+        options = {k: v for k, v in search_kwargs.items()
+                   if k not in ('query', 'max_results', 'start_date', 'end_date')}
+        return self.search_cache_key(search_kwargs['query'], search_kwargs['max_results'],
+                                     format=json.dumps(options, sort_keys=True))
+
+    @classmethod
+    def prefetch(cls, containers: list):
+        """
+        Заранее отправляет запросы Tavily всех контейнеров в общий пул: пока обрабатываются другие
+        источники, ответы уже загружаются, а TavilyParser контейнера получит их без ожидания.
+        Контейнеры, для которых файлы Tavily уже есть, и запросы с ответом в кэше пропускаются.
+        """
+        submitted = 0
+        for container in containers:
+            requests_to_parse = container.to_parse.get('Tavily')
+            folder = container.parameters.get('OUTPUT_DIR_PROCESSED', '')
+            if not requests_to_parse or container.check_existed_data_in_folder('Tavily', folder):
+                continue
+
+            # Параметры запросов без создания парсера (конструктор сразу запускает парсинг)
+            parser = cls.__new__(cls)
+            parser.class_name = 'Tavily'
+            parser.parameters = container.parameters
+            parser.metadata = container.metadata
+            executor = cls.get_executor(container.parameters)
+            cache = parser.get_search_cache()
+            for request in requests_to_parse:
+                search_kwargs = parser.build_search_kwargs(request)
+                # Ответы из кэша поисковых ответов не тратят квоту API
+                if cache is not None and cache.get_json(parser.build_cache_key(search_kwargs)) is not None:
+                    continue
+                executor.submit(search_kwargs)
+                submitted += 1
+        if submitted:
+            print(f'TAVILY: отправлено заранее {submitted} запросов')
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=5, max=10),
         retry=retry_if_exception_type((requests.RequestException,))
     )
     def parse(self) -> list[NewsItem]:
-        """Парсинг через Tavily API для каждого поискового запроса"""
+        """Парсинг через Tavily API: все запросы выполняются параллельно под общим лимитом"""
         print(f'\nTAVILY SCRAPING {self.metadata}')
 
         news_items = []
 
-        for request in self.requests_to_parse:
-            print(f'    QUERY: {request["query"]}')
-            # Подготовка фильтра и параметров из запроса
-            # Предполагается, что запрос может включать категорию, регион, период, разделенные, например, пробелами
-            # Можно адаптировать парсинг по необходимости
+        searches = [self.build_search_kwargs(request) for request in self.requests_to_parse]
+        cache = self.get_search_cache()
+        cache_keys = [self.build_cache_key(search_kwargs) for search_kwargs in searches]
+        responses = [cache.get_json(key) if cache is not None else None for key in cache_keys]
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if len(missing) < len(searches):
+            print(f'    Ответов из кэша: {len(searches) - len(missing)} из {len(searches)}')
 
-            # max_results = self.get_limit_search()
-            try:
-                search_limit = request["search_limit"]
-            except Exception as e:
-                search_limit = self.get_limit_search()
-            try:
-                raw_data = self.tavily_client.search(
-                    query=request["query"],
-                    search_depth="advanced",
-                    include_answer=True,
-                    max_results=search_limit,
-                    start_date=self.metadata.get('DATE_FROM', ''),
-                    end_date=self.metadata.get('DATE_TO', ''),
-                    )
-            except requests.exceptions.ConnectionError:
-                print("Connection failed, retrying...")
-                raise
-            except Exception as e:
-                print(f"Error during Tavily API request: {e}")
-                raise
+        try:
+            for i, response in zip(missing, self.executor.search_many([searches[i] for i in missing])):
+                responses[i] = response
+                if cache is not None:
+                    cache.put_json(cache_keys[i], response, engine=self.class_name, query=searches[i]['query'])
+        except requests.exceptions.ConnectionError:
+            print("Connection failed, retrying...")
+            raise
+        except Exception as e:
+            print(f"Error during Tavily API request: {e}")
+            raise
+
+        for request, raw_data in zip(self.requests_to_parse, responses):
+            print(f'    QUERY: {request["query"]}')
 
             for result in raw_data.get('results', []):
+                # Полный текст страницы, если он запрошен и получен, иначе — сниппет
+                raw_content = result.get('raw_content') or ''
                 news_items.append(
                     NewsItem(
                         source=self.class_name,
                         metadata=self.metadata,
                         url=result.get('url', ''),
                         title=result.get('title', ''),
-                        raw_data=result.get('content', ''),
+                        raw_data=raw_content or result.get('content', ''),
                         approved=self.check_approved_source(result.get('url', '')),
+                        full_text=bool(raw_content),
                     )
                 )
 
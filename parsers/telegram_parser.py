@@ -1,16 +1,17 @@
 import os
-import asyncio
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from telethon.sync import TelegramClient
-from telethon.errors import FloodWaitError, ChannelPrivateError
-import requests
 import pandas as pd
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
+from tenacity import RetryError
 from datetime import date
+from typing import Optional, List, Dict, Any, Union
 
 from parsers.base_parser import BaseParser
 from news.news_item import NewsItem
+from parsers.telegram_session import TelegramSession
+from parsers.telegram_web_session import TelegramWebSession
+from tools.telegram_store import TelegramStore
+from tools.async_runner import run_async
 from tools.normalize_data import clean_text
 
 
@@ -116,73 +117,120 @@ class TelegramParser(BaseParser):
             return ''
 
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=5, max=10),
-        retry=retry_if_exception_type((requests.RequestException,))
-    )
-    async def _get_channel_messages(self, channel_name, search_limit, date_from, date_to):
+    def get_backend(self) -> str:
+        """
+        Бэкенд загрузки каналов (TELEGRAM_BACKEND): 'telethon' — клиент Telethon с входом по телефону,
+        'web' — веб-предпросмотр t.me/s без входа. Без TELEGRAM_API_ID и TELEGRAM_API_HASH — всегда 'web'
+        """
+        backend = self.parameters.get('TELEGRAM_BACKEND', 'telethon')
+        authentication = self.parameters.get('AUTHENTICATION', {})
+        if backend == 'telethon' and not (authentication.get('TELEGRAM_API_ID')
+                                          and authentication.get('TELEGRAM_API_HASH')):
+            print("⚠ Telegram: не заданы TELEGRAM_API_ID и TELEGRAM_API_HASH, каналы читаются через t.me/s")
+            return 'web'
+        return backend
+
+    def get_session(self) -> Union[TelegramSession, TelegramWebSession]:
+        """Общая на запуск сессия Telegram (подключается один раз для всех контейнеров)"""
+        if self.get_backend() == 'web':
+            return TelegramWebSession.get_shared(
+                base_url=self.parameters.get('TELEGRAM_WEB_URL', TelegramWebSession.DEFAULT_BASE_URL),
+                max_concurrent=self.parameters.get('TELEGRAM_WEB_MAX_CONCURRENT', 8),
+                max_retry_after=self.parameters.get('TELEGRAM_MAX_FLOOD_WAIT', 300),
+                store_directory=self.get_store_directory(),
+                regions_keywords=self.parameters.get('REGIONS_KEYWORDS'),
+            )
         load_dotenv()
-
-        # Настройки клиента
-        api_id = self.parameters['AUTHENTICATION']['TELEGRAM_API_ID']
-        api_hash = self.parameters['AUTHENTICATION']['TELEGRAM_API_HASH']
-        phone = self.parameters['AUTHENTICATION']['PHONE_NUM']
-        session_name = os.getenv('SESSION_NAME', 'default_session')
-
-        async with TelegramClient(session_name, api_id, api_hash) as client:
-            await client.start(phone)
-
-            try:
-                channel = await client.get_entity(channel_name)
-                # search_limit = self.get_limit_search()
-                messages = []
-                async for message in client.iter_messages(channel, offset_date=date_to):
-                    if date_from <= message.date <= date_to and search_limit > len(messages):
-                        if message.text:
-                            messages.append(
-                                NewsItem(
-                                    source=self.class_name,
-                                    metadata=self.metadata,
-                                    url=self.parameters.get('TEMPLATE_URL_TELEGRAM',
-                                                            "https://t.me/s/{CHANNEL_NAME}/{ID_MESSAGE}").format(
-                                        CHANNEL_NAME=channel_name, ID_MESSAGE=message.id),
-                                    title=self.get_title_from_post(message.text),
-                                    raw_data=message.text,
-                                    approved=self.check_approved_source(channel_name)
-                                )
-                            )
-                    else:
-                        break
-
-                return messages
-
-            except ChannelPrivateError:
-                print(f"Ошибка: Канал {channel_name} приватный или у вас нет доступа.")
-                return None
-            except Exception as e:
-                print(f"Ошибка в канале {channel_name}: {e}")
-                return None
+        return TelegramSession.get_shared(
+            api_id=self.parameters['AUTHENTICATION']['TELEGRAM_API_ID'],
+            api_hash=self.parameters['AUTHENTICATION']['TELEGRAM_API_HASH'],
+            phone=self.parameters['AUTHENTICATION']['PHONE_NUM'],
+            session_name=os.getenv('SESSION_NAME', 'default_session'),
+            max_concurrent=self.parameters.get('TELEGRAM_MAX_CONCURRENT', 4),
+            max_flood_wait=self.parameters.get('TELEGRAM_MAX_FLOOD_WAIT', 300),
+            store_directory=self.get_store_directory(),
+            regions_keywords=self.parameters.get('REGIONS_KEYWORDS'),
+        )
+
+    def get_store_directory(self) -> Optional[str]:
+        """Папка локального хранилища сообщений (None — сообщения загружаются напрямую, без хранилища)"""
+        cache_dir = self.parameters.get('OUTPUT_DIR_CACHE')
+        if not cache_dir or not self.parameters.get('TELEGRAM_USE_STORE', True):
+            return None
+        return str(cache_dir)
+
+    @classmethod
+    def load_region_data(cls, parameters: dict, metadata: dict, requests_to_parse: list,
+                         synced_after: float = 0.0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Сообщения каналов контейнера за период только по его региону (metadata['AVAILABLE_REGIONS'])
+        из списков регионов локального хранилища — без чтения и повторного сканирования всей выгрузки
+        каналов категории. None, если хранилище не покрывает период каналов или синхронизировалось
+        раньше synced_after (тогда используется файл выгрузки).
+        """
+        region = metadata.get('AVAILABLE_REGIONS')
+        parser = cls.__new__(cls)
+        parser.class_name = 'Telegram'
+        parser.parameters = parameters
+        parser.metadata = metadata
+        store_directory = parser.get_store_directory()
+        regions_keywords = parameters.get('REGIONS_KEYWORDS')
+        if not store_directory or not regions_keywords or region not in regions_keywords:
+            return None
+
+        date_from = parser.get_date_from_metadata('DATE_FROM')
+        date_to = parser.get_date_from_metadata('DATE_TO')
+        store = TelegramStore(store_directory, regions_keywords)
+        try:
+            items = []
+            for request in requests_to_parse:
+                channel = request['query'].split('/')[-1]
+                state = store.get_state(channel)
+                if (state is None or state['oldest_date'] > date_from.timestamp()
+                        or state['synced_at'] < min(synced_after, date_to.timestamp())):
+                    return None
+                messages = store.get_messages(channel, date_from, date_to,
+                                              request.get('search_limit', parser.get_limit_search()), region=region)
+                items.extend(parser.message_to_news_item(channel, message).get_full_data_dict()
+                             for message in messages)
+            return items
+        finally:
+            store.close()
+
+    def message_to_news_item(self, channel_name: str, message: dict) -> NewsItem:
+        return NewsItem(
+            source=self.class_name,
+            metadata=self.metadata,
+            url=self.parameters.get('TEMPLATE_URL_TELEGRAM',
+                                    "https://t.me/s/{CHANNEL_NAME}/{ID_MESSAGE}").format(
+                CHANNEL_NAME=channel_name, ID_MESSAGE=message['id']),
+            title=self.get_title_from_post(message['text']),
+            raw_data=message['text'],
+            approved=self.check_approved_source(channel_name)
+        )
 
     async def _process_channels(self, channel_list):
+        """Все каналы контейнера загружаются параллельно через общую сессию"""
         all_messages = []
 
         date_from = self.get_date_from_metadata('DATE_FROM')
         date_to = self.get_date_from_metadata('DATE_TO')
 
+        channels = []
         for request in channel_list:
-
             channel = request['query'].split('/')[-1]
-            print(f"    CHANNEL {channel}: ", end='')
             try:
                 search_limit = request["search_limit"]
             except Exception as e:
                 search_limit = self.get_limit_search()
+            channels.append((channel, search_limit))
 
-            messages = await self._get_channel_messages(channel, search_limit, date_from, date_to)
+        results = await self.get_session().get_many(channels, date_from, date_to)
 
+        for (channel, _), messages in zip(channels, results):
+            print(f"    CHANNEL {channel}: ", end='')
             if messages:
-                all_messages.extend(messages)
+                all_messages.extend(self.message_to_news_item(channel, message) for message in messages)
                 print(f"{len(messages)} сообщений")
             else:
                 print(f"Не удалось получить сообщения из {channel}")
@@ -193,4 +241,5 @@ class TelegramParser(BaseParser):
         """Реализация парсинга Telegram каналов"""
         print(f'\nTELEGRAM SCRAPING {self.metadata}')
 
-        return asyncio.run(self._process_channels(self.requests_to_parse))
+        # Общий событийный цикл: клиент Telegram живёт в нём весь запуск
+        return run_async(self._process_channels(self.requests_to_parse))
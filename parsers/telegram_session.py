@@ -0,0 +1,246 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError, ChannelPrivateError
+
+from tools.telegram_store import TelegramStore
+
+
+class TelegramSession:
+    """
+    Одна долгоживущая сессия Telethon на весь запуск.
+
+    Клиент подключается один раз (при первом обращении) и используется всеми контейнерами, в том
+    числе категориями с общими каналами. Каналы загружаются параллельно, не более max_concurrent
+    одновременно. FloodWaitError обрабатывается для каждого канала отдельно: канал ждёт указанное
+    время (не дольше max_flood_wait), освободив слот, и продолжает загрузку с последнего полученного
+    сообщения, а остальные каналы в это время загружаются дальше.
+
+    С локальным хранилищем (store_directory) канал синхронизируется инкрементально: докачиваются только
+    сообщения новее сохранённых и, при необходимости, история ниже уже загруженной, а выборка за период
+    делается из хранилища. В пределах запуска верхняя отметка канала обновляется один раз, поэтому
+    категории с общими каналами получают сообщения без обращений к Telegram.
+
+    Клиент и примитивы asyncio привязаны к событийному циклу, поэтому сессию нужно использовать в общем
+    цикле запуска (tools.async_runner.run_async) и закрыть в конце через close_all().
+    """
+
+    _shared: Dict[str, 'TelegramSession'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, api_id, api_hash: str, phone: Optional[str] = None, session_name: str = 'default_session',
+                 max_concurrent: int = 4, max_flood_wait: float = 300, max_attempts: int = 3,
+                 store_directory: Optional[str] = None, sync_batch_size: int = 200,
+                 regions_keywords: Optional[Dict[str, List[str]]] = None):
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.phone = phone
+        self.session_name = session_name
+        self.max_concurrent = max_concurrent
+        # FloodWait дольше этого (в секундах) не ждём — канал пропускается
+        self.max_flood_wait = max_flood_wait
+        self.max_attempts = max_attempts
+
+        # С regions_keywords сообщения при записи в хранилище раскладываются по спискам регионов
+        self.store = TelegramStore(store_directory, regions_keywords) if store_directory else None
+        # Сообщения догрузки истории записываются в хранилище пачками (прогресс сохраняется при FloodWait)
+        self.sync_batch_size = sync_batch_size
+        # Каналы, верхняя отметка которых уже обновлена в этом запуске
+        self.synced_channels = set()
+
+        self.client: Optional[TelegramClient] = None
+        self.entities = {}
+        self.stats = {'channels': 0, 'messages': 0, 'downloaded': 0, 'failed': 0,
+                      'flood_waits': 0, 'flood_wait_seconds': 0}
+
+        self._loop = None
+        self._connect_lock = None
+        self._semaphore = None
+
+    @classmethod
+    def get_shared(cls, api_id, api_hash: str, phone: Optional[str] = None,
+                   session_name: str = 'default_session', **kwargs) -> 'TelegramSession':
+        """Общая сессия на процесс для файла сессии session_name"""
+        with cls._shared_lock:
+            if session_name not in cls._shared:
+                cls._shared[session_name] = cls(api_id, api_hash, phone, session_name, **kwargs)
+            return cls._shared[session_name]
+
+    @classmethod
+    async def close_all(cls):
+        with cls._shared_lock:
+            sessions = list(cls._shared.values())
+            cls._shared.clear()
+        for session in sessions:
+            session.print_statistics()
+            await session.close()
+
+    def _ensure_loop(self):
+        """Примитивы asyncio и клиент привязаны к циклу, поэтому при смене цикла создаём их заново"""
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._connect_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self.client = None
+            self.entities = {}
+
+    async def connect(self) -> TelegramClient:
+        """Подключённый и авторизованный клиент (подключение выполняется один раз)"""
+        self._ensure_loop()
+        async with self._connect_lock:
+            if self.client is None or not self.client.is_connected():
+                client = TelegramClient(self.session_name, self.api_id, self.api_hash)
+                await client.start(self.phone)
+                self.client = client
+                print("✓ Telegram: сессия подключена")
+        return self.client
+
+    async def get_entity(self, channel_name: str):
+        client = await self.connect()
+        if channel_name not in self.entities:
+            self.entities[channel_name] = await client.get_entity(channel_name)
+        return self.entities[channel_name]
+
+    @staticmethod
+    def to_record(message) -> Dict:
+        return {'id': message.id, 'date': message.date, 'text': message.text}
+
+    async def _read_messages(self, entity, date_from: datetime, date_to: datetime, limit: int, messages: list):
+        """Дописывает в messages сообщения с текстом за период, от новых к старым, начиная после последнего"""
+        if messages:
+            iterator = self.client.iter_messages(entity, offset_id=messages[-1]['id'])
+        else:
+            iterator = self.client.iter_messages(entity, offset_date=date_to)
+        async for message in iterator:
+            if not (date_from <= message.date <= date_to and limit > len(messages)):
+                break
+            if message.text:
+                messages.append(self.to_record(message))
+
+    def _save_batch(self, channel_name: str, batch: list):
+        """Записывает пачку сообщений (от новых к старым) и опускает нижнюю отметку до последнего из них"""
+        self.store.add_messages(channel_name, [self.to_record(m) for m in batch if m.text])
+        self.store.update_state(channel_name, oldest_id=batch[-1].id, oldest_date=batch[-1].date.timestamp())
+        self.stats['downloaded'] += len(batch)
+
+    def is_synced(self, channel_name: str, date_from: datetime) -> bool:
+        """Канал уже синхронизирован в этом запуске и хранилище покрывает период начиная с date_from"""
+        if self.store is None or TelegramStore.normalize_channel(channel_name) not in self.synced_channels:
+            return False
+        state = self.store.get_state(channel_name)
+        return state is not None and state['oldest_date'] <= date_from.timestamp()
+
+    async def sync_channel(self, channel_name: str, entity, date_from: datetime):
+        """
+        Инкрементальная синхронизация канала с хранилищем:
+        1) сообщения новее верхней отметки (min_id) — один раз за запуск;
+        2) история ниже нижней отметки, пока не будет пройден date_from.
+        """
+        key = TelegramStore.normalize_channel(channel_name)
+        state = self.store.get_state(channel_name)
+
+        if state is not None and key not in self.synced_channels:
+            newer = [message async for message in self.client.iter_messages(entity, min_id=state['max_id'])]
+            if newer:
+                newest = max(newer, key=lambda m: m.id)
+                self.store.add_messages(channel_name, [self.to_record(m) for m in newer if m.text])
+                self.store.update_state(channel_name, max_id=newest.id, max_date=newest.date)
+                self.stats['downloaded'] += len(newer)
+
+        if state is None or state['oldest_date'] > date_from.timestamp():
+            batch = []
+            iterator = self.client.iter_messages(entity, offset_id=state['oldest_id'] if state else 0)
+            async for message in iterator:
+                if state is None:
+                    # Первая загрузка канала: верхняя отметка — самое новое сообщение,
+                    # участок пока пуст (нижняя отметка чуть выше него)
+                    self.store.update_state(channel_name, max_id=message.id, max_date=message.date,
+                                            oldest_id=message.id + 1, oldest_date=message.date.timestamp() + 1)
+                    state = self.store.get_state(channel_name)
+                if message.date < date_from:
+                    if batch:
+                        self._save_batch(channel_name, batch)
+                    # Всё, что новее этого сообщения, загружено
+                    self.store.update_state(channel_name, oldest_id=message.id + 1,
+                                            oldest_date=date_from.timestamp())
+                    break
+                batch.append(message)
+                if len(batch) >= self.sync_batch_size:
+                    self._save_batch(channel_name, batch)
+                    batch = []
+            else:
+                if batch:
+                    self._save_batch(channel_name, batch)
+                # История канала закончилась — участок покрывает любой период
+                self.store.update_state(channel_name, oldest_id=0, oldest_date=0.0)
+
+        self.synced_channels.add(key)
+
+    async def get_channel_messages(self, channel_name: str, date_from: datetime, date_to: datetime,
+                                   limit: int) -> Optional[list]:
+        """
+        Сообщения канала с текстом за период ({'id', 'date', 'text'}, от новых к старым, не больше limit)
+        или None, если канал недоступен
+        """
+        self._ensure_loop()
+        messages = []
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if self.is_synced(channel_name, date_from):
+                    messages = self.store.get_messages(channel_name, date_from, date_to, limit)
+                else:
+                    async with self._semaphore:
+                        entity = await self.get_entity(channel_name)
+                        if self.store is None:
+                            await self._read_messages(entity, date_from, date_to, limit, messages)
+                        else:
+                            await self.sync_channel(channel_name, entity, date_from)
+                            messages = self.store.get_messages(channel_name, date_from, date_to, limit)
+                self.stats['channels'] += 1
+                self.stats['messages'] += len(messages)
+                return messages
+
+            except FloodWaitError as e:
+                self.stats['flood_waits'] += 1
+                if e.seconds > self.max_flood_wait or attempt == self.max_attempts:
+                    print(f"⚠ Telegram: FloodWait {e.seconds} с для {channel_name}, канал пропущен")
+                    break
+                print(f"⚠ Telegram: FloodWait {e.seconds} с для {channel_name}, ожидание")
+                self.stats['flood_wait_seconds'] += e.seconds
+                # Слот свободен, пока канал ждёт: остальные каналы продолжают загрузку
+                await asyncio.sleep(e.seconds)
+
+            except ChannelPrivateError:
+                print(f"Ошибка: Канал {channel_name} приватный или у вас нет доступа.")
+                break
+            except Exception as e:
+                print(f"Ошибка в канале {channel_name}: {e}")
+                break
+
+        self.stats['failed'] += 1
+        return None
+
+    async def get_many(self, channels: List[Tuple[str, int]], date_from: datetime,
+                       date_to: datetime) -> List[Optional[list]]:
+        """Параллельная загрузка каналов [(канал, лимит), ...], результаты — в порядке каналов"""
+        return await asyncio.gather(*(self.get_channel_messages(channel_name, date_from, date_to, limit)
+                                      for channel_name, limit in channels))
+
+    def print_statistics(self):
+        print(f"Telegram: каналов загружено {self.stats['channels']}, сообщений {self.stats['messages']} "
+              f"(скачано из Telegram {self.stats['downloaded']}), "
+              f"ошибок {self.stats['failed']}, FloodWait {self.stats['flood_waits']} "
+              f"({self.stats['flood_wait_seconds']} с)")
+
+    async def close(self):
+        if self.client is not None and self._loop is asyncio.get_event_loop():
+            await self.client.disconnect()
+        self.client = None
+        self.entities = {}
+        if self.store is not None:
+            self.store.close()
+            self.store = None
@@ -0,0 +1,330 @@
+import asyncio
+import random
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple, AsyncIterator
+
+import aiohttp
+from lxml import html as lxml_html
+
+from parsers.website_parser import WebsiteParser
+from tools.telegram_store import TelegramStore
+
+
+class TelegramWebSession:
+    """
+    Чтение публичных каналов через веб-предпросмотр https://t.me/s/{канал} без Telethon.
+
+    Не нужны API ID, API hash и сессия телефона, поэтому бэкенд подходит для узлов пакетной обработки
+    без входа в Telegram. Страница предпросмотра содержит около 20 последних сообщений; более старые
+    запрашиваются по курсору ?before={id самого старого сообщения страницы}. Страницы одного канала
+    идут последовательно, а каналы загружаются параллельно (не более max_concurrent одновременно)
+    через общий пул keep-alive соединений aiohttp. Посты и даты разбираются lxml.
+
+    Интерфейс совпадает с TelegramSession: get_many / get_channel_messages возвращают записи
+    {'id', 'date', 'text'} с теми же id сообщений, поэтому хранилище сообщений (store_directory)
+    общее для обоих бэкендов и синхронизируется так же инкрементально. Текст переводится в ту же
+    разметку, что и message.text в Telethon (**жирный**, __курсив__, [текст](ссылка)).
+
+    Доступны только публичные каналы с включённым предпросмотром. Сессия HTTP привязана к событийному
+    циклу, поэтому её нужно использовать в общем цикле запуска (tools.async_runner.run_async)
+    и закрыть в конце через close_all().
+    """
+
+    DEFAULT_BASE_URL = 'https://t.me'
+
+    MESSAGE_XPATH = '//div[contains(concat(" ", normalize-space(@class), " "), " tgme_widget_message ")][@data-post]'
+    # js-message_text — текст самого сообщения (у цитаты ответа класс js-message_reply_text)
+    TEXT_XPATH = './/div[contains(concat(" ", normalize-space(@class), " "), " js-message_text ")]'
+    DATE_XPATH = './/a[contains(@class, "tgme_widget_message_date")]/time/@datetime'
+    HISTORY_XPATH = '//section[contains(@class, "tgme_channel_history")]'
+
+    _shared: Dict[str, 'TelegramWebSession'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_concurrent: int = 8, max_attempts: int = 3,
+                 max_retry_after: float = 300, timeout: float = 15, store_directory: Optional[str] = None,
+                 sync_batch_size: int = 200, regions_keywords: Optional[Dict[str, List[str]]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrent = max_concurrent
+        self.max_attempts = max_attempts
+        # Ответ 429 с ожиданием дольше этого (в секундах) не ждём — канал пропускается
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+
+        self.store = TelegramStore(store_directory, regions_keywords) if store_directory else None
+        self.sync_batch_size = sync_batch_size
+        # Каналы, верхняя отметка которых уже обновлена в этом запуске
+        self.synced_channels = set()
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {'channels': 0, 'messages': 0, 'downloaded': 0, 'pages': 0, 'failed': 0,
+                      'retries': 0, 'retry_seconds': 0.0}
+
+        self._loop = None
+        self._semaphore = None
+
+    @classmethod
+    def get_shared(cls, base_url: str = DEFAULT_BASE_URL, **kwargs) -> 'TelegramWebSession':
+        """Общая сессия на процесс для адреса предпросмотра base_url"""
+        with cls._shared_lock:
+            if base_url not in cls._shared:
+                cls._shared[base_url] = cls(base_url, **kwargs)
+            return cls._shared[base_url]
+
+    @classmethod
+    async def close_all(cls):
+        with cls._shared_lock:
+            sessions = list(cls._shared.values())
+            cls._shared.clear()
+        for session in sessions:
+            session.print_statistics()
+            await session.close()
+
+    def _ensure_loop(self):
+        """Семафор и HTTP-сессия привязаны к циклу, поэтому при смене цикла создаём их заново"""
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self.session = None
+
+    def _get_http(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent, keepalive_timeout=30, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'User-Agent': random.choice(WebsiteParser.USER_AGENTS),
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+                }
+            )
+        return self.session
+
+    def channel_url(self, channel_name: str) -> str:
+        return f"{self.base_url}/s/{TelegramStore.normalize_channel(channel_name)}"
+
+    # ---- Разбор страницы ----
+
+    @classmethod
+    def element_to_text(cls, element) -> str:
+        """Текст сообщения в разметке Telethon: <br> — перевод строки, b/i/a — **, __ и [текст](ссылка)"""
+        parts = [element.text or '']
+        for child in element:
+            tag = child.tag if isinstance(child.tag, str) else ''
+            if tag == 'br':
+                parts.append('\n')
+            elif 'emoji' in (child.get('class') or ''):
+                # Эмодзи в предпросмотре обёрнуты в <i class="emoji"><b>…</b></i>
+                parts.append(child.text_content())
+            else:
+                inner = cls.element_to_text(child)
+                if tag in ('b', 'strong') and inner.strip():
+                    inner = f'**{inner}**'
+                elif tag in ('i', 'em') and inner.strip():
+                    inner = f'__{inner}__'
+                elif tag == 'a' and child.get('href') and inner.strip() and inner != child.get('href'):
+                    inner = f"[{inner}]({child.get('href')})"
+                parts.append(inner)
+            parts.append(child.tail or '')
+        return ''.join(parts)
+
+    @classmethod
+    def parse_page(cls, content: str) -> Optional[List[Dict]]:
+        """
+        Сообщения страницы предпросмотра {'id', 'date', 'text'} от новых к старым
+        (text пустой у сообщений без текста) или None, если у канала нет предпросмотра
+        """
+        try:
+            root = lxml_html.document_fromstring(content)
+        except Exception:
+            return None
+        if not root.xpath(cls.HISTORY_XPATH):
+            return None
+
+        records = []
+        for message in root.xpath(cls.MESSAGE_XPATH):
+            try:
+                message_id = int(message.get('data-post').rsplit('/', 1)[-1])
+            except ValueError:
+                continue
+            dates = message.xpath(cls.DATE_XPATH)
+            if not dates:
+                continue
+            try:
+                message_date = datetime.fromisoformat(dates[0])
+            except ValueError:
+                continue
+            texts = message.xpath(cls.TEXT_XPATH)
+            text = cls.element_to_text(texts[0]).strip() if texts else ''
+            records.append({'id': message_id, 'date': message_date, 'text': text})
+        records.sort(key=lambda record: record['id'], reverse=True)
+        return records
+
+    # ---- Загрузка ----
+
+    async def fetch_page(self, channel_name: str, before: Optional[int] = None) -> Optional[List[Dict]]:
+        """Страница канала с сообщениями id < before (без before — последние); None — предпросмотр недоступен"""
+        url = self.channel_url(channel_name)
+        params = {'before': str(before)} if before else None
+        for attempt in range(1, self.max_attempts + 1):
+            async with self._get_http().get(url, params=params, allow_redirects=True) as response:
+                if response.status == 429 or response.status >= 500:
+                    try:
+                        retry_after = float(response.headers.get('Retry-After', ''))
+                    except ValueError:
+                        retry_after = 2.0 ** attempt
+                    if retry_after > self.max_retry_after or attempt == self.max_attempts:
+                        raise RuntimeError(f"HTTP {response.status}, ожидание {retry_after:.0f} с")
+                    self.stats['retries'] += 1
+                    self.stats['retry_seconds'] += retry_after
+                    await asyncio.sleep(retry_after)
+                    continue
+                if response.status != 200:
+                    return None
+                content = await response.text(errors='replace')
+            self.stats['pages'] += 1
+            return self.parse_page(content)
+        return None
+
+    async def iter_messages(self, channel_name: str, before: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Сообщения канала от новых к старым, начиная ниже before (как iter_messages(offset_id) в Telethon)"""
+        while True:
+            records = await self.fetch_page(channel_name, before)
+            if records is None:
+                if before is None:
+                    raise LookupError('веб-предпросмотр канала недоступен')
+                return
+            # Курсор не сдвинулся — история закончилась
+            records = [record for record in records if before is None or record['id'] < before]
+            if not records:
+                return
+            for record in records:
+                yield record
+            before = records[-1]['id']
+            if before <= 1:
+                return
+
+    async def _read_messages(self, channel_name: str, date_from: datetime, date_to: datetime, limit: int,
+                             messages: list):
+        """Дописывает в messages сообщения с текстом за период, от новых к старым"""
+        async for record in self.iter_messages(channel_name):
+            if record['date'] > date_to:
+                continue
+            if not (date_from <= record['date'] and limit > len(messages)):
+                break
+            if record['text']:
+                messages.append(record)
+
+    def _save_batch(self, channel_name: str, batch: list):
+        """Записывает пачку сообщений (от новых к старым) и опускает нижнюю отметку до последнего из них"""
+        self.store.add_messages(channel_name, [record for record in batch if record['text']])
+        self.store.update_state(channel_name, oldest_id=batch[-1]['id'], oldest_date=batch[-1]['date'].timestamp())
+        self.stats['downloaded'] += len(batch)
+
+    def is_synced(self, channel_name: str, date_from: datetime) -> bool:
+        """Канал уже синхронизирован в этом запуске и хранилище покрывает период начиная с date_from"""
+        if self.store is None or TelegramStore.normalize_channel(channel_name) not in self.synced_channels:
+            return False
+        state = self.store.get_state(channel_name)
+        return state is not None and state['oldest_date'] <= date_from.timestamp()
+
+    async def sync_channel(self, channel_name: str, date_from: datetime):
+        """
+        Инкрементальная синхронизация канала с хранилищем (как TelegramSession.sync_channel):
+        1) сообщения новее верхней отметки — страницы сверху, пока не встретится max_id;
+        2) история ниже нижней отметки по курсору before, пока не будет пройден date_from.
+        """
+        key = TelegramStore.normalize_channel(channel_name)
+        state = self.store.get_state(channel_name)
+
+        if state is not None and key not in self.synced_channels:
+            newer = []
+            async for record in self.iter_messages(channel_name):
+                if record['id'] <= state['max_id']:
+                    break
+                newer.append(record)
+            if newer:
+                self.store.add_messages(channel_name, [record for record in newer if record['text']])
+                self.store.update_state(channel_name, max_id=newer[0]['id'], max_date=newer[0]['date'])
+                self.stats['downloaded'] += len(newer)
+
+        if state is None or state['oldest_date'] > date_from.timestamp():
+            batch = []
+            async for record in self.iter_messages(channel_name, before=state['oldest_id'] if state else None):
+                if state is None:
+                    # Первая загрузка канала: верхняя отметка — самое новое сообщение, участок пока пуст
+                    self.store.update_state(channel_name, max_id=record['id'], max_date=record['date'],
+                                            oldest_id=record['id'] + 1, oldest_date=record['date'].timestamp() + 1)
+                    state = self.store.get_state(channel_name)
+                if record['date'] < date_from:
+                    if batch:
+                        self._save_batch(channel_name, batch)
+                    self.store.update_state(channel_name, oldest_id=record['id'] + 1,
+                                            oldest_date=date_from.timestamp())
+                    break
+                batch.append(record)
+                if len(batch) >= self.sync_batch_size:
+                    self._save_batch(channel_name, batch)
+                    batch = []
+            else:
+                if batch:
+                    self._save_batch(channel_name, batch)
+                # История канала закончилась — участок покрывает любой период
+                self.store.update_state(channel_name, oldest_id=0, oldest_date=0.0)
+
+        self.synced_channels.add(key)
+
+    async def get_channel_messages(self, channel_name: str, date_from: datetime, date_to: datetime,
+                                   limit: int) -> Optional[list]:
+        """
+        Сообщения канала с текстом за период ({'id', 'date', 'text'}, от новых к старым, не больше limit)
+        или None, если канал недоступен
+        """
+        self._ensure_loop()
+        messages = []
+        try:
+            if self.is_synced(channel_name, date_from):
+                messages = self.store.get_messages(channel_name, date_from, date_to, limit)
+            else:
+                async with self._semaphore:
+                    if self.store is None:
+                        await self._read_messages(channel_name, date_from, date_to, limit, messages)
+                    else:
+                        await self.sync_channel(channel_name, date_from)
+                        messages = self.store.get_messages(channel_name, date_from, date_to, limit)
+            self.stats['channels'] += 1
+            self.stats['messages'] += len(messages)
+            return messages
+
+        except LookupError as e:
+            print(f"Ошибка: Канал {channel_name}: {e}.")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Ошибка в канале {channel_name}: {e.__class__.__name__} {e}")
+        except Exception as e:
+            print(f"Ошибка в канале {channel_name}: {e}")
+
+        self.stats['failed'] += 1
+        return None
+
+    async def get_many(self, channels: List[Tuple[str, int]], date_from: datetime,
+                       date_to: datetime) -> List[Optional[list]]:
+        """Параллельная загрузка каналов [(канал, лимит), ...], результаты — в порядке каналов"""
+        return await asyncio.gather(*(self.get_channel_messages(channel_name, date_from, date_to, limit)
+                                      for channel_name, limit in channels))
+
+    def print_statistics(self):
+        print(f"Telegram (t.me/s): каналов загружено {self.stats['channels']}, сообщений {self.stats['messages']} "
+              f"(скачано {self.stats['downloaded']}, страниц {self.stats['pages']}), "
+              f"ошибок {self.stats['failed']}, повторов {self.stats['retries']} "
+              f"({self.stats['retry_seconds']:.0f} с)")
+
+    async def close(self):
+        if self.session is not None and not self.session.closed and self._loop is asyncio.get_event_loop():
+            await self.session.close()
+        self.session = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
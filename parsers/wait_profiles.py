@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Состояние страницы одним вызовом: readyState, длина видимого текста body (innerText, без текста
+# встроенных <script>), число завершённых сетевых запросов. Resource Timing добавляет запись только
+# по окончании запроса, поэтому неизменное число записей — лишь подсказка, что сеть затихла:
+# незавершённый XHR не виден, а трекеры, реклама и long-polling добавляют записи постоянно.
+READINESS_EXPRESSION = ("[document.readyState, "
+                        "document.body ? document.body.innerText.length : 0, "
+                        "performance.getEntriesByType('resource').length]")
+
+
+class PageReadiness:
+    """
+    Ожидание готовности одной страницы.
+
+    Страница готова, когда document.readyState не 'loading', в body есть текст, и в течение
+    окна стабилизации (из профиля домена) не менялась длина текста. Для доменов, которые профиль
+    уже считает статичными (network_shortcut), текст принимается раньше, если сеть затихла —
+    число сетевых запросов и длина текста не менялись network_idle_window секунд. Полностью
+    загруженная страница с коротким текстом принимается после максимального окна.
+    """
+
+    def __init__(self, profiles: 'WaitProfiles', host: str, stable_window: float, min_text_length: int,
+                 network_shortcut: bool = False):
+        self.profiles = profiles
+        self.host = host
+        self.stable_window = stable_window
+        self.min_text_length = min_text_length
+        self.network_shortcut = network_shortcut
+
+        self.started_at = time.monotonic()
+        self.interactive_at = None
+        # Часы стабильности текста и отдельные часы сети (подсказка о затихании)
+        self.changed_at = self.started_at
+        self.network_changed_at = self.started_at
+        self.text_length = -1
+        self.resources = -1
+        self.text_at_interactive = 0
+
+    def update(self, state) -> bool:
+        """Принимает результат READINESS_EXPRESSION, возвращает True, если страница готова"""
+        ready_state, text_length, resources = state
+        now = time.monotonic()
+
+        if text_length != self.text_length:
+            self.text_length = text_length
+            self.changed_at = now
+        if resources != self.resources:
+            self.resources = resources
+            self.network_changed_at = now
+
+        if ready_state == 'loading':
+            return False
+        if self.interactive_at is None:
+            self.interactive_at = now
+            self.text_at_interactive = text_length
+
+        stable_for = now - self.changed_at
+        if text_length >= self.min_text_length:
+            if stable_for >= self.stable_window:
+                return True
+            if not self.network_shortcut:
+                return False
+            idle_window = self.profiles.network_idle_window
+            return now - self.network_changed_at >= idle_window and stable_for >= idle_window
+        return ready_state == 'complete' and stable_for >= self.profiles.max_window
+
+    def finish(self, timed_out: bool = False):
+        """Передаёт наблюдения в профиль домена"""
+        interactive_at = self.interactive_at if self.interactive_at is not None else self.changed_at
+        # Сколько страница «дозревала» после DOMContentLoaded и какую долю текста дорисовал JavaScript
+        settle = max(0.0, self.changed_at - interactive_at)
+        js_share = 0.0
+        if self.text_length > 0:
+            js_share = max(0, self.text_length - self.text_at_interactive) / self.text_length
+        self.profiles.record(self.host, settle, js_share, timed_out)
+
+
+class WaitProfiles:
+    """
+    Профили ожидания по доменам, общие для всех драйверов запуска.
+
+    Для каждого домена копится скользящее среднее времени «дозревания» страницы после
+    DOMContentLoaded и доли текста, которую дорисовывает JavaScript. Статичные домены получают
+    короткое окно стабилизации и возвращаются сразу, как только текст на месте; JS-тяжёлые —
+    окно подлиннее. Доля таймаутов домена — тоже скользящее среднее, поэтому домен, получивший
+    максимальное окно из-за таймаутов, возвращается к обычному окну, когда страницы перестают
+    отваливаться. Профили можно сохранять между запусками (path).
+    """
+
+    def __init__(self, path: Optional[str] = None, default_window: float = 0.5, min_window: float = 0.15,
+                 max_window: float = 2.0, min_text_length: int = 200, alpha: float = 0.3,
+                 network_idle_window: float = 0.3, static_js_share: float = 0.05, static_min_samples: int = 3):
+        self.path = str(path) if path else None
+        self.default_window = default_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.min_text_length = min_text_length
+        # Сколько секунд без новых сетевых запросов считается затиханием сети (больше интервала опроса)
+        self.network_idle_window = network_idle_window
+        # Домен считается статичным, когда после static_min_samples страниц JavaScript дорисовывает
+        # в среднем меньше static_js_share текста: только у таких доменов сеть может сократить ожидание
+        self.static_js_share = static_js_share
+        self.static_min_samples = static_min_samples
+        # Вес нового наблюдения в скользящем среднем
+        self.alpha = alpha
+
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        host = (urlsplit(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def stable_window(self, host: str) -> float:
+        """Окно стабилизации для домена"""
+        with self._lock:
+            profile = self.profiles.get(host)
+        if not profile:
+            return self.default_window
+        window = self.min_window + profile['settle'] * 0.5 + profile['js_share'] * 1.0
+        if profile['timeout_rate'] > 0.5:
+            window = self.max_window
+        return min(self.max_window, max(self.min_window, window))
+
+    def is_static(self, host: str) -> bool:
+        """Профиль уверенно считает домен статичным (текст в исходном HTML, без таймаутов)"""
+        with self._lock:
+            profile = self.profiles.get(host)
+        return bool(profile) and (profile['samples'] >= self.static_min_samples
+                                  and profile['js_share'] < self.static_js_share
+                                  and profile['timeout_rate'] < 0.1)
+
+    def start(self, url: str) -> PageReadiness:
+        host = self.get_host(url)
+        window = self.stable_window(host)
+        # Сокращение имеет смысл, только если окно затихания сети короче окна стабилизации
+        shortcut = self.network_idle_window < window and self.is_static(host)
+        return PageReadiness(self, host, window, self.min_text_length, network_shortcut=shortcut)
+
+    def record(self, host: str, settle: float, js_share: float, timed_out: bool):
+        with self._lock:
+            profile = self.profiles.get(host)
+            if profile is None:
+                self.profiles[host] = {'samples': 1, 'settle': settle, 'js_share': js_share,
+                                       'timeout_rate': float(timed_out)}
+                return
+            profile['samples'] += 1
+            profile['settle'] += self.alpha * (settle - profile['settle'])
+            profile['js_share'] += self.alpha * (js_share - profile['js_share'])
+            profile['timeout_rate'] += self.alpha * (float(timed_out) - profile['timeout_rate'])
+
+    def load(self):
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.profiles = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось загрузить профили ожидания {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with self._lock:
+                data = json.dumps(self.profiles, ensure_ascii=False, indent=1)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить профили ожидания {self.path}: {e}")
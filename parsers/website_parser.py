@@ -3,24 +3,38 @@ from typing import Optional
 import asyncio
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
 import time
 import random
 import logging
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import re
 
+from parsers.wait_profiles import WaitProfiles, READINESS_EXPRESSION
+from tools.fetch_telemetry import FetchTrace
+
 logger = logging.getLogger(__name__)
 
 
 class WebsiteParser:
-    def __init__(self, headless: bool = True, page_load_timeout: int = 10000, show_browser: bool = False):
+    USER_AGENTS = [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/118.0",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    ]
+
+    # Период опроса готовности страницы, секунды
+    READINESS_POLL_INTERVAL = 0.1
+
+    def __init__(self, headless: bool = True, page_load_timeout: int = 10000, show_browser: bool = False,
+                 wait_profiles: Optional[WaitProfiles] = None):
         self.headless = headless
         self.page_load_timeout = page_load_timeout
         self.show_browser = show_browser
+        # Профили ожидания по доменам (в пуле драйверов — общие для всех)
+        self.wait_profiles = wait_profiles if wait_profiles is not None else WaitProfiles()
         self.driver = None
 
     async def __aenter__(self):
@@ -54,6 +68,8 @@ class WebsiteParser:
         chrome_options.add_argument(f"user-agent={self._generate_user_agent()}")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        # driver.get возвращается после DOMContentLoaded, дальше готовность определяет _wait_until_ready
+        chrome_options.page_load_strategy = 'eager'
 
         try:
             # Запускаем в отдельном потоке, так как Selenium синхронный
@@ -76,62 +92,82 @@ class WebsiteParser:
                 await loop.run_in_executor(None, self.driver.quit)
             except Exception as e:
                 logger.error(f"Ошибка при закрытии драйвера: {e}")
+            finally:
+                self.driver = None
+
+    async def reset(self):
+        """Сброс состояния браузера между использованиями (для пула драйверов)"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._reset_state)
+
+    def _reset_state(self):
+        """Синхронный сброс: cookies, хранилища, лишние вкладки и текущая страница"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+        self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
 
     def _generate_user_agent(self) -> str:
-        agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/118.0",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        ]
-        return random.choice(agents)
+        return random.choice(self.USER_AGENTS)
 
     async def parse(self, url: str) -> Optional[str]:
         """Асинхронный парсинг URL"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._parse_with_selenium, url)
 
+    async def parse_page(self, url: str, trace: Optional[FetchTrace] = None) -> Optional[dict]:
+        """Асинхронный парсинг URL с исходным HTML: {'html': ..., 'text': ...}"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._parse_page_with_selenium, url, trace)
+
     def _parse_with_selenium(self, url: str) -> Optional[str]:
         """Синхронный парсинг (выполняется в отдельном потоке)"""
+        page = self._parse_page_with_selenium(url)
+        return page['text'] if page else None
+
+    def _parse_page_with_selenium(self, url: str, trace: Optional[FetchTrace] = None) -> Optional[dict]:
+        """
+        Синхронная загрузка страницы: возвращает исходный HTML и очищенный текст.
+        В trace пишутся фазы driver_get, ready_wait, page_source и cleaning.
+        """
+        trace = trace or FetchTrace(url)
         try:
             timeout_seconds = self.page_load_timeout / 1000
             self.driver.set_page_load_timeout(timeout_seconds)
 
-            start_time = time.time()
+            deadline = time.monotonic() + timeout_seconds
 
             try:
-                self.driver.get(url)
+                with trace.phase('driver_get'):
+                    self.driver.get(url)
                 print(f"✓ Загружаем: {url}")
             except TimeoutException:
                 print(f"⚠ Страница {url} не полностью загружена, парсим что есть")
-                pass
+                trace.update(timed_out=True)
             except Exception as e:
                 print(f"✗ Ошибка загрузки {url}: {e}")
+                trace.update(error=e.__class__.__name__)
                 return None
 
-            # Ждем появления body
-            body_timeout = max(5, timeout_seconds / 2)
-            try:
-                WebDriverWait(self.driver, body_timeout).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except TimeoutException:
-                print(f"⚠ Body не появился для {url}, продолжаем")
-
-            # Даем время для загрузки
-            elapsed = time.time() - start_time
-            remaining_time = max(0, timeout_seconds - elapsed - 1)
-            if remaining_time > 0:
-                time.sleep(min(2, remaining_time))
-
-            # Скроллинг
-            self._quick_behavior()
+            # Ждём готовности страницы по профилю домена (оставляем секунду запаса на получение HTML)
+            with trace.phase('ready_wait'):
+                ready = self._wait_until_ready(url, deadline - 1)
+            if not ready:
+                print(f"⚠ Страница {url} не стабилизировалась, парсим что есть")
+                trace.update(timed_out=True)
 
             # Получаем HTML
-            html_content = self.driver.page_source
+            with trace.phase('page_source'):
+                html_content = self.driver.page_source
+            trace.update(bytes_in=len(html_content.encode('utf-8')))
 
             # Очищаем контент
-            cleaned_content = self._clean_content(html_content)
+            with trace.phase('cleaning'):
+                cleaned_content = self._clean_content(html_content)
 
             # Выводим результат в реальном времени
             if cleaned_content:
@@ -139,42 +175,115 @@ class WebsiteParser:
             else:
                 print(f"✗ Не удалось спарсить: {url}")
 
-            return cleaned_content
+            return {'html': html_content, 'text': cleaned_content}
 
         except Exception as e:
             print(f"✗ Ошибка парсинга {url}: {e}")
+            trace.update(error=e.__class__.__name__)
             try:
                 html_content = self.driver.page_source
                 result = self._clean_content(html_content)
                 if result:
                     print(f"✓ Спарсено (после ошибки): {url} → {len(result)} символов")
-                return result
+                return {'html': html_content, 'text': result}
             except:
                 print(f"✗ Критическая ошибка для {url}")
                 return None
 
+    def _wait_until_ready(self, url: str, deadline: float) -> bool:
+        """
+        Ожидание готовности страницы: readyState, стабилизация длины текста и затихание сети
+        (см. WaitProfiles). Возвращает False, если страница не стабилизировалась до deadline.
+        """
+        readiness = self.wait_profiles.start(url)
+        scrolled = False
+        while True:
+            try:
+                state = self.driver.execute_script(f"return {READINESS_EXPRESSION};")
+            except Exception:
+                return False
+
+            if readiness.update(state):
+                readiness.finish()
+                return True
+
+            # Один скролл, как только появился DOM, чтобы запустить ленивую подгрузку
+            if not scrolled and state[0] != 'loading':
+                self._quick_behavior()
+                scrolled = True
+
+            if time.monotonic() >= deadline:
+                readiness.finish(timed_out=True)
+                return False
+            time.sleep(self.READINESS_POLL_INTERVAL)
+
     def _quick_behavior(self):
-        """Быстрый скроллинг"""
+        """Быстрый скроллинг (без пауз: дозагрузку дожидается _wait_until_ready)"""
         try:
-            self.driver.execute_script("window.scrollTo(0, 500);")
-            time.sleep(0.3)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.2)
+            self.driver.execute_script("window.scrollTo(0, 500); window.scrollTo(0, 0);")
         except Exception:
             # Игнорируем ошибки скроллинга
             pass
 
-    @staticmethod
-    def _remove_sensitive_and_urls(text: str) -> str:
-        url_pattern = r'https?://\S+|www\.\S+'
-        text = re.sub(url_pattern, '', text, flags=re.IGNORECASE)
+    # Шаблоны очистки компилируются один раз на класс
+    URL_PATTERN = re.compile(r'https?://\S+|www\.\S+', re.IGNORECASE)
+    SENSITIVE_WORDS_PATTERN = re.compile(r'\b(ИНН|БИК|ОГРН|Паспорт|СНИЛС|КПП|Карта|Телефон|Email)\b', re.IGNORECASE)
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+    AD_LINE_PATTERN = re.compile(r'cookie|реклама|ads|banner|advertisement')
+
+    # Служебные блоки и рекламные контейнеры удаляются одним XPath-проходом
+    PRUNE_XPATH = etree.XPath(
+        '//script | //style | //nav | //footer | //header'
+        ' | //*[contains(@class, "ads") or contains(@class, "banner") or contains(@class, "advertisement")'
+        ' or contains(@class, "promo") or contains(@id, "ads") or contains(@id, "banner")]'
+    )
+    TEXT_XPATH = etree.XPath('//text()')
+
+    @classmethod
+    def _remove_sensitive_and_urls(cls, text: str) -> str:
+        text = cls.URL_PATTERN.sub('', text)
+        text = cls.SENSITIVE_WORDS_PATTERN.sub('', text)
+        return cls.WHITESPACE_PATTERN.sub(' ', text).strip()
+
+    @classmethod
+    def _clean_lines(cls, text: str) -> str:
+        """Общая обработка текста по строкам: фильтр коротких и рекламных строк, удаление управляющих символов"""
+        cleaned_lines = []
+        for line in text.splitlines():
+            line = line.strip()
+            if len(line) > 5 and not cls.AD_LINE_PATTERN.search(line.lower()):
+                cleaned_lines.append(cls.CONTROL_CHARS_PATTERN.sub('', line))
+
+        clean_text = cls._remove_sensitive_and_urls('\n'.join(cleaned_lines))
+        return clean_text[:10000]
+
+    @classmethod
+    def _clean_content(cls, html: str) -> str:
+        """
+        Очистка HTML на lxml: удаление служебных и рекламных блоков одним XPath-запросом
+        и извлечение текстовых узлов. Результат совпадает с _clean_content_soup,
+        к которой выполняется откат, если lxml не смог разобрать документ.
+        """
+        try:
+            if not html or len(html.strip()) < 100:
+                return ""
 
-        sensitive_words_pattern = r'\b(ИНН|БИК|ОГРН|Паспорт|СНИЛС|КПП|Карта|Телефон|Email)\b'
-        text = re.sub(sensitive_words_pattern, '', text, flags=re.IGNORECASE)
+            root = lxml_html.document_fromstring(html)
+            # clear(keep_tail=True), а не drop_tree(): хвостовой текст должен остаться отдельным узлом,
+            # как после decompose() в BeautifulSoup, иначе он склеится с предыдущим текстом
+            for element in cls.PRUNE_XPATH(root):
+                element.clear(keep_tail=True)
 
-        return re.sub(r'\s+', ' ', text).strip()
+            strings = (string.strip() for string in cls.TEXT_XPATH(root))
+            return cls._clean_lines('\n'.join(string for string in strings if string))
 
-    def _clean_content(self, html: str) -> str:
+        except Exception:
+            return cls._clean_content_soup(html)
+
+    @classmethod
+    def _clean_content_soup(cls, html: str) -> str:
+        """Прежняя очистка на BeautifulSoup (эталон для сравнения и запасной вариант)"""
         try:
             if not html or len(html.strip()) < 100:
                 return ""
@@ -193,21 +302,10 @@ class WebsiteParser:
                 for element in soup.select(selector):
                     element.decompose()
 
-            text = soup.get_text(separator='\n', strip=True)
-            cleaned_lines = []
-
-            for line in text.splitlines():
-                line = line.strip()
-                if (line and len(line) > 5 and
-                        not any(x in line.lower() for x in ['cookie', 'реклама', 'ads', 'banner', 'advertisement'])):
-                    cleaned_line = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', line)
-                    cleaned_lines.append(cleaned_line)
-
-            clean_text = self._remove_sensitive_and_urls('\n'.join(cleaned_lines))
-            return clean_text[:10000]
+            return cls._clean_lines(soup.get_text(separator='\n', strip=True))
 
         except Exception:
             try:
                 return html[:10000]
             except:
-                return ""
\ No newline at end of file
+                return ""
@@ -1,9 +1,14 @@
 import json
 import os
+import threading
 import time
 from abc import ABC
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import List, Dict, Optional
+from io import BytesIO
+from itertools import islice
+from typing import List, Dict, Optional, Iterator, Tuple, Union, Callable
+from xml.etree import ElementTree as ET
 import pandas as pd
 
 # Импорты для Yandex API
@@ -36,6 +41,96 @@ def convert_date(date_str: str):
     return None
 
 
+class YandexOperationPoller:
+    """
+    Общий на процесс опрос отложенных операций Yandex Search API.
+
+    Операции всех контейнеров (отправленные заранее через YandexParser.prefetch и следующие страницы,
+    запрошенные парсерами) опрашиваются одним фоновым потоком раз в poll_interval секунд: ожидание
+    ответов разных контейнеров перекрывается, а не повторяется для каждого контейнера. Результат
+    операции доступен через Future; повторная отправка того же ключа возвращает тот же Future,
+    пока потребитель не вызовет release(ключ).
+    """
+
+    _shared: Optional['YandexOperationPoller'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, poll_interval: float = 1.0, timeout: float = 300):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._futures: Dict[str, Future] = {}
+        # ключ -> (операция, Future, срок ожидания, обработчик ответа)
+        self._operations: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def get_shared(cls, **kwargs) -> 'YandexOperationPoller':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            return cls._shared
+
+    def submit(self, key: str, start: Callable, on_result: Optional[Callable] = None) -> Future:
+        """
+        Запускает операцию start() (если операция с таким ключом ещё не отправлена) и возвращает Future
+        ответа. on_result(ответ) вызывается потоком опроса при завершении (например, запись в кэш)
+        """
+        with self._lock:
+            if key in self._futures:
+                return self._futures[key]
+        future = Future()
+        # Запуск операции — сетевой запрос, поэтому выполняется без блокировки опроса
+        try:
+            operation = start()
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        with self._lock:
+            if key in self._futures:
+                return self._futures[key]
+            self._futures[key] = future
+            self._operations[key] = (operation, future, time.time() + self.timeout, on_result)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll_loop, name='yandex_poller', daemon=True)
+                self._thread.start()
+            return future
+
+    def release(self, key: str):
+        """Забывает завершённую операцию после того, как её ответ получен потребителем"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and future.done():
+                del self._futures[key]
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                if not self._operations:
+                    self._thread = None
+                    return
+                operations = list(self._operations.items())
+
+            now = time.time()
+            for key, (operation, future, deadline, on_result) in operations:
+                try:
+                    if operation.get_status().is_running:
+                        if now < deadline:
+                            continue
+                        raise TimeoutError('не дождались ответа API поиска')
+                    response = operation.get_result()
+                    if on_result is not None:
+                        on_result(response)
+                except Exception as e:
+                    print(f"❌ Ошибка операции API поиска {key}: {e}")
+                    response = None
+                with self._lock:
+                    del self._operations[key]
+                future.set_result(response)
+
+            time.sleep(self.poll_interval)
+
+
 class YandexParser(BaseParser, ABC):
     def __init__(self, requests_to_parse: list[str], parameters: dict, metadata: dict, save_to: dict):
         super().__init__()
@@ -45,6 +140,9 @@ class YandexParser(BaseParser, ABC):
         self.parameters = parameters
         self.sdk = None
         self.search_api = None
+        self.date_from = None
+        self.date_to = None
+        self.date_bounds = None
 
         # Инициализация Yandex SDK
         self.init_yandex_sdk()
@@ -138,95 +236,158 @@ class YandexParser(BaseParser, ABC):
             print(f"❌ Ошибка инициализации Yandex SDK: {e}")
             raise
 
-    def perform_api_search(self, query: str, page: int = 0) -> Optional[str]:
-        """Выполнение поискового запроса через Yandex API"""
+    @staticmethod
+    def get_groups_on_page(max_results: int) -> int:
+        """
+        Размер страницы выдачи под лимит запроса: с запасом на результаты вне периода,
+        но не больше 100 (ограничение API). Размер фиксируется на весь запрос, чтобы номера
+        страниц указывали на непересекающиеся участки выдачи.
+        """
+        return max(10, min(100, max_results * 3))
+
+    def run_deferred_search(self, query: str, page: int = 0, groups_on_page: int = 100):
+        """Запуск отложенной операции поиска (без ожидания результата)"""
+        format = self.parameters.get('RESULT_FORMAT', 'xml')
+        configured_search = self.search_api.configure(
+            groups_on_page=groups_on_page,  # API ограничивает 100 результатами
+            docs_in_group=1,
+            max_passages=5  # Количество пассажей на документ
+        )
+        return configured_search.run_deferred(query, format=format, page=page)
+
+    def build_cache_key(self, query: str, page: int, groups_on_page: int) -> str:
+        """Ключ кэша поисковых ответов для страницы выдачи"""
+        format = f"{self.parameters.get('RESULT_FORMAT', 'xml').lower()}:{self.parameters.get('SEARCH_TYPE', 'ru')}"
+        return self.search_cache_key(query, groups_on_page, format=format, page=page)
+
+    def cache_response(self, query: str, page: int, groups_on_page: int, api_response: Union[bytes, str, None]):
+        """Сохраняет непустой ответ API в кэш поисковых ответов"""
+        cache = self.get_search_cache()
+        if cache is None or not api_response:
+            return
+        if isinstance(api_response, str):
+            api_response = api_response.encode('utf-8')
+        cache.put(self.build_cache_key(query, page, groups_on_page), api_response,
+                  engine=self.class_name, query=query)
+
+    def perform_api_search(self, query: str, page: int = 0, groups_on_page: int = 100) -> Optional[bytes]:
+        """Выполнение поискового запроса через Yandex API (ответ — исходные байты, из кэша, если он есть)"""
+        cache = self.get_search_cache()
+        if cache is not None:
+            api_response = cache.get(self.build_cache_key(query, page, groups_on_page))
+            if api_response is not None:
+                print(f"🔍 Ответ из кэша: '{query}' (страница {page + 1})")
+                return api_response
+
         try:
             print(f"🔍 API поиск: '{query}' (страница {page + 1})")
 
-            # Получаем формат результатов
-            format = self.parameters.get('RESULT_FORMAT', 'xml')
-
             # Выполняем асинхронный запрос через API
-            configured_search = self.search_api.configure(
-                groups_on_page=100,  # API ограничивает 100 результатами
-                docs_in_group=1,
-                max_passages=5  # Количество пассажей на документ
-            )
-
-            operation = configured_search.run_deferred(query, format=format, page=page)
+            operation = self.run_deferred_search(query, page, groups_on_page)
 
             # Ждем завершения операции
             print("⏳ Ожидание ответа от API...")
-            search_result = operation.wait(poll_interval=1)
-
-            # Декодируем результат
-            result_content = search_result.decode('utf-8')
-
-            return result_content
+            api_response = operation.wait(poll_interval=1)
 
         except Exception as e:
             print(f"❌ Ошибка при API поиске '{query}': {e}")
             return None
 
-    def parse_xml_response(self, api_response: str) -> List[Dict]:
-        """Парсинг XML ответа от API"""
-        results = []
-
-        try:
-            from xml.etree import ElementTree as ET
-
-            # Парсим XML
-            root = ET.fromstring(api_response)
-
-            # Ищем все элементы с результатами
-            # Предполагаемая структура ответа
-            for doc in root.findall('.//doc'):
-                result = {}
-
-                # Извлекаем заголовок
-                title_elem = doc.find('title')
-                if title_elem is not None and title_elem.text:
-                    result['title'] = title_elem.text.strip()
+        self.cache_response(query, page, groups_on_page, api_response)
+        return api_response
+
+    def get_operation_poller(self) -> YandexOperationPoller:
+        return YandexOperationPoller.get_shared(poll_interval=self.parameters.get('YANDEX_POLL_INTERVAL', 1.0))
+
+    def submit_operation(self, query: str, page: int, groups_on_page: int) -> Tuple[str, Future]:
+        """Отложенная операция страницы выдачи в общем опросе: (ключ, Future ответа)"""
+        key = self.build_cache_key(query, page, groups_on_page)
+        future = self.get_operation_poller().submit(
+            key,
+            lambda: self.run_deferred_search(query, page, groups_on_page),
+            on_result=lambda api_response: self.cache_response(query, page, groups_on_page, api_response))
+        return key, future
+
+    def get_date_bounds(self) -> Optional[Tuple[str, str]]:
+        """
+        Границы периода DATE_FROM..DATE_TO в формате modtime без 'T' (ГГГГММДДччммсс):
+        строки одинаковой длины сравниваются так же, как даты, без разбора каждой даты выдачи.
+        """
+        date_from = convert_date(self.metadata.get('DATE_FROM', ''))
+        date_to = convert_date(self.metadata.get('DATE_TO', ''))
+        if date_from is None or date_to is None:
+            return None
+        return date_from.strftime('%Y%m%d%H%M%S'), date_to.strftime('%Y%m%d%H%M%S')
+
+    @staticmethod
+    def doc_to_result(doc, date_bounds: Optional[Tuple[str, str]] = None,
+                      seen_urls: Optional[set] = None) -> Optional[Dict]:
+        """
+        Результат из элемента <doc>: заголовок, URL, дата и пассажи.
+        None — если нет заголовка, URL или даты, дата вне date_bounds или URL уже встречался.
+        """
+        title_elem = doc.find('title')
+        title = title_elem.text.strip() if title_elem is not None and title_elem.text else ''
+        url = (doc.findtext('url') or '').strip()
+        modtime = doc.findtext('modtime', '')
+        if not (title and url and modtime):
+            return None
 
-                # Извлекаем URL
-                url_elem = doc.find('url')
-                if url_elem is not None and url_elem.text:
-                    result['url'] = url_elem.text.strip()
+        result = {'title': title, 'url': url}
+        if len(modtime) >= 15 and modtime[8] == 'T':
+            date_str = modtime[:8] + modtime[9:15]
+            if date_bounds is not None and not (date_str.isdigit()
+                                                and date_bounds[0] <= date_str <= date_bounds[1]):
+                return None
+            try:
+                result['date'] = datetime.strptime(date_str, "%Y%m%d%H%M%S").isoformat()
+            except ValueError:
+                if date_bounds is not None:
+                    return None
+                result['date'] = modtime
+        else:
+            return None
 
-                # Извлекаем дату, если есть
-                date_elem = doc.findtext('modtime', '')
-                if date_elem:
-                    # Пробуем распарсить дату
-                    try:
-                        from datetime import datetime
-                        if len(date_elem) >= 15 and date_elem[8] == 'T':
-                            date_str = date_elem[:8] + date_elem[9:15]
-                            parsed_date = datetime.strptime(date_str, "%Y%m%d%H%M%S")
-                            result['date'] = parsed_date.isoformat()
-                    except:
-                        result['date'] = date_elem
-
-                # Пассажи (фрагменты с ключевыми словами)
-                passages = doc.findall('.//passage')
-                passage_items = []
-                if passages:
-                    for passage in passages:
-                        passage_text = ''.join(passage.itertext()).strip()
-                        if passage_text:
-                            passage_items.append(' '.join(passage_text.split()))
-                if passage_items:
-                    result['raw_data'] = ' '.join(passage_items)
-                else:
-                    result['raw_data'] = ''
+        if seen_urls is not None:
+            if url in seen_urls:
+                return None
+            seen_urls.add(url)
+
+        # Пассажи (фрагменты с ключевыми словами)
+        passage_items = []
+        for passage in doc.iter('passage'):
+            passage_text = ''.join(passage.itertext()).strip()
+            if passage_text:
+                passage_items.append(' '.join(passage_text.split()))
+        result['raw_data'] = ' '.join(passage_items)
+        return result
+
+    def iter_xml_results(self, api_response: Union[bytes, str], date_bounds: Optional[Tuple[str, str]] = None,
+                         seen_urls: Optional[set] = None, stats: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Потоковый разбор XML ответа (iterparse по исходным байтам): результаты выдаются по одному,
+        обработанные элементы сразу очищаются. В stats['docs'] считается число просмотренных документов.
+        """
+        if isinstance(api_response, str):
+            api_response = api_response.encode('utf-8')
 
-                # Добавляем результат только если есть заголовок и URL
-                if result.get('title') and result.get('url') and result.get('date'):
-                    results.append(result)
-
-        except Exception as e:
+        try:
+            for _, elem in ET.iterparse(BytesIO(api_response), events=('end',)):
+                if elem.tag == 'doc':
+                    if stats is not None:
+                        stats['docs'] = stats.get('docs', 0) + 1
+                    result = self.doc_to_result(elem, date_bounds, seen_urls)
+                    elem.clear()
+                    if result:
+                        yield result
+                elif elem.tag == 'group':
+                    elem.clear()
+        except ET.ParseError as e:
             print(f"❌ Ошибка парсинга XML: {e}")
 
-        return results
+    def parse_xml_response(self, api_response: Union[bytes, str]) -> List[Dict]:
+        """Парсинг XML ответа от API"""
+        return list(self.iter_xml_results(api_response))
 
     def parse_html_response(self, api_response: str) -> List[Dict]:
         """Парсинг HTML ответа от API"""
@@ -270,18 +431,56 @@ class YandexParser(BaseParser, ABC):
 
         return results
 
-    def parse_api_response(self, api_response: str) -> List[Dict]:
+    def parse_api_response(self, api_response: Union[bytes, str]) -> List[Dict]:
         """Парсинг ответа от API в зависимости от формата"""
         format = self.parameters.get('RESULT_FORMAT', 'xml').lower()
 
         if format == 'xml':
             return self.parse_xml_response(api_response)
         elif format == 'html':
+            if isinstance(api_response, bytes):
+                api_response = api_response.decode('utf-8')
             return self.parse_html_response(api_response)
         else:
             print(f"⚠️ Неизвестный формат: {format}")
             return []
 
+    @classmethod
+    def prefetch(cls, containers: list):
+        """
+        Заранее отправляет первые страницы выдачи всех контейнеров в общий опрос операций (пакетный
+        режим): пока обрабатываются другие контейнеры и источники, операции уже выполняются, и парсер
+        контейнера получает готовые ответы. Контейнеры с готовыми файлами Yandex и страницы из кэша
+        пропускаются.
+        """
+        submitted = 0
+        for container in containers:
+            requests_to_parse = container.to_parse.get('Yandex')
+            folder = container.parameters.get('OUTPUT_DIR_PROCESSED', '')
+            if (not requests_to_parse or not container.parameters.get('YANDEX_BATCH_MODE', False)
+                    or container.check_existed_data_in_folder('Yandex', folder)):
+                continue
+
+            # Параметры запросов без создания парсера (конструктор сразу запускает парсинг)
+            parser = cls.__new__(cls)
+            parser.class_name = 'Yandex'
+            parser.parameters = container.parameters
+            parser.metadata = container.metadata
+            try:
+                parser.init_yandex_sdk()
+            except Exception:
+                return
+            cache = parser.get_search_cache()
+            for search in parser.build_searches(requests_to_parse):
+                groups_on_page = cls.get_groups_on_page(search['max_results'])
+                if cache is not None and cache.get(parser.build_cache_key(search['query'], 0,
+                                                                          groups_on_page)) is not None:
+                    continue
+                parser.submit_operation(search['query'], 0, groups_on_page)
+                submitted += 1
+        if submitted:
+            print(f'YANDEX: отправлено заранее {submitted} операций поиска')
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=8, max=15),
@@ -295,10 +494,50 @@ class YandexParser(BaseParser, ABC):
         if not self.search_api:
             raise Exception("Search API не инициализирован")
 
+        # Границы периода вычисляются один раз на парсер, а не для каждого результата
+        self.date_from = convert_date(self.metadata.get('DATE_FROM', ''))
+        self.date_to = convert_date(self.metadata.get('DATE_TO', ''))
+        self.date_bounds = self.get_date_bounds()
+
+        searches = self.build_searches(self.requests_to_parse)
+
+        if self.parameters.get('YANDEX_BATCH_MODE', False):
+            results_by_query = self.search_batch(searches)
+        else:
+            results_by_query = [self.search_sequential(i, search, len(searches))
+                                for i, search in enumerate(searches, 1)]
+
         news_items = []
-        total_queries = len(self.requests_to_parse)
+        for search, all_results in zip(searches, results_by_query):
+            print(f'    QUERY: {search["query"]}')
+
+            # Создаем NewsItem для каждого результата
+            for j, result in enumerate(all_results, 1):
+                title = result.get('title', '')
+                url = result.get('url', '')
+                raw_data = result.get('raw_data', '')
+
+                if title and url:
+                    news_items.append(
+                        NewsItem(
+                            source=self.class_name,
+                            metadata=self.metadata,
+                            url=url,
+                            title=title,
+                            raw_data=raw_data,
+                            approved=self.check_approved_source(url)
+                        )
+                    )
+                    print(f"        {j}. {title[:70]} {url}...")
+
+            print(f"      ✅ Всего уникальных результатов: {len(all_results)}")
+
+        return news_items
 
-        for i, request in enumerate(self.requests_to_parse, 1):
+    def build_searches(self, requests_to_parse: list) -> List[Dict]:
+        """Запросы контейнера с лимитами результатов: [{'query', 'max_results'}, ...]"""
+        searches = []
+        for request in requests_to_parse:
             query = request['query'] if isinstance(request, dict) else request
 
             # Определяем лимит результатов
@@ -307,83 +546,138 @@ class YandexParser(BaseParser, ABC):
             else:
                 max_results = self.parameters.get('SEARCH_LIMIT_YANDEX', 15)
 
-            print(f'    [{i}/{total_queries}] QUERY: {query}')
-            print(f'    Лимит результатов: {max_results}')
-
-            try:
-                all_results = []
-                page = 0
-
-                # Парсим результаты со всех страниц
-                while len(all_results) < max_results:
-                    page += 1
-                    print(f"      📖 Страница {page}")
-
-                    # Выполняем API запрос
-                    api_response = self.perform_api_search(query, page - 1)
-
-                    if not api_response:
-                        print(f"      ⚠️ Пустой ответ от API")
-                        break
-
-                    # Парсим ответ
-                    page_results = self.parse_api_response(api_response)
-
-                    # Фильтруем дубликаты по URL и дату публикации/обновления
-                    unique_urls = set()
-                    filtered_results = []
-
-                    for result in page_results:
-                        url = result.get('url', '')
-                        date_ = result.get('date', '')
-                        # raw_data = result.get('raw_data', '')
-                        parsed_date = convert_date(date_)
-                        date_from = convert_date(self.metadata.get('DATE_FROM', ''))
-                        date_to = convert_date(self.metadata.get('DATE_TO', ''))
-                        if url and url not in unique_urls and date_from <= parsed_date <= date_to:
-                            unique_urls.add(url)
-                            filtered_results.append(result)
-
-                    all_results.extend(filtered_results)
-
-                    print(f"      📊 Найдено на странице: {len(filtered_results)}")
-                    print(f"      📊 Всего найдено: {len(all_results)}")
-
-                    # Проверяем лимит
-                    if len(all_results) >= max_results:
-                        all_results = all_results[:max_results]
-                        print(f"      ✅ Достигнут лимит в {max_results} результатов")
-                        break
-
-                    # Проверяем, есть ли еще результаты
-                    if len(page_results) == 0:
-                        print(f"      ⚠️ Больше нет результатов")
-                        break
-
-                # Создаем NewsItem для каждого результата
-                for j, result in enumerate(all_results, 1):
-                    title = result.get('title', '')
-                    url = result.get('url', '')
-                    raw_data = result.get('raw_data', '')
-
-                    if title and url:
-                        news_items.append(
-                            NewsItem(
-                                source=self.class_name,
-                                metadata=self.metadata,
-                                url=url,
-                                title=title,
-                                raw_data=raw_data,
-                                approved=self.check_approved_source(url)
-                            )
-                        )
-                        print(f"        {j}. {title[:70]} {url}...")
-
-                print(f"      ✅ Всего уникальных результатов: {len(all_results)}")
-
-            except Exception as e:
-                print(f"Error processing query '{query}': {e}")
-                raise e
-
-        return news_items
-
+            searches.append({'query': query, 'max_results': max_results})
+        return searches
+
+    def filter_page_results(self, page_results: List[Dict], seen_urls: set) -> List[Dict]:
+        """Результаты страницы в периоде DATE_FROM..DATE_TO без повторов URL"""
+        filtered_results = []
+        for result in page_results:
+            url = result.get('url', '')
+            parsed_date = convert_date(result.get('date', ''))
+            if url and url not in seen_urls and parsed_date and self.date_from <= parsed_date <= self.date_to:
+                seen_urls.add(url)
+                filtered_results.append(result)
+        return filtered_results
+
+    def collect_page_results(self, api_response: bytes, seen_urls: set, limit: int) -> Tuple[List[Dict], int]:
+        """
+        Не более limit результатов страницы в периоде и без повторов URL, а также число документов на странице.
+        XML разбирается потоково и дочитывается только до limit подходящих документов.
+        """
+        if self.parameters.get('RESULT_FORMAT', 'xml').lower() == 'xml':
+            stats = {'docs': 0}
+            results = list(islice(self.iter_xml_results(api_response, self.date_bounds, seen_urls, stats), limit))
+            return results, stats['docs']
+
+        page_results = self.parse_api_response(api_response)
+        return self.filter_page_results(page_results, seen_urls)[:limit], len(page_results)
+
+    def search_sequential(self, index: int, search: Dict, total_queries: int) -> List[Dict]:
+        """Постраничный поиск одного запроса с ожиданием каждой страницы"""
+        query, max_results = search['query'], search['max_results']
+        groups_on_page = self.get_groups_on_page(max_results)
+        max_pages = self.parameters.get('YANDEX_MAX_PAGES', 5)
+
+        print(f'    [{index}/{total_queries}] QUERY: {query}')
+        print(f'    Лимит результатов: {max_results}')
+
+        all_results = []
+        seen_urls = set()
+        page = 0
+
+        # Парсим результаты со всех страниц
+        while len(all_results) < max_results and page < max_pages:
+            page += 1
+            print(f"      📖 Страница {page}")
+
+            # Выполняем API запрос
+            api_response = self.perform_api_search(query, page - 1, groups_on_page)
+
+            if not api_response:
+                print(f"      ⚠️ Пустой ответ от API")
+                break
+
+            # Парсим ответ и фильтруем дубликаты по URL и дату публикации/обновления
+            filtered_results, docs_count = self.collect_page_results(api_response, seen_urls,
+                                                                     max_results - len(all_results))
+            all_results.extend(filtered_results)
+
+            print(f"      📊 Найдено на странице: {len(filtered_results)}")
+            print(f"      📊 Всего найдено: {len(all_results)}")
+
+            # Проверяем, есть ли еще результаты
+            if docs_count == 0:
+                print(f"      ⚠️ Больше нет результатов")
+                break
+
+        if len(all_results) >= max_results:
+            print(f"      ✅ Достигнут лимит в {max_results} результатов")
+        return all_results[:max_results]
+
+    def search_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """
+        Пакетный поиск: отложенные операции всех запросов запускаются сразу и опрашиваются вместе
+        с операциями других контейнеров (общий YandexOperationPoller; первые страницы обычно уже
+        отправлены через prefetch). Следующая страница запроса запрашивается, только если в периоде
+        набралось меньше лимита и выдача ещё не закончилась (не более YANDEX_MAX_PAGES страниц).
+        """
+        max_pages = self.parameters.get('YANDEX_MAX_PAGES', 5)
+        states = [{'page': 0, 'results': [], 'seen_urls': set(),
+                   'groups_on_page': self.get_groups_on_page(search['max_results'])} for search in searches]
+        # индекс запроса -> (ключ операции, Future ответа)
+        pending: Dict[int, Tuple[str, Future]] = {}
+        cache = self.get_search_cache()
+        cached_pages = 0
+
+        def submit(index: int):
+            nonlocal cached_pages
+            state = states[index]
+            # Страница из кэша обрабатывается сразу, без операции API
+            if cache is not None:
+                api_response = cache.get(self.build_cache_key(searches[index]['query'], state['page'],
+                                                              state['groups_on_page']))
+                if api_response is not None:
+                    cached_pages += 1
+                    on_done(index, api_response)
+                    return
+            pending[index] = self.submit_operation(searches[index]['query'], state['page'],
+                                                   state['groups_on_page'])
+
+        def on_done(index: int, api_response: Optional[bytes]):
+            state, search = states[index], searches[index]
+            if not api_response:
+                print(f"      ⚠️ Пустой ответ от API: {search['query']} (страница {state['page'] + 1})")
+                return
+
+            page_results, docs_count = self.collect_page_results(api_response, state['seen_urls'],
+                                                                 search['max_results'] - len(state['results']))
+            state['results'].extend(page_results)
+            state['page'] += 1
+
+            if (len(state['results']) < search['max_results']
+                    and docs_count
+                    and state['page'] < max_pages):
+                submit(index)
+
+        print(f'    🔍 Пакетный API поиск: {len(searches)} запросов')
+        for index in range(len(searches)):
+            submit(index)
+
+        poller = self.get_operation_poller()
+        while pending:
+            # Срок ожидания каждой операции отслеживает опрос, здесь ждём любой завершившейся
+            done, _ = wait([future for _, future in pending.values()], return_when=FIRST_COMPLETED)
+            for index, (key, future) in [(i, item) for i, item in pending.items() if item[1] in done]:
+                del pending[index]
+                try:
+                    api_response = future.result()
+                except Exception as e:
+                    print(f"❌ Ошибка при API поиске '{searches[index]['query']}': {e}")
+                    api_response = None
+                poller.release(key)
+                on_done(index, api_response)
+
+        pages_total = sum(state['page'] for state in states)
+        print(f'    📊 Получено страниц выдачи: {pages_total} (из кэша: {cached_pages})')
+        return [state['results'][:search['max_results']] for state, search in zip(states, searches)]
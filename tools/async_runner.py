@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, Coroutine
+
+# Общий событийный цикл на весь запуск. asyncio.run() создаёт и закрывает цикл на каждый вызов,
+# из-за чего ресурсы, привязанные к циклу (пулы браузеров, HTTP-сессии), нельзя переиспользовать
+# между контейнерами. Через run_async все контейнеры работают в одном цикле.
+_loop = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Возвращает общий событийный цикл, создавая его при необходимости"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Синхронно выполняет корутину в общем событийном цикле"""
+    return get_event_loop().run_until_complete(coro)
+
+
+def close_event_loop():
+    """Закрывает общий событийный цикл (вызывается в конце запуска)"""
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+    _loop = None
@@ -0,0 +1,62 @@
+"""
+Замер пропускной способности браузерных движков WebsiteParser на локальном статическом сайте.
+
+Запуск из корня проекта:
+    python -m tools.benchmark_browsers [количество страниц] [параллельность]
+"""
+import asyncio
+import sys
+import time
+
+from parsers.page_fetcher import create_browser, BROWSER_ENGINES
+from tools.local_fixtures import StaticSiteServer
+
+
+async def benchmark_engine(engine: str, urls: list, concurrency: int, page_load_timeout: int = 10000) -> dict:
+    browser = create_browser(engine=engine, size=concurrency, page_load_timeout=page_load_timeout)
+    semaphore = asyncio.Semaphore(concurrency)
+    parsed = 0
+
+    async def parse(url: str):
+        nonlocal parsed
+        async with semaphore:
+            text = await browser.parse(url)
+            if text:
+                parsed += 1
+
+    start_time = time.perf_counter()
+    try:
+        await asyncio.gather(*(parse(url) for url in urls))
+    finally:
+        await browser.close()
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'engine': engine,
+        'pages': len(urls),
+        'parsed': parsed,
+        'seconds': elapsed,
+        'pages_per_second': len(urls) / elapsed if elapsed else 0.0,
+    }
+
+
+def run_benchmark(pages_count: int = 50, concurrency: int = 5) -> list:
+    results = []
+    with StaticSiteServer(pages_count=pages_count) as site:
+        for engine in BROWSER_ENGINES:
+            try:
+                results.append(asyncio.run(benchmark_engine(engine, site.urls, concurrency)))
+            except Exception as e:
+                print(f"✗ Движок {engine} недоступен: {e}")
+
+    print(f"\n{'Движок':<12}{'Страниц':>10}{'Успешно':>10}{'Секунд':>10}{'Стр/сек':>10}")
+    for result in results:
+        print(f"{result['engine']:<12}{result['pages']:>10}{result['parsed']:>10}"
+              f"{result['seconds']:>10.1f}{result['pages_per_second']:>10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    parallel = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    run_benchmark(pages_count=pages, concurrency=parallel)
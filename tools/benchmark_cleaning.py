@@ -0,0 +1,84 @@
+"""
+Замер скорости очистки HTML: lxml (WebsiteParser._clean_content) против прежней
+реализации на BeautifulSoup (WebsiteParser._clean_content_soup), с проверкой совпадения результата.
+
+Корпус страниц берётся из дискового кэша (tools.page_cache), из папки с *.html файлами,
+а если ни того, ни другого нет — генерируется статьями локального тестового сайта.
+
+Запуск из корня проекта:
+    python -m tools.benchmark_cleaning [папка кэша или папка с html] [повторов]
+"""
+import os
+import sys
+import time
+from typing import List, Tuple
+
+from parsers.website_parser import WebsiteParser
+from tools.local_fixtures import StaticSiteServer
+from tools.page_cache import PageCache
+
+
+def load_corpus(path: str = None, limit: int = 2000) -> List[Tuple[str, str]]:
+    """Список (имя, html) для замера"""
+    corpus = []
+    if path and os.path.isfile(os.path.join(path, 'page_cache.sqlite')):
+        cache = PageCache(path)
+        for url, html in cache.iter_pages():
+            corpus.append((url, html))
+            if len(corpus) >= limit:
+                break
+        cache.close()
+    elif path and os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(path, name), encoding='utf-8', errors='replace') as f:
+                    corpus.append((name, f.read()))
+            if len(corpus) >= limit:
+                break
+
+    if not corpus:
+        with StaticSiteServer(pages_count=200) as site:
+            for name in sorted(os.listdir(site.root)):
+                with open(os.path.join(site.root, name), encoding='utf-8') as f:
+                    corpus.append((name, f.read()))
+    return corpus
+
+
+def measure(clean_func, corpus: List[Tuple[str, str]], repeats: int) -> Tuple[float, List[str]]:
+    outputs = []
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        outputs = [clean_func(html) for _, html in corpus]
+    return (time.perf_counter() - start_time) / repeats, outputs
+
+
+def run_benchmark(path: str = None, repeats: int = 3) -> dict:
+    corpus = load_corpus(path)
+    total_mb = sum(len(html) for _, html in corpus) / 1024 / 1024
+    print(f"Страниц в корпусе: {len(corpus)}, объём HTML: {total_mb:.1f} МБ")
+
+    soup_seconds, soup_outputs = measure(WebsiteParser._clean_content_soup, corpus, repeats)
+    lxml_seconds, lxml_outputs = measure(WebsiteParser._clean_content, corpus, repeats)
+
+    mismatches = [name for (name, _), old, new in zip(corpus, soup_outputs, lxml_outputs) if old != new]
+
+    print(f"\n{'Реализация':<16}{'Секунд':>10}{'Стр/сек':>12}")
+    for title, seconds in (('BeautifulSoup', soup_seconds), ('lxml', lxml_seconds)):
+        print(f"{title:<16}{seconds:>10.2f}{len(corpus) / seconds if seconds else 0.0:>12.1f}")
+    print(f"\nУскорение: x{soup_seconds / lxml_seconds if lxml_seconds else 0.0:.1f}")
+    print(f"Совпадение результата: {len(corpus) - len(mismatches)} из {len(corpus)}")
+    for name in mismatches[:10]:
+        print(f"  ⚠ Отличается: {name}")
+
+    return {
+        'pages': len(corpus),
+        'soup_seconds': soup_seconds,
+        'lxml_seconds': lxml_seconds,
+        'mismatches': mismatches,
+    }
+
+
+if __name__ == "__main__":
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat_count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    run_benchmark(corpus_path, repeat_count)
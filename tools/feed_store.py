@@ -0,0 +1,133 @@
+"""
+Локальное хранилище лент RSS/Atom и карт сайтов доверенных доменов (SQLite, feeds.sqlite).
+
+Для каждой ленты хранятся валидаторы ETag / Last-Modified последнего ответа: следующий опрос
+выполняется условным GET, и на 304 Not Modified лента не скачивается и не разбирается.
+Записи лент хранятся по домену и GUID (guid RSS, id Atom или адрес страницы в карте сайта), поэтому
+повторный опрос добавляет только новые записи, а выборка за период идёт по локальному индексу.
+Одна статья в лентах нескольких доменов (rbc.ru, nn.rbc.ru, realty.rbc.ru) хранится у каждого из них.
+Найденные для домена ленты (robots.txt, типовые адреса) сохраняются и перепроверяются раз в неделю.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable
+
+
+class FeedStore:
+    """Записи лент с валидаторами условного GET и списками лент доменов"""
+
+    def __init__(self, directory: str):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        # Ленты, уже опрошенные в этом запуске (контейнеры с одними доменами не опрашивают их повторно)
+        self.polled = set()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.directory, 'feeds.sqlite'), check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        with self._lock, self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    checked_at REAL NOT NULL
+                )''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS domains (
+                    domain TEXT PRIMARY KEY,
+                    feeds TEXT NOT NULL,
+                    discovered_at REAL NOT NULL
+                )''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS items (
+                    guid TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    full_text INTEGER NOT NULL,
+                    published REAL NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (domain, guid)
+                )''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS idx_items_published ON items (domain, published)')
+
+    # ---- Ленты доменов ----
+
+    def get_domain_feeds(self, domain: str, max_age_seconds: float) -> Optional[List[str]]:
+        """Сохранённые ленты домена или None, если их нет или они старше max_age_seconds"""
+        with self._lock:
+            row = self._connection.execute('SELECT feeds, discovered_at FROM domains WHERE domain = ?',
+                                           (domain,)).fetchone()
+        if row is None or time.time() - row[1] > max_age_seconds:
+            return None
+        return json.loads(row[0])
+
+    def set_domain_feeds(self, domain: str, feeds: List[str]):
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO domains (domain, feeds, discovered_at) VALUES (?, ?, ?)',
+                                     (domain, json.dumps(feeds), time.time()))
+
+    # ---- Условный GET ----
+
+    def get_validators(self, url: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            row = self._connection.execute('SELECT etag, last_modified FROM feeds WHERE url = ?', (url,)).fetchone()
+        return {'etag': row[0], 'last_modified': row[1]} if row else {'etag': None, 'last_modified': None}
+
+    def set_validators(self, url: str, domain: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock, self._connection:
+            self._connection.execute('''
+                INSERT OR REPLACE INTO feeds (url, domain, etag, last_modified, checked_at)
+                VALUES (?, ?, ?, ?, ?)''', (url, domain, etag, last_modified, time.time()))
+
+    # ---- Записи ----
+
+    def add_items(self, domain: str, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Сохраняет записи {'guid', 'url', 'title', 'description', 'full_text', 'published' (timestamp)};
+        записи с уже известным для домена GUID пропускаются. Возвращает число новых записей
+        """
+        now = time.time()
+        rows = [(item['guid'], domain, item['url'], item['title'], item['description'],
+                 int(bool(item['full_text'])), item['published'], now) for item in items]
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany('''
+                INSERT OR IGNORE INTO items (guid, domain, url, title, description, full_text, published, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+            return self._connection.total_changes - before
+
+    def get_items(self, domains: List[str], from_ts: float, to_ts: float) -> List[Dict[str, Any]]:
+        """Записи доменов за период, от новых к старым"""
+        if not domains:
+            return []
+        placeholders = ', '.join('?' * len(domains))
+        with self._lock:
+            rows = self._connection.execute(f'''
+                SELECT guid, domain, url, title, description, full_text, published FROM items
+                WHERE domain IN ({placeholders}) AND published >= ? AND published <= ?
+                ORDER BY published DESC''', [*domains, from_ts, to_ts]).fetchall()
+        return [dict(zip(('guid', 'domain', 'url', 'title', 'description', 'full_text', 'published'), row))
+                for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_stores: Dict[str, FeedStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_feed_store(directory: str) -> FeedStore:
+    """Общее на процесс хранилище для папки (ленты опрашиваются один раз за запуск для всех контейнеров)"""
+    key = os.path.abspath(str(directory))
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = FeedStore(directory)
+        return _stores[key]
@@ -0,0 +1,71 @@
+from typing import List, Dict, Any
+
+from news.news_container import ContainerNewsItem
+from parsers.page_fetcher import PageFetcher
+from tools.async_runner import run_async
+from tools.page_cache import canonicalize_url
+
+
+class FetchPlanner:
+    """
+    Глобальный планировщик этапа RAW для всех контейнеров запуска.
+
+    Вместо того чтобы каждый контейнер по очереди загружал свой список ссылок, планировщик:
+    1. собирает обработанные данные (без дубликатов) всех контейнеров;
+    2. строит единый фронтир ссылок без raw_data, дедуплицированный по каноническому URL;
+    3. загружает каждую ссылку ровно один раз с полным бюджетом параллельности;
+    4. раскладывает полученный текст обратно по контейнерам и сохраняет их RAW-файлы.
+    """
+
+    def __init__(self, page_fetcher: PageFetcher, max_concurrent: int = 20):
+        self.page_fetcher = page_fetcher
+        self.max_concurrent = max_concurrent
+
+    @staticmethod
+    def build_frontier(planned: List[tuple]) -> Dict[str, List[Dict[str, Any]]]:
+        """Канонический URL -> все записи контейнеров, которым нужен текст этой страницы"""
+        frontier = {}
+        for _, full_data in planned:
+            for item in full_data:
+                if item.get('raw_data') or not item.get('url'):
+                    continue
+                frontier.setdefault(canonicalize_url(item['url']), []).append(item)
+        return frontier
+
+    def parse_raw_data(self, tasks: List[ContainerNewsItem]) -> List[ContainerNewsItem]:
+        """Выполняет этап RAW для всех контейнеров, возвращает список обработанных контейнеров"""
+        print('\n**** PLANNING RAW DATA FOR ALL CONTAINERS ****\n')
+
+        planned = []
+        for task in tasks:
+            full_data = task.load_processed_data()
+            if full_data is not None:
+                planned.append((task, full_data))
+
+        if not planned:
+            print("Нет контейнеров для этапа RAW.")
+            return []
+
+        frontier = self.build_frontier(planned)
+        total_items = sum(len(items) for items in frontier.values())
+        print(f"Контейнеров: {len(planned)}, записей без текста: {total_items}, "
+              f"уникальных ссылок для загрузки: {len(frontier)}")
+
+        # Для каждой канонической ссылки загружаем первый встретившийся вариант URL
+        urls = {key: items[0]['url'] for key, items in frontier.items()}
+        results = run_async(self.page_fetcher.fetch_many(list(urls.values()),
+                                                         max_concurrent=self.max_concurrent,
+                                                         desc="Парсинг сайтов (все контейнеры)"))
+        self.page_fetcher.print_statistics()
+
+        # Раскладываем текст обратно по контейнерам
+        for key, items in frontier.items():
+            text = results.get(urls[key], {}).get('text') or ''
+            for item in items:
+                item['raw_data'] = text
+                item['full_text'] = bool(text)
+
+        for task, full_data in planned:
+            task.to_json(full_data, 'RAW')
+
+        return [task for task, _ in planned]
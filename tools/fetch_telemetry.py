@@ -0,0 +1,156 @@
+"""
+Телеметрия загрузки страниц: по одной JSON-записи на URL в файле JSONL.
+
+Запись содержит итоговый уровень (engine), пройденные уровни (tiers: http → extract → browser),
+число повторов планировщиком после 429 / 5xx (retries; все попытки URL — в одной записи, total
+включает ожидание отката), HTTP-статус, байты на входе, символы на выходе, ошибку/таймаут
+и время по фазам (секунды):
+cache, http, http_cleaning, pool_wait, driver_start, driver_get, ready_wait, page_source, cleaning.
+
+Отчёт по доменам и фазам:
+    python -m tools.fetch_telemetry report [файл журнала] [--last]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List
+from urllib.parse import urlsplit
+
+
+class FetchTrace:
+    """Замеры одной загрузки; передаётся по цепочке уровней (HTTP, пул браузеров, драйвер)"""
+
+    def __init__(self, url: str):
+        host = (urlsplit(url).hostname or '').lower()
+        self.record = {
+            'url': url,
+            'domain': host[4:] if host.startswith('www.') else host,
+            'started_at': time.time(),
+            'engine': None,
+            'tiers': [],
+            'retries': 0,
+            'status': None,
+            'bytes_in': 0,
+            'chars_out': 0,
+            'error': None,
+            'timed_out': False,
+            'total': 0.0,
+            'phases': {},
+        }
+
+    @contextmanager
+    def phase(self, name: str):
+        """Замер фазы: with trace.phase('driver_get'): ..."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start_time)
+
+    def add_phase(self, name: str, seconds: float):
+        phases = self.record['phases']
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    def attempt(self, tier: str):
+        """Отмечает переход к очередному уровню загрузки"""
+        self.record['tiers'].append(tier)
+
+    def retry(self):
+        """Отмечает повтор URL планировщиком (после отказа хоста 429 / 5xx)"""
+        self.record['retries'] += 1
+
+    def update(self, **fields):
+        self.record.update(fields)
+
+
+class FetchTelemetry:
+    """Потокобезопасная запись трасс загрузки в JSONL (дописывание в конец файла)"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.run_id = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, trace: FetchTrace):
+        record = dict(trace.record, run=self.run_id)
+        record['total'] = round(time.time() - record['started_at'], 4)
+        record['phases'] = {name: round(seconds, 4) for name, seconds in record['phases'].items()}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_records(path: str, last_run_only: bool = False) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    if last_run_only and records:
+        last_run = records[-1].get('run')
+        records = [record for record in records if record.get('run') == last_run]
+    return records
+
+
+def build_report(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Агрегаты по фазам и по доменам"""
+    phases = defaultdict(float)
+    domains = defaultdict(lambda: {'urls': 0, 'total': 0.0, 'failed': 0, 'timeouts': 0, 'retries': 0,
+                                   'engines': defaultdict(int), 'phases': defaultdict(float)})
+    for record in records:
+        domain = domains[record.get('domain', '')]
+        domain['urls'] += 1
+        domain['total'] += record.get('total', 0.0)
+        domain['engines'][record.get('engine') or 'failed'] += 1
+        domain['failed'] += int(not record.get('engine'))
+        domain['timeouts'] += int(bool(record.get('timed_out')))
+        domain['retries'] += record.get('retries', 0)
+        for name, seconds in record.get('phases', {}).items():
+            phases[name] += seconds
+            domain['phases'][name] += seconds
+    return {'urls': len(records), 'phases': phases, 'domains': domains}
+
+
+def print_report(report: Dict[str, Any], top: int = 20):
+    total_phases = sum(report['phases'].values())
+    print(f"Записей: {report['urls']}, суммарное время по фазам: {total_phases:.1f} с\n")
+
+    print(f"{'Фаза':<16}{'Секунд':>10}{'Доля':>8}")
+    for name, seconds in sorted(report['phases'].items(), key=lambda item: item[1], reverse=True):
+        share = seconds / total_phases if total_phases else 0.0
+        print(f"{name:<16}{seconds:>10.1f}{share:>8.1%}")
+
+    print(f"\n{'Домен':<32}{'URL':>6}{'Секунд':>9}{'Ср., с':>8}{'Ошибок':>8}{'Тайм.':>7}{'Повт.':>7}  Основная фаза / уровни")
+    domains = sorted(report['domains'].items(), key=lambda item: item[1]['total'], reverse=True)
+    for name, domain in domains[:top]:
+        main_phase = max(domain['phases'].items(), key=lambda item: item[1])[0] if domain['phases'] else '-'
+        engines = ', '.join(f"{engine} {count}" for engine, count in domain['engines'].items())
+        print(f"{name[:31]:<32}{domain['urls']:>6}{domain['total']:>9.1f}{domain['total'] / domain['urls']:>8.2f}"
+              f"{domain['failed']:>8}{domain['timeouts']:>7}{domain['retries']:>7}  {main_phase} / {engines}")
+
+
+if __name__ == "__main__":
+    from config.settings import StorageSettings
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args or args[0] != 'report':
+        print("Использование: python -m tools.fetch_telemetry report [файл журнала] [--last]")
+        sys.exit(1)
+
+    log_path = args[1] if len(args) > 1 else StorageSettings.OUTPUT_DIR_TELEMETRY / 'fetch_log.jsonl'
+    print_report(build_report(load_records(log_path, last_run_only='--last' in sys.argv)))
@@ -0,0 +1,403 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+from typing import List, Dict
+from urllib.parse import urlparse, parse_qs
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Обработчик статики без логирования каждого запроса в консоль"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticSiteServer:
+    """
+    Локальный статический «новостной сайт» для замеров и отладки загрузчиков страниц.
+
+    Генерирует pages_count статей во временной папке и раздаёт их через ThreadingHTTPServer
+    на свободном порту 127.0.0.1. Использование:
+
+        with StaticSiteServer(pages_count=50) as site:
+            urls = site.urls
+    """
+
+    ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="utf-8">
+    <title>Новость {number}</title>
+    <style>body {{ font-family: sans-serif; }}</style>
+    <script>window.analytics = {{ page: {number} }};</script>
+</head>
+<body>
+    <header><a href="/">Главная</a> | <a href="/news">Новости</a></header>
+    <nav><ul><li>Недвижимость</li><li>Бизнес</li><li>Туризм</li></ul></nav>
+    <div class="ads-top banner">Реклама партнёра</div>
+    <article>
+        <h1>Новость {number}: рынок недвижимости в регионе</h1>
+        {paragraphs}
+    </article>
+    <div id="promo-block">Подпишитесь на рассылку</div>
+    <footer>© Тестовое издание, 2026</footer>
+</body>
+</html>
+"""
+    PARAGRAPH = ("<p>Абзац {index} новости {number}. Спрос на ипотеку в регионе вырос, "
+                 "застройщики сообщают о росте продаж в новостройках, а средняя цена квадратного "
+                 "метра на вторичном рынке изменилась незначительно.</p>")
+
+    def __init__(self, pages_count: int = 50, paragraphs_per_page: int = 20, host: str = '127.0.0.1'):
+        self.pages_count = pages_count
+        self.paragraphs_per_page = paragraphs_per_page
+        self.host = host
+        self.root = None
+        self.server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _generate_pages(self):
+        for number in range(1, self.pages_count + 1):
+            paragraphs = '\n        '.join(self.PARAGRAPH.format(index=index, number=number)
+                                           for index in range(1, self.paragraphs_per_page + 1))
+            html = self.ARTICLE_TEMPLATE.format(number=number, paragraphs=paragraphs)
+            with open(os.path.join(self.root, f'article_{number}.html'), 'w', encoding='utf-8') as f:
+                f.write(html)
+
+    def start(self):
+        self.root = tempfile.mkdtemp(prefix='static_site_')
+        self._generate_pages()
+
+        handler = partial(_QuietHandler, directory=self.root)
+        self.server = ThreadingHTTPServer((self.host, 0), handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1]}"
+
+    @property
+    def urls(self) -> List[str]:
+        return [f"{self.base_url}/article_{number}.html" for number in range(1, self.pages_count + 1)]
+
+
+class _CustomSearchHandler(BaseHTTPRequestHandler):
+    """Ответы в формате Custom Search JSON API (параметры читаются из self.server.fixture)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        fixture = self.server.fixture
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        with fixture.lock:
+            fixture.requests.append(params)
+
+        if parsed.path != fixture.PATH:
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+        if not params.get('key') or not params.get('cx'):
+            self._send_json(400, {'error': {'code': 400, 'message': 'Missing key or cx'}})
+            return
+        if fixture.latency:
+            time.sleep(fixture.latency)
+
+        start = int(params.get('start', 1))
+        num = min(10, int(params.get('num', 10)))
+        query_id = hashlib.md5(params.get('q', '').encode('utf-8')).hexdigest()[:8]
+        items = [{
+            'kind': 'customsearch#result',
+            'title': f"Результат {position} по запросу {params.get('q', '')}",
+            'link': f"https://news.example/{query_id}/{position}",
+            'displayLink': 'news.example',
+            'snippet': f"Фрагмент результата {position}",
+        } for position in range(start, min(start + num, fixture.total_results + 1))]
+
+        body = {'kind': 'customsearch#search',
+                'queries': {'request': [{'startIndex': start, 'count': len(items), 'sort': params.get('sort', '')}]},
+                'searchInformation': {'totalResults': str(fixture.total_results)}}
+        if items:
+            body['items'] = items
+        self._send_json(200, body)
+
+
+class CustomSearchServer:
+    """
+    Локальная замена Google Custom Search JSON API для отладки GoogleAPIParser без сети и квоты.
+
+    На каждый запрос (q, start, num) отдаёт детерминированные результаты — не больше total_results
+    на запрос, с задержкой latency секунд. Все параметры запросов сохраняются в requests. Использование:
+
+        with CustomSearchServer(total_results=30) as api:
+            parameters['GOOGLE_API_URL'] = api.url
+    """
+
+    PATH = '/customsearch/v1'
+
+    def __init__(self, total_results: int = 100, latency: float = 0.0, host: str = '127.0.0.1'):
+        self.total_results = total_results
+        self.latency = latency
+        self.host = host
+        self.requests: List[Dict[str, str]] = []
+        self.lock = threading.Lock()
+        self.server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, 0), _CustomSearchHandler)
+        self.server.fixture = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1]}{self.PATH}"
+
+
+class _ExtractHandler(BaseHTTPRequestHandler):
+    """POST {'urls': [...]} -> ответ в формате Tavily Extract (параметры — в self.server.fixture)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        fixture = self.server.fixture
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            urls = json.loads(self.rfile.read(length).decode('utf-8')).get('urls', [])
+        except ValueError:
+            urls = []
+        with fixture.lock:
+            fixture.batches.append(list(urls))
+
+        results, failed = [], []
+        for url in urls:
+            text = fixture.extract(url)
+            if text:
+                results.append({'url': url, 'raw_content': text})
+            else:
+                failed.append({'url': url, 'error': 'Failed to extract content'})
+
+        data = json.dumps({'results': results, 'failed_results': failed}, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ExtractServer:
+    """
+    Локальная замена сервиса пакетного извлечения (HttpExtractProvider, EXTRACTION_LOCAL_URL).
+
+    Загружает присланные URL и очищает HTML тем же кодом, что и WebsiteParser. Доля coverage URL
+    (детерминированно по хэшу адреса) «извлекается», остальные возвращаются в failed_results —
+    так можно проверить переход остатка к следующему провайдеру и браузеру. Присланные пачки
+    сохраняются в batches. Использование:
+
+        with StaticSiteServer(pages_count=50) as site, ExtractServer(coverage=0.8) as extractor:
+            parameters['EXTRACTION_LOCAL_URL'] = extractor.url
+    """
+
+    PATH = '/extract'
+
+    def __init__(self, coverage: float = 1.0, latency: float = 0.0, host: str = '127.0.0.1'):
+        self.coverage = coverage
+        self.latency = latency
+        self.host = host
+        self.batches: List[List[str]] = []
+        self.lock = threading.Lock()
+        self.server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def extract(self, url: str) -> str:
+        """Очищенный текст страницы или '' (не покрыта или не загрузилась)"""
+        bucket = int(hashlib.md5(url.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+        if bucket >= self.coverage:
+            return ''
+        if self.latency:
+            time.sleep(self.latency)
+        # Импорт здесь, чтобы статическому сайту не был нужен парсер страниц
+        from urllib.request import urlopen
+        from parsers.website_parser import WebsiteParser
+        try:
+            with urlopen(url, timeout=10) as response:
+                html = response.read().decode('utf-8', errors='replace')
+        except Exception:
+            return ''
+        return WebsiteParser._clean_content(html)
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, 0), _ExtractHandler)
+        self.server.fixture = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1]}{self.PATH}"
+
+
+class _TelegramPreviewHandler(BaseHTTPRequestHandler):
+    """Страницы в разметке веб-предпросмотра t.me/s/{канал}?before={id} (параметры — в self.server.fixture)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fixture = self.server.fixture
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        channel = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+        with fixture.lock:
+            fixture.requests.append((channel, params.get('before')))
+
+        if not parsed.path.startswith('/s/') or channel not in fixture.channels:
+            # Как t.me: канала без предпросмотра нет — отдаётся страница без истории сообщений
+            body = '<html><body><div class="tgme_page">Нет предпросмотра</div></body></html>'
+        else:
+            if fixture.latency:
+                time.sleep(fixture.latency)
+            before = int(params.get('before') or fixture.channels[channel] + 1)
+            ids = range(max(1, before - fixture.page_size), before)
+            body = ('<html><body><section class="tgme_channel_history js-message_history">'
+                    + ''.join(fixture.render_message(channel, message_id) for message_id in ids)
+                    + '</section></body></html>')
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TelegramPreviewServer:
+    """
+    Локальная замена веб-предпросмотра t.me/s для отладки TelegramWebSession без сети.
+
+    channels — {канал: число сообщений}; сообщение id публикуется за (последний id - id) * interval_hours
+    часов до момента запуска сервера, каждое пятое — без текста (только медиа), у каждого третьего
+    жирный заголовок и ответ-цитата. Страница содержит page_size сообщений ниже курсора before.
+    Запросы (канал, before) сохраняются в requests. Использование:
+
+        with TelegramPreviewServer({'domresearch': 300}) as preview:
+            parameters['TELEGRAM_WEB_URL'] = preview.url
+    """
+
+    def __init__(self, channels: Dict[str, int], page_size: int = 20, interval_hours: float = 6.0,
+                 latency: float = 0.0, host: str = '127.0.0.1'):
+        self.channels = channels
+        self.page_size = page_size
+        self.interval_hours = interval_hours
+        self.latency = latency
+        self.host = host
+        self.now = time.time()
+        self.requests: List[tuple] = []
+        self.lock = threading.Lock()
+        self.server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def message_timestamp(self, channel: str, message_id: int) -> float:
+        return self.now - (self.channels[channel] - message_id) * self.interval_hours * 3600
+
+    def render_message(self, channel: str, message_id: int) -> str:
+        from datetime import datetime, timezone
+        published = datetime.fromtimestamp(self.message_timestamp(channel, message_id), tz=timezone.utc)
+        text = ''
+        if message_id % 5:
+            text = f'Новость {message_id} канала {channel}.<br/>Подробности <a href="https://example.com/{message_id}">по ссылке</a>'
+            if message_id % 3 == 0:
+                text = f'<b>Заголовок {message_id}</b><br/>' + text
+            text = f'<div class="tgme_widget_message_text js-message_text" dir="auto">{text}</div>'
+        reply = ''
+        if message_id % 3 == 0:
+            reply = ('<a class="tgme_widget_message_reply" href="#"><div class="tgme_widget_message_text '
+                     'js-message_reply_text">Цитата</div></a>')
+        return (f'<div class="tgme_widget_message_wrap js-widget_message_wrap">'
+                f'<div class="tgme_widget_message js-widget_message" data-post="{channel}/{message_id}">'
+                f'{reply}{text}<div class="tgme_widget_message_footer">'
+                f'<a class="tgme_widget_message_date" href="https://t.me/{channel}/{message_id}">'
+                f'<time datetime="{published.isoformat()}" class="time">{published:%H:%M}</time></a>'
+                f'</div></div></div>')
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, 0), _TelegramPreviewHandler)
+        self.server.fixture = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1]}"
@@ -0,0 +1,303 @@
+"""
+Дисковый кэш загруженных страниц.
+
+Индекс в SQLite (page_cache.sqlite) + сжатые zlib блобы, адресуемые по sha256 содержимого
+(blobs/ab/abcdef....zlib). Для каждого канонического URL хранится исходный HTML и очищенный
+текст, поэтому улучшенную очистку можно перезапустить офлайн без повторной загрузки.
+Вместе со страницей хранятся валидаторы ETag / Last-Modified для условной перепроверки
+просроченных записей (If-None-Match / If-Modified-Since, см. PageFetcher):
+
+    python -m tools.page_cache reclean [папка кэша]
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any, Callable, Iterator, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Параметры, которые не влияют на содержимое страницы: только метки кампаний и идентификаторы кликов.
+# from, ref и подобные сюда не входят — некоторые CMS выбирают по ним страницу или материал
+TRACKING_PARAMS_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'yclid', 'gclid', 'fbclid', '_openstat'}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Канонический вид URL для ключа кэша:
+    https вместо http, хост в нижнем регистре без www. и порта по умолчанию,
+    без якоря и трекинговых параметров, отсортированные параметры, путь без завершающего '/'.
+    """
+    parts = urlsplit(url.strip())
+
+    scheme = 'https' if parts.scheme in ('http', 'https', '') else parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    port = parts.port
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PARAMS_PREFIXES)]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+class PageCache:
+    """
+    Кэш страниц по каноническому URL с TTL, ограничением размера (вытеснение LRU)
+    и счётчиками попаданий/промахов. Просроченная запись с валидаторами может быть продлена
+    через touch() после ответа 304 Not Modified.
+    """
+
+    def __init__(self, directory: str, ttl_hours: float = 24 * 30, max_size_mb: float = 2048):
+        self.directory = str(directory)
+        self.blobs_dir = os.path.join(self.directory, 'blobs')
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'revalidated': 0, 'writes': 0, 'evicted': 0}
+
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.directory, 'page_cache.sqlite'),
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    url_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    html_hash TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    engine TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL
+                )''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)')
+
+            # Валидаторы появились позже — дополняем таблицу старых кэшей
+            columns = {row[1] for row in self._connection.execute('PRAGMA table_info(pages)')}
+            for column in ('etag', 'last_modified'):
+                if column not in columns:
+                    self._connection.execute(f'ALTER TABLE pages ADD COLUMN {column} TEXT')
+
+    # ---- Блобы ----
+
+    def _blob_path(self, blob_hash: str) -> str:
+        return os.path.join(self.blobs_dir, blob_hash[:2], f"{blob_hash}.zlib")
+
+    def _write_blob(self, content: str) -> str:
+        data = content.encode('utf-8')
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob_hash)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(data, 6)
+            tmp_path = f"{path}.tmp{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            self._connection.execute('INSERT OR REPLACE INTO blobs (hash, size) VALUES (?, ?)',
+                                     (blob_hash, len(compressed)))
+        return blob_hash
+
+    def _read_blob(self, blob_hash: str) -> Optional[str]:
+        try:
+            with open(self._blob_path(blob_hash), 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except (OSError, zlib.error):
+            return None
+
+    # ---- Основные операции ----
+
+    def get(self, url: str, allow_expired: bool = False, include_html: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает запись кэша {'url', 'html', 'text', 'engine', 'fetched_at', 'expired', 'etag', 'last_modified'}
+        или None. Просроченные записи считаются промахом, если не указан allow_expired
+        (тогда запись возвращается с expired=True — например, для условной перепроверки).
+        HTML читается и распаковывается только при include_html, иначе 'html' — None.
+        """
+        url_key = canonicalize_url(url)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT url, html_hash, text_hash, engine, fetched_at, etag, last_modified FROM pages '
+                'WHERE url_key = ?', (url_key,)).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            cached_url, html_hash, text_hash, engine, fetched_at, etag, last_modified = row
+            expired = time.time() - fetched_at > self.ttl_seconds
+            if expired:
+                self.stats['expired'] += 1
+                if not allow_expired:
+                    self.stats['misses'] += 1
+                    return None
+
+            text = self._read_blob(text_hash)
+            if text is None:
+                # Блоб потерян — удаляем битую запись
+                with self._connection:
+                    self._connection.execute('DELETE FROM pages WHERE url_key = ?', (url_key,))
+                self.stats['misses'] += 1
+                return None
+
+            with self._connection:
+                self._connection.execute('UPDATE pages SET accessed_at = ? WHERE url_key = ?',
+                                         (time.time(), url_key))
+            if not expired:
+                self.stats['hits'] += 1
+
+        return {
+            'url': cached_url,
+            'html': (self._read_blob(html_hash) or '') if include_html else None,
+            'text': text,
+            'engine': engine,
+            'fetched_at': fetched_at,
+            'expired': expired,
+            'etag': etag,
+            'last_modified': last_modified,
+        }
+
+    def put(self, url: str, html: str, text: str, engine: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Сохраняет HTML, очищенный текст страницы и её валидаторы ETag / Last-Modified"""
+        url_key = canonicalize_url(url)
+        now = time.time()
+        with self._lock, self._connection:
+            html_hash = self._write_blob(html or '')
+            text_hash = self._write_blob(text or '')
+            self._connection.execute('''
+                INSERT OR REPLACE INTO pages
+                    (url_key, url, html_hash, text_hash, engine, fetched_at, accessed_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                                     (url_key, url, html_hash, text_hash, engine, now, now, etag, last_modified))
+            self.stats['writes'] += 1
+
+        self._evict_if_needed()
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Продлевает запись после ответа 304 Not Modified (новые валидаторы — если сервер их прислал)"""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute('''
+                UPDATE pages SET fetched_at = ?, accessed_at = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url_key = ?''', (now, now, etag, last_modified, canonicalize_url(url)))
+            self.stats['revalidated'] += 1
+
+    def update_text(self, url: str, text: str, remove_orphans: bool = True):
+        """Заменяет очищенный текст записи (HTML остаётся прежним)"""
+        with self._lock, self._connection:
+            text_hash = self._write_blob(text or '')
+            self._connection.execute('UPDATE pages SET text_hash = ? WHERE url_key = ?',
+                                     (text_hash, canonicalize_url(url)))
+            if remove_orphans:
+                self._remove_orphan_blobs()
+
+    # ---- Размер и вытеснение ----
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def _remove_orphan_blobs(self):
+        orphans = self._connection.execute('''
+            SELECT hash FROM blobs
+            WHERE hash NOT IN (SELECT html_hash FROM pages) AND hash NOT IN (SELECT text_hash FROM pages)
+        ''').fetchall()
+        for (blob_hash,) in orphans:
+            try:
+                os.remove(self._blob_path(blob_hash))
+            except OSError:
+                pass
+        self._connection.executemany('DELETE FROM blobs WHERE hash = ?', orphans)
+
+    def _evict_if_needed(self):
+        """Вытесняет давно не использованные страницы, пока кэш не станет меньше 90% лимита"""
+        if self.total_size() <= self.max_size_bytes:
+            return
+
+        target = int(self.max_size_bytes * 0.9)
+        with self._lock, self._connection:
+            # Сначала освобождаем блобы, на которые больше не ссылается ни одна страница
+            self._remove_orphan_blobs()
+            size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            if size <= target:
+                return
+
+            rows = self._connection.execute('SELECT url_key FROM pages ORDER BY accessed_at').fetchall()
+            for batch_start in range(0, len(rows), 100):
+                batch = rows[batch_start:batch_start + 100]
+                self._connection.executemany('DELETE FROM pages WHERE url_key = ?', batch)
+                self.stats['evicted'] += len(batch)
+                self._remove_orphan_blobs()
+                size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+                if size <= target:
+                    break
+
+    # ---- Офлайн-обработка ----
+
+    def iter_pages(self) -> Iterator[Tuple[str, str]]:
+        """Перебирает (url, html) всех сохранённых страниц"""
+        with self._lock:
+            rows = self._connection.execute('SELECT url, html_hash FROM pages').fetchall()
+        for url, html_hash in rows:
+            html = self._read_blob(html_hash)
+            if html:
+                yield url, html
+
+    def reclean(self, clean_func: Callable[[str], str]) -> int:
+        """Пересчитывает очищенный текст всех страниц из сохранённого HTML без повторной загрузки"""
+        updated = 0
+        for url, html in self.iter_pages():
+            self.update_text(url, clean_func(html), remove_orphans=False)
+            updated += 1
+
+        # Старые варианты текста больше не нужны
+        with self._lock, self._connection:
+            self._remove_orphan_blobs()
+        return updated
+
+    def print_statistics(self):
+        requests_total = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / requests_total if requests_total else 0.0
+        print(f"Кэш страниц: попаданий {self.stats['hits']}, промахов {self.stats['misses']} "
+              f"(просрочено {self.stats['expired']}, подтверждено 304 — {self.stats['revalidated']}), "
+              f"доля попаданий {hit_rate:.1%}, записано {self.stats['writes']}, вытеснено {self.stats['evicted']}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+if __name__ == "__main__":
+    from config.settings import StorageSettings
+    from parsers.website_parser import WebsiteParser
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'reclean':
+        print("Использование: python -m tools.page_cache reclean [папка кэша]")
+        sys.exit(1)
+
+    cache_dir = sys.argv[2] if len(sys.argv) > 2 else StorageSettings.OUTPUT_DIR_CACHE
+    cache = PageCache(cache_dir)
+    print(f"Перечищено страниц: {cache.reclean(WebsiteParser._clean_content)}")
+    cache.close()
@@ -0,0 +1,56 @@
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Потокобезопасный «ведро токенов»: не более rate запросов в секунду в среднем
+    с допустимым всплеском до burst запросов подряд.
+
+    pause(seconds) останавливает выдачу токенов всем потокам — например, по заголовку
+    Retry-After ответа 429, чтобы после отказа сервера не продолжали стучаться остальные потоки.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Блокирует поток до получения токена"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                    self.updated_at = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Приостанавливает выдачу токенов на seconds секунд (паузы не сокращаются)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated_at = self.paused_until
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, burst: int = 1) -> TokenBucket:
+    """Общий на весь процесс лимитер по имени API (создаётся при первом обращении)"""
+    with _buckets_lock:
+        if name not in _buckets:
+            _buckets[name] = TokenBucket(rate=rate, burst=burst)
+        return _buckets[name]
@@ -0,0 +1,73 @@
+"""
+Классификация текстов по регионам за один проход.
+
+Вместо отдельного регулярного выражения на каждый из регионов (filter_raw_data_by_region)
+все ключевые слова REGIONS_KEYWORDS собираются в одно выражение-дерево по общим префиксам.
+Выражение ищется с опережающей проверкой в каждой позиции текста и возвращает самое длинное
+ключевое слово, начинающееся в ней; ключевые слова, которые являются его префиксами, учитываются
+по заранее построенной таблице. Результат совпадает с проверкой каждого региона отдельно
+(регион подходит, если хотя бы одно его ключевое слово входит в текст без учёта регистра).
+"""
+import hashlib
+import json
+import re
+from typing import Dict, List, Set, FrozenSet
+
+
+def build_trie_pattern(words: List[str]) -> str:
+    """Регулярное выражение по дереву общих префиксов слов (при нескольких вариантах выбирается самый длинный)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def to_pattern(node: dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Жадный необязательный хвост: сначала пробуется более длинное слово
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+
+    return to_pattern(trie)
+
+
+class RegionClassifier:
+    """Регионы текста по словарю {регион: [ключевые слова]} за один проход по тексту"""
+
+    def __init__(self, regions_keywords: Dict[str, List[str]]):
+        self.regions_keywords = regions_keywords
+        # Версия словаря: при изменении ключевых слов сохранённая классификация пересчитывается
+        self.version = hashlib.sha256(json.dumps(regions_keywords, ensure_ascii=False, sort_keys=True)
+                                      .encode('utf-8')).hexdigest()[:16]
+
+        keyword_regions: Dict[str, Set[str]] = {}
+        for region, keywords in regions_keywords.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    keyword_regions.setdefault(keyword, set()).add(region)
+
+        # Регионы найденного ключевого слова вместе с регионами всех ключевых слов-префиксов
+        self.match_regions: Dict[str, FrozenSet[str]] = {}
+        for keyword in keyword_regions:
+            regions = set()
+            for length in range(1, len(keyword) + 1):
+                regions |= keyword_regions.get(keyword[:length], set())
+            self.match_regions[keyword] = frozenset(regions)
+
+        self.pattern = re.compile(f'(?=({build_trie_pattern(sorted(keyword_regions))}))', re.IGNORECASE)
+
+    def classify(self, text: str) -> Set[str]:
+        """Множество регионов, ключевые слова которых встречаются в тексте"""
+        if not isinstance(text, str) or not text:
+            return set()
+        regions = set()
+        for match in self.pattern.finditer(text.lower()):
+            regions |= self.match_regions.get(match.group(1), frozenset())
+        return regions
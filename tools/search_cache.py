@@ -0,0 +1,166 @@
+"""
+Дисковый кэш ответов поисковых API (Tavily, Yandex, выдача Google).
+
+Ключ — sha256 от (поисковик, нормализованный запрос, DATE_FROM, DATE_TO, лимит, формат, страница),
+значение — сжатый zlib ответ в SQLite (search_cache.sqlite). Повторный запуск после сбоя и
+пересекающиеся эксперименты получают уже оплаченные ответы без обращения к API.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any
+
+
+def normalize_query(query: str) -> str:
+    """Запрос без различий в регистре и пробелах"""
+    return ' '.join(str(query).lower().split())
+
+
+class SearchCache:
+    """Кэш ответов поисковых API с TTL, ограничением размера (вытеснение LRU) и счётчиками попаданий"""
+
+    def __init__(self, directory: str, ttl_hours: float = 24 * 7, max_size_mb: float = 256):
+        self.directory = str(directory)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'evicted': 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.directory, 'search_cache.sqlite'),
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        with self._lock, self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    engine TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+            # Текущий размер считаем один раз и дальше ведём счётчиком, а не SUM на каждую запись
+            self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(engine: str, query: str, date_from: str = '', date_to: str = '', limit: int = 0,
+                 format: str = '', page: int = 0) -> str:
+        parts = [engine, normalize_query(query), str(date_from or ''), str(date_to or ''),
+                 int(limit or 0), str(format or ''), int(page or 0)]
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Исходные байты ответа или None (нет записи или она просрочена)"""
+        with self._lock:
+            row = self._connection.execute('SELECT data, fetched_at FROM responses WHERE key = ?',
+                                           (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            data, fetched_at = row
+            if time.time() - fetched_at > self.ttl_seconds:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            try:
+                response = zlib.decompress(data)
+            except zlib.error:
+                with self._connection:
+                    self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= len(data)
+                self.stats['misses'] += 1
+                return None
+
+            with self._connection:
+                self._connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self.stats['hits'] += 1
+        return response
+
+    def put(self, key: str, response: bytes, engine: str = '', query: str = ''):
+        """Сохраняет исходные байты ответа"""
+        data = zlib.compress(response, 6)
+        now = time.time()
+        with self._lock, self._connection:
+            previous = self._connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._connection.execute('''
+                INSERT OR REPLACE INTO responses (key, engine, query, data, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)''', (key, engine, query, data, len(data), now, now))
+            self._size += len(data) - (previous[0] if previous else 0)
+            self.stats['writes'] += 1
+
+        self._evict_if_needed()
+
+    def get_json(self, key: str) -> Optional[Any]:
+        response = self.get(key)
+        if response is None:
+            return None
+        try:
+            return json.loads(response.decode('utf-8'))
+        except ValueError:
+            return None
+
+    def put_json(self, key: str, value: Any, engine: str = '', query: str = ''):
+        self.put(key, json.dumps(value, ensure_ascii=False).encode('utf-8'), engine, query)
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def _evict_if_needed(self):
+        """Удаляет просроченные и давно не использованные ответы, пока кэш не станет меньше 90% лимита"""
+        if self.total_size() <= self.max_size_bytes:
+            return
+
+        target = int(self.max_size_bytes * 0.9)
+        with self._lock, self._connection:
+            expired_before = time.time() - self.ttl_seconds
+            expired = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses '
+                                               'WHERE fetched_at < ?', (expired_before,)).fetchone()
+            self._connection.execute('DELETE FROM responses WHERE fetched_at < ?', (expired_before,))
+            self.stats['evicted'] += expired[0]
+            self._size -= expired[1]
+
+            evicted = []
+            if self._size > target:
+                rows = self._connection.execute('SELECT key, size FROM responses ORDER BY accessed_at')
+                for key, row_size in rows:
+                    if self._size <= target:
+                        break
+                    evicted.append((key,))
+                    self._size -= row_size
+            self._connection.executemany('DELETE FROM responses WHERE key = ?', evicted)
+            self.stats['evicted'] += len(evicted)
+
+    def print_statistics(self):
+        requests_total = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / requests_total if requests_total else 0.0
+        print(f"Кэш поисковых ответов: попаданий {self.stats['hits']}, промахов {self.stats['misses']} "
+              f"(просрочено {self.stats['expired']}), доля попаданий {hit_rate:.1%}, "
+              f"записано {self.stats['writes']}, вытеснено {self.stats['evicted']}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_caches: Dict[str, SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(directory: str, ttl_hours: float = 24 * 7, max_size_mb: float = 256) -> SearchCache:
+    """Общий на процесс кэш для папки (парсеры всех контейнеров работают с одним соединением)"""
+    key = os.path.abspath(str(directory))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SearchCache(directory, ttl_hours=ttl_hours, max_size_mb=max_size_mb)
+        return _caches[key]
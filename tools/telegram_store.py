@@ -0,0 +1,198 @@
+"""
+Локальное хранилище сообщений Telegram-каналов (SQLite, telegram_messages.sqlite).
+
+Для каждого канала хранится непрерывный участок истории — от самого нового загруженного
+сообщения (max_id, «верхняя отметка») вниз до oldest_date. Следующий запуск докачивает только
+сообщения новее max_id (min_id в iter_messages) и, если запрошен более ранний период, догружает
+историю ниже oldest_date; выборки по периоду выполняются по локальному индексу.
+
+Если хранилищу передан словарь REGIONS_KEYWORDS, каждое сообщение при записи один раз
+классифицируется по всем регионам (tools.region_index.RegionClassifier), а результат хранится
+списками сообщений по регионам (message_regions): контейнер региона выбирает только свои сообщения.
+При изменении словаря классификация сохранённых сообщений пересчитывается при открытии хранилища.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+
+from tools.region_index import RegionClassifier
+
+
+class TelegramStore:
+    """Сообщения каналов с отметками синхронизации"""
+
+    def __init__(self, directory: str, regions_keywords: Optional[Dict[str, List[str]]] = None):
+        self.directory = str(directory)
+        self.classifier = RegionClassifier(regions_keywords) if regions_keywords else None
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.directory, 'telegram_messages.sqlite'),
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        with self._lock, self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    channel TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    date REAL NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (channel, id)
+                )''')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (channel, date)')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS channels (
+                    channel TEXT PRIMARY KEY,
+                    max_id INTEGER NOT NULL,
+                    max_date REAL NOT NULL,
+                    oldest_id INTEGER NOT NULL,
+                    oldest_date REAL NOT NULL,
+                    synced_at REAL NOT NULL
+                )''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS message_regions (
+                    region TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    PRIMARY KEY (region, channel, id)
+                )''')
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )''')
+        if self.classifier is not None:
+            self._reclassify_if_needed()
+
+    @staticmethod
+    def normalize_channel(channel: str) -> str:
+        return channel.strip().lstrip('@').lower()
+
+    def get_state(self, channel: str) -> Optional[Dict[str, Any]]:
+        """Отметки канала: max_id/max_date — самое новое сообщение, oldest_id/oldest_date — нижняя граница участка"""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT max_id, max_date, oldest_id, oldest_date, synced_at FROM channels WHERE channel = ?',
+                (self.normalize_channel(channel),)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('max_id', 'max_date', 'oldest_id', 'oldest_date', 'synced_at'), row))
+
+    # ---- Классификация по регионам ----
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def _region_rows(self, rows: List[tuple]) -> List[tuple]:
+        """Строки message_regions для строк сообщений (channel, id, date, text)"""
+        return [(region, channel, message_id)
+                for channel, message_id, _, text in rows
+                for region in self.classifier.classify(text)]
+
+    def _reclassify_if_needed(self):
+        """Пересчитывает списки по регионам, если словарь изменился или сообщения писались без классификации"""
+        with self._lock, self._connection:
+            if self._get_meta('regions_version') == self.classifier.version:
+                return
+            self._connection.execute('DELETE FROM message_regions')
+            cursor = self._connection.execute('SELECT channel, id, date, text FROM messages')
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                self._connection.executemany('INSERT OR IGNORE INTO message_regions (region, channel, id) '
+                                             'VALUES (?, ?, ?)', self._region_rows(rows))
+            self._set_meta('regions_version', self.classifier.version)
+
+    def add_messages(self, channel: str, messages: Iterable[Dict[str, Any]]) -> int:
+        """
+        Сохраняет сообщения {'id', 'date' (datetime), 'text'}; повторная запись перезаписывает сообщение.
+        С классификатором сообщения сразу раскладываются по спискам регионов.
+        """
+        rows = [(self.normalize_channel(channel), m['id'], m['date'].timestamp(), m['text']) for m in messages]
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO messages (channel, id, date, text) VALUES (?, ?, ?, ?)',
+                                         rows)
+            if self.classifier is None:
+                # Сообщения без классификации: при следующем открытии с классификатором списки пересчитаются
+                self._set_meta('regions_version', '')
+            else:
+                self._connection.executemany('DELETE FROM message_regions WHERE channel = ? AND id = ?',
+                                             [(channel_key, message_id) for channel_key, message_id, _, _ in rows])
+                self._connection.executemany('INSERT OR IGNORE INTO message_regions (region, channel, id) '
+                                             'VALUES (?, ?, ?)', self._region_rows(rows))
+        return len(rows)
+
+    def update_state(self, channel: str, max_id: Optional[int] = None, max_date: Optional[datetime] = None,
+                     oldest_id: Optional[int] = None, oldest_date: Optional[float] = None):
+        """Сдвигает отметки канала (верхняя только вверх, нижняя только вниз)"""
+        key = self.normalize_channel(channel)
+        now = time.time()
+        max_ts = max_date.timestamp() if max_date else None
+        with self._lock, self._connection:
+            row = self._connection.execute('SELECT 1 FROM channels WHERE channel = ?', (key,)).fetchone()
+            if row is None:
+                self._connection.execute('''
+                    INSERT INTO channels (channel, max_id, max_date, oldest_id, oldest_date, synced_at)
+                    VALUES (?, ?, ?, ?, ?, ?)''',
+                                         (key, max_id or 0, max_ts or 0.0,
+                                          oldest_id if oldest_id is not None else (max_id or 0),
+                                          oldest_date if oldest_date is not None else (max_ts or now), now))
+                return
+            self._connection.execute('''
+                UPDATE channels SET
+                    max_id = MAX(max_id, COALESCE(?, max_id)),
+                    max_date = MAX(max_date, COALESCE(?, max_date)),
+                    oldest_id = MIN(oldest_id, COALESCE(?, oldest_id)),
+                    oldest_date = MIN(oldest_date, COALESCE(?, oldest_date)),
+                    synced_at = ?
+                WHERE channel = ?''', (max_id, max_ts, oldest_id, oldest_date, now, key))
+
+    def get_messages(self, channel: str, date_from: datetime, date_to: datetime,
+                     limit: Optional[int] = None, region: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Сообщения канала за период от новых к старым (как iter_messages), не больше limit.
+        С region — только сообщения этого региона из его списка (limit ограничивает окно
+        последних сообщений канала за период, как при выборке без региона).
+        """
+        key = self.normalize_channel(channel)
+        from_ts, to_ts = date_from.timestamp(), date_to.timestamp()
+        with self._lock:
+            if region is None:
+                query = ('SELECT id, date, text FROM messages WHERE channel = ? AND date >= ? AND date <= ? '
+                         'ORDER BY date DESC, id DESC')
+                params = [key, from_ts, to_ts]
+                if limit is not None:
+                    query += ' LIMIT ?'
+                    params.append(limit)
+                rows = self._connection.execute(query, params).fetchall()
+            else:
+                if limit is not None:
+                    # Нижняя граница окна из limit последних сообщений за период
+                    row = self._connection.execute(
+                        'SELECT date FROM messages WHERE channel = ? AND date >= ? AND date <= ? '
+                        'ORDER BY date DESC, id DESC LIMIT 1 OFFSET ?', (key, from_ts, to_ts, limit - 1)).fetchone()
+                    if row is not None:
+                        from_ts = row[0]
+                rows = self._connection.execute('''
+                    SELECT m.id, m.date, m.text FROM message_regions r
+                    JOIN messages m ON m.channel = r.channel AND m.id = r.id
+                    WHERE r.region = ? AND r.channel = ? AND m.date >= ? AND m.date <= ?
+                    ORDER BY m.date DESC, m.id DESC''', (region, key, from_ts, to_ts)).fetchall()
+        return [{'id': message_id, 'date': datetime.fromtimestamp(date, tz=date_from.tzinfo), 'text': text}
+                for message_id, date, text in rows]
+
+    def covers(self, channel: str, date_from: datetime) -> bool:
+        """Хранилище содержит историю канала начиная с date_from"""
+        state = self.get_state(channel)
+        return state is not None and state['oldest_date'] <= date_from.timestamp()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()